@@ -33,6 +33,9 @@
 EXIT=0
 EXIT_UNKNOWN_JOB_TYPE=1
 EXIT_LINT_FAILED=2
+EXIT_IMPORT_CHECK_FAILED=3
+EXIT_BENCHMARK_FAILED=4
+EXIT_SELF_CHECK_FAILED=5
 EXIT_FUEL_FAILED=10
 
 #
@@ -59,6 +62,31 @@ function execute_auto_lint_check() {
     fi
 }
 
+# check that the resiliency tool starts quickly (heavy SDKs are not imported
+# at startup, import time is within budget)
+function execute_auto_import_check() {
+    if ! python3 lib/auto/testcase/resiliency/AutoResilImportCheck.py ; then
+        EXIT=$EXIT_IMPORT_CHECK_FAILED
+    fi
+}
+
+# regression checks of resiliency tool modules which have them (run as scripts)
+function execute_auto_self_checks() {
+    if ! python3 lib/auto/testcase/resiliency/AutoResilMgCodes.py ; then
+        EXIT=$EXIT_SELF_CHECK_FAILED
+    fi
+}
+
+# benchmark the resiliency tool against a simulated cloud, and compare results
+# to the baseline stored next to the benchmark: failed checks and regressions
+# of detection errors fail the job; timings depend on the machine and are only
+# reported
+function execute_auto_benchmark() {
+    if ! python3 lib/auto/testcase/resiliency/AutoResilBenchmark.py ; then
+        EXIT=$EXIT_BENCHMARK_FAILED
+    fi
+}
+
 # check and install required packages
 function dependencies_check() {
     . /etc/os-release
@@ -115,6 +143,8 @@ case $1 in
 
         virtualenv_prepare
         execute_auto_lint_check
+        execute_auto_import_check
+        execute_auto_self_checks
         #execute_auto_doc_check
 
         # Everything went well, so report SUCCESS to Jenkins
@@ -127,6 +157,9 @@ case $1 in
 
         virtualenv_prepare
         execute_auto_lint_check
+        execute_auto_import_check
+        execute_auto_self_checks
+        execute_auto_benchmark
         #execute_auto_doc_check
 
         # propagate result to the Jenkins job
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: benchmark suite of the resiliency tool itself, against a simulated cloud (AutoResilItfCloudSim)
+# Measured (in a temporary working directory, so that real definition and result files are not touched):
+#   - test executions (run_test_code, via a campaign): throughput (executions/minute), harness overhead per execution
+#     (execution time not spent in challenge codes nor in detection, from AutoResilMgTrace spans),
+#     detection error (measured recovery time minus actual recovery time, known from the simulator)
+#   - definition lookups (from lists in memory, and from definition files through their cache)
+#   - CSV writers of test and challenge executions
+#   - definition loaders: init_all_definitions, full and incremental
+#   - challenge and test codes 005 themselves (OpenStack SDK, OpenStackConnectionManager, fan-out suspension,
+#     restoration detection), if the SDK is installed: detection error; a thread stands for ONAP, resuming VMs
+# Checks (failing the benchmark whatever the machine): all executions restored, result files (written at the end,
+# and streamed) ingested in a results warehouse (AutoResilMgResults) once, even when they change, VMs left ACTIVE,
+# one authentication per cloud.
+# Results are compared to a baseline file (JSON, versioned with BENCHMARK_VERSION: numbers of another benchmark
+# version are not comparable). Only gated metrics, which do not depend on machine speed (detection errors: the
+# simulator sets recovery times, and poll instants are fixed), fail the comparison when worse than their baseline
+# value beyond their tolerance; timings (throughput, overhead, lookups, writers, loaders) are only reported.
+# Exit code: 0 if no regression, 1 if a gated metric regressed, 2 if the baseline is missing or of another version,
+# 3 if a check failed.
+
+
+#docstring
+"""This module contains the benchmark suite of OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import argparse
+import contextlib
+import copy
+import http.client
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+
+# Constants
+BENCHMARK_VERSION =         2       # change when what is measured changes: baselines of other versions are not used
+BASELINE_FORMAT =           "AutoResilBenchmarkBaseline"
+BASELINE_FILE =             os.path.join(os.path.dirname(os.path.abspath(__file__)), "AutoResilBenchmarkBaseline.json")
+NB_EXECUTIONS =             20      # test executions (against the simulator)
+NB_LOOKUPS =                2000    # definition lookups, per kind of lookup
+NB_CSV_WRITES =             50      # writes of each kind of execution CSV file
+NB_INIT_RUNS =              3       # runs of each definition loader (best one is kept)
+NB_STREAMED_EXECUTIONS =    2       # test executions streaming their result files (not timed, ingestion check)
+NB_CODE005_EXECUTIONS =     5       # test executions with challenge and test codes 005 (OpenStack SDK)
+BENCHMARK_TEST_DEF_ID =     900     # benchmark copies of test definition 5 and challenge definition 5
+CODE005_TEST_DEF_ID =       901     # copies of definitions 5 keeping codes 005, with a connection manager
+REFERENCE_TEST_DEF_ID =     5
+SIM_LATENCY =               0.002   # seconds added to each simulated API call
+SIM_SUSPEND_DELAY =         0.01    # seconds for the simulated VM to become SUSPENDED
+INJECTED_RECOVERY_SECONDS = 0.35    # seconds for the simulated VM to become ACTIVE again, after resume
+                                    # (between two polls of the default poller, at 0.25 s and 0.475 s: stable error)
+DEFAULT_TOLERANCE =         0.5     # relative: a metric may be up to 50% worse than its baseline value
+
+# metric name -> (unit, higher is better, absolute slack added to the tolerance, gated: a regression fails)
+METRICS = {
+    "executions_per_minute":            ("executions/min",  True,   0.0,    False),
+    "harness_overhead_ms":              ("ms/execution",    False,  1.0,    False),
+    "detection_error_mean_ms":          ("ms",              False,  20.0,   True),
+    "detection_error_max_ms":           ("ms",              False,  50.0,   True),
+    "code005_detection_error_mean_ms":  ("ms",              False,  20.0,   True),
+    "code005_detection_error_max_ms":   ("ms",              False,  50.0,   True),
+    "lookup_from_list_us":              ("us/lookup",       False,  1.0,    False),
+    "lookup_from_file_us":              ("us/lookup",       False,  5.0,    False),
+    "test_exec_CSV_write_ms":           ("ms/file",         False,  0.2,    False),
+    "challenge_exec_CSV_write_ms":      ("ms/file",         False,  0.2,    False),
+    "init_all_definitions_full_ms":     ("ms",              False,  5.0,    False),
+    "init_all_definitions_incremental_ms": ("ms",           False,  5.0,    False),
+}
+
+EXIT_NO_REGRESSION =        0
+EXIT_REGRESSION =           1
+EXIT_NO_BASELINE =          2
+EXIT_CHECK_FAILED =         3
+
+
+######################################################################
+
+class SimulatorClient:
+    """Minimal OpenStack compute client for the simulator (one keep-alive HTTP connection per thread):
+    benchmark codes measure the harness, not an SDK."""
+    def __init__ (self, simulator):
+        self.simulator = simulator
+        self.__local = threading.local()
+        status, headers, body = self.__call("POST", "/identity/v3/auth/tokens", {"auth": {"identity": {
+            "methods": ["password"],
+            "password": {"user": {"name": simulator.get_connect_options()["username"],
+                                  "domain": {"name": simulator.get_connect_options()["user_domain_name"]},
+                                  "password": simulator.get_connect_options()["password"]}}}}})
+        self.token = headers["X-Subject-Token"]
+
+    def __call(self, method, path, body=None, token=None):
+        conn = getattr(self.__local, "conn", None)
+        if conn == None:
+            conn = http.client.HTTPConnection(self.simulator.host, self.simulator.port)
+            self.__local.conn = conn
+        headers = {"Content-Type": "application/json"}
+        if token != None:
+            headers["X-Auth-Token"] = token
+        conn.request(method, path, None if body == None else json.dumps(body), headers)
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response.headers, json.loads(data) if len(data) > 0 else None
+
+    def get_server_status(self, server_ID):
+        status, _, body = self.__call("GET", "/compute/v2.1/servers/" + server_ID, token=self.token)
+        if status != 200:
+            raise RuntimeError("GET server " + server_ID + ": HTTP " + str(status))
+        return body["server"]["status"]
+
+    def server_action(self, server_ID, action):
+        status, _, body = self.__call("POST", "/compute/v2.1/servers/" + server_ID + "/action", {action: None},
+                                      token=self.token)
+        if status != 202:
+            raise RuntimeError(action + " server " + server_ID + ": HTTP " + str(status))
+
+    def wait_for_server_status(self, server_ID, server_status, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while self.get_server_status(server_ID) != server_status:
+            if time.monotonic() > deadline:
+                raise RuntimeError("server " + server_ID + " not " + server_status + " after " + str(timeout) + " s")
+            time.sleep(0.001)
+
+
+def get_benchmark_codes(client, server_ID):
+    """Return (test code, challenge code) for benchmark definitions: the challenge suspends the VM, then resumes it
+    (the simulator makes it ACTIVE INJECTED_RECOVERY_SECONDS later); the test code detects restoration by polling."""
+    import AutoResilMgCodes
+    import AutoResilRunDetect
+
+    def start_benchmark_challenge(self, *chall_code_args, **chall_code_kwargs):
+        client.server_action(server_ID, "suspend")
+        client.wait_for_server_status(server_ID, "SUSPENDED")
+        client.server_action(server_ID, "resume")  # stands for a recovery by ONAP
+
+    def stop_benchmark_challenge(self, *chall_code_args, **chall_code_kwargs):
+        client.wait_for_server_status(server_ID, "ACTIVE")
+
+    def benchmark_test_code(self, *test_code_args, **test_code_kwargs):
+        poller = AutoResilRunDetect.RestorationPoller()
+        poller.add_target(server_ID, lambda: client.get_server_status(server_ID) == "ACTIVE")
+        if not poller.run():
+            raise RuntimeError("VM " + server_ID + " was not restored")
+        return poller.get_last_detection_ns()
+
+    return benchmark_test_code, AutoResilMgCodes.ChallengeCode(start_benchmark_challenge, stop_benchmark_challenge)
+
+
+def check_results_ingestion(test_executions):
+    """Ingest result files of the working directory in a results warehouse, and check that each test execution
+    is found with its recovery time and metric values; return the list of failed checks."""
+    from AutoResilMgResults import ResultsWarehouse
+
+    warehouse = ResultsWarehouse(VNF_ID_lookup=lambda test_def_ID: [])
+    warehouse.ingest()
+    ingested = {test_exec_ID: recovery_time_ns for test_exec_ID, _, _, recovery_time_ns
+                in warehouse.query_recovery_times(test_def_ID=BENCHMARK_TEST_DEF_ID)}
+    failed_checks = []
+    for test_exec in test_executions:
+        if ingested.get(test_exec.ID) != test_exec.recovery_time_ns:
+            failed_checks.append("test execution " + str(test_exec.ID) + " not ingested with its recovery time")
+        for metric_value in test_exec.associated_metric_values.get_raw_list():
+            ingested_values = dict(warehouse.query_metric_values(metric_value.metric_def_ID,
+                                                                 test_def_ID=BENCHMARK_TEST_DEF_ID))
+            if math.isnan(ingested_values.get(test_exec.ID, math.nan)):
+                failed_checks.append("metric " + str(metric_value.metric_def_ID) + " of test execution " +
+                                     str(test_exec.ID) + " not ingested")
+
+    # result files changed since their ingestion (here: new mtime) replace their rows, and add none
+    nb_rows = warehouse.get_nb_rows("test")
+    for test_exec in test_executions:
+        file_stat = os.stat(test_exec.get_CSV_file_name())
+        os.utime(test_exec.get_CSV_file_name(), ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+    warehouse.ingest()
+    if warehouse.get_nb_rows("test") != nb_rows:
+        failed_checks.append("changed result files ingested again as new test executions")
+    return failed_checks
+
+
+def get_detection_errors_ns(test_executions, simulator, server_IDs):
+    """Return detection errors (ns) of test executions, one per execution: measured recovery time minus actual
+    recovery time, from challenge start to the end of the last VM resume in the simulator (one resume per VM
+    and per execution, in order)."""
+    restoration_instants = [simulator.get_transition_instants(server_ID, "resume") for server_ID in server_IDs]
+    detection_errors_ns = []
+    for index, test_exec in enumerate(test_executions):
+        restoration_ns = max(instants[index] for instants in restoration_instants)
+        actual_recovery_ns = restoration_ns - test_exec.timeline.get_ns("challenge_start")
+        detection_errors_ns.append(abs(test_exec.recovery_time_ns - actual_recovery_ns))
+    return detection_errors_ns
+
+
+def run_recovery_agent(simulator, client, server_IDs, stop_event):
+    """Stand for ONAP: resume each VM once after each suspension, until stop_event is set (thread target)."""
+    nb_resumed = {server_ID: 0 for server_ID in server_IDs}
+    while not stop_event.wait(0.001):
+        for server_ID in server_IDs:
+            if len(simulator.get_transition_instants(server_ID, "suspend")) > nb_resumed[server_ID]:
+                client.server_action(server_ID, "resume")
+                nb_resumed[server_ID] += 1
+
+
+def run_code005_benchmark(simulator, nb_executions=NB_CODE005_EXECUTIONS):
+    """Run copies of definitions 5 with their own codes (challenge code 005: fan-out VM suspension, test code 005:
+    restoration detection), through an OpenStackConnectionManager installed on the simulator.
+    Return (dictionary: metric name -> value, list of failed checks)."""
+    import AutoResilGlobal
+    import AutoResilItfCloud
+    import AutoResilMgTestDef
+    import AutoResilRunTest
+
+    test_def = copy.copy(AutoResilMgTestDef.get_indexed_item_from_list(REFERENCE_TEST_DEF_ID,
+                                                                       AutoResilGlobal.test_definition_list))
+    challenge_def = copy.copy(AutoResilMgTestDef.get_indexed_item_from_list(test_def.challenge_def_ID,
+                                                                            AutoResilGlobal.challenge_definition_list))
+    test_def.ID = challenge_def.ID = test_def.challenge_def_ID = CODE005_TEST_DEF_ID
+    connection_manager = AutoResilItfCloud.OpenStackConnectionManager()
+    simulator.install(connection_manager, AutoResilMgTestDef.TEST_CLOUD_NAME)
+    test_def.connection_manager = challenge_def.connection_manager = connection_manager
+    AutoResilGlobal.test_definition_list.append(test_def)
+    AutoResilGlobal.challenge_definition_list.append(challenge_def)
+
+    server_IDs = challenge_def.get_target_server_IDs()
+    for server_ID in server_IDs:
+        simulator.add_server("benchmark-VM-" + server_ID[:8], server_ID)
+    stop_event = threading.Event()
+    agent = threading.Thread(target=run_recovery_agent, name="recovery agent",
+                             args=(simulator, SimulatorClient(simulator), server_IDs, stop_event))
+    agent.start()
+    try:
+        connection_manager.get_connection(AutoResilMgTestDef.TEST_CLOUD_NAME)  # authenticated before timed windows
+        authentications = simulator.get_request_count("identity", "POST")
+        campaign = AutoResilRunTest.run_campaign(CODE005_TEST_DEF_ID, nb_executions)
+    finally:
+        stop_event.set()
+        agent.join()
+        connection_manager.close()
+
+    failed_checks = []
+    if len(campaign.failed_runs) > 0:
+        failed_checks.append(str(len(campaign.failed_runs)) + " executions of codes 005 failed or were not restored")
+    for server_ID in server_IDs:
+        if simulator.get_server_status(server_ID) != "ACTIVE":
+            failed_checks.append("VM " + server_ID + " left " + str(simulator.get_server_status(server_ID)) +
+                                 " by codes 005")
+    if simulator.get_request_count("identity", "POST") != authentications:
+        failed_checks.append("codes 005 authenticated again: connections are not shared")
+    results = {}
+    if len(campaign.test_executions) == nb_executions:
+        detection_errors_ns = get_detection_errors_ns(campaign.test_executions, simulator, server_IDs)
+        results["code005_detection_error_mean_ms"] = sum(detection_errors_ns) / len(detection_errors_ns) / 1e6
+        results["code005_detection_error_max_ms"] = max(detection_errors_ns) / 1e6
+    return results, failed_checks
+
+
+def measure_seconds(function, nb_runs):
+    """Return the best time (seconds) of several runs of a function."""
+    best_seconds = None
+    for _ in range(nb_runs):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        if best_seconds == None or seconds < best_seconds:
+            best_seconds = seconds
+    return best_seconds
+
+
+def run_benchmarks(nb_executions=NB_EXECUTIONS, nb_lookups=NB_LOOKUPS, nb_CSV_writes=NB_CSV_WRITES):
+    """Run all benchmarks in a temporary working directory;
+    return (dictionary: metric name -> value, list of failed checks)."""
+    import importlib.util
+    import AutoResilGlobal
+    import AutoResilMgCodes
+    import AutoResilMgTestDef
+    import AutoResilRunTest
+    from AutoResilItfCloudSim import CloudSimulator
+    from AutoResilMgTrace import tracer
+
+    results = {}
+    failed_checks = []
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="AutoResilBenchmark") as working_directory:
+        os.chdir(working_directory)
+        try:
+            # definition loaders (the full one first: it writes the files the incremental one checks)
+            results["init_all_definitions_full_ms"] = 1000 * measure_seconds(
+                lambda: AutoResilMgTestDef.init_all_definitions(incremental=False), NB_INIT_RUNS)
+            results["init_all_definitions_incremental_ms"] = 1000 * measure_seconds(
+                lambda: AutoResilMgTestDef.init_all_definitions(incremental=True), NB_INIT_RUNS)
+
+            # benchmark definitions: copies of definitions 5 (same resources), with benchmark codes,
+            # added to lists built in memory (lists loaded lazily belong to the definition file cache)
+            AutoResilMgTestDef.init_all_definitions(incremental=False)
+            test_def = copy.copy(AutoResilMgTestDef.get_indexed_item_from_list(REFERENCE_TEST_DEF_ID,
+                                                                               AutoResilGlobal.test_definition_list))
+            challenge_def = copy.copy(AutoResilMgTestDef.get_indexed_item_from_list(test_def.challenge_def_ID,
+                                                                                    AutoResilGlobal.challenge_definition_list))
+            test_def.ID = challenge_def.ID = test_def.challenge_def_ID = BENCHMARK_TEST_DEF_ID
+            test_def.test_code_ID = "benchmark_test_code"
+            challenge_def.challenge_code_ID = "benchmark_challenge_code"
+            AutoResilGlobal.test_definition_list.append(test_def)
+            AutoResilGlobal.challenge_definition_list.append(challenge_def)
+
+            with CloudSimulator(sim_latency=SIM_LATENCY) as simulator:
+                server_ID = simulator.add_server("benchmark-VM")  # codes 005 use the VMs of definitions 5
+                simulator.set_transition_delay("suspend", SIM_SUSPEND_DELAY)
+                simulator.set_transition_delay("resume", INJECTED_RECOVERY_SECONDS)
+                test_code, challenge_code = get_benchmark_codes(SimulatorClient(simulator), server_ID)
+                AutoResilMgCodes.test_codes.register("benchmark_test_code", test_code)
+                AutoResilMgCodes.challenge_codes.register("benchmark_challenge_code", challenge_code)
+
+                # test executions: throughput, overhead (from spans), detection error (from simulator transitions)
+                tracer.clear()
+                tracer.enable()
+                start = time.perf_counter()
+                campaign = AutoResilRunTest.run_campaign(BENCHMARK_TEST_DEF_ID, nb_executions)
+                campaign_seconds = time.perf_counter() - start
+                tracer.disable()
+                if len(campaign.failed_runs) > 0:
+                    failed_checks.append(str(len(campaign.failed_runs)) + " benchmark executions failed")
+                else:
+                    detection_errors_ns = get_detection_errors_ns(campaign.test_executions, simulator, [server_ID])
+                    results["detection_error_mean_ms"] = sum(detection_errors_ns) / len(detection_errors_ns) / 1e6
+                    results["detection_error_max_ms"] = max(detection_errors_ns) / 1e6
+
+                # a few streamed executions too (not timed): result files of both layouts are ingested below
+                AutoResilMgTestDef.STREAM_EXECUTION_RESULTS = True
+                try:
+                    streamed_campaign = AutoResilRunTest.run_campaign(BENCHMARK_TEST_DEF_ID, NB_STREAMED_EXECUTIONS)
+                finally:
+                    AutoResilMgTestDef.STREAM_EXECUTION_RESULTS = False
+                failed_checks.extend(check_results_ingestion(campaign.test_executions +
+                                                             streamed_campaign.test_executions))
+
+                # challenge and test codes 005 themselves (same simulator, other VMs)
+                if importlib.util.find_spec("openstack") == None:
+                    print("OpenStack SDK not installed: challenge and test codes 005 not benchmarked")
+                else:
+                    code005_results, code005_failed_checks = run_code005_benchmark(simulator)
+                    results.update(code005_results)
+                    failed_checks.extend(code005_failed_checks)
+
+            results["executions_per_minute"] = 60 * nb_executions / campaign_seconds
+            totals = tracer.get_span_totals()
+            code_ns = sum(totals.get(span_name, (0, 0))[1] for span_name in ("challenge start", "detection", "challenge stop"))
+            results["harness_overhead_ms"] = (totals["test execution"][1] - code_ns) / nb_executions / 1e6
+
+            # definition lookups
+            test_def_IDs = [item.ID for item in AutoResilGlobal.test_definition_list]
+            lookup_IDs = [test_def_IDs[i % len(test_def_IDs)] for i in range(nb_lookups)]
+            results["lookup_from_list_us"] = 1e6 / nb_lookups * measure_seconds(
+                lambda: [AutoResilMgTestDef.get_indexed_item_from_list(ID, AutoResilGlobal.test_definition_list)
+                         for ID in lookup_IDs], 3)
+            results["lookup_from_file_us"] = 1e6 / nb_lookups * measure_seconds(
+                lambda: [AutoResilMgTestDef.get_indexed_item_from_file(ID, AutoResilMgTestDef.FILE_TEST_DEFINITIONS)
+                         for ID in lookup_IDs], 3)
+
+            # CSV writers (same files rewritten)
+            test_exec = campaign.test_executions[-1]
+            results["test_exec_CSV_write_ms"] = 1000 / nb_CSV_writes * measure_seconds(
+                lambda: [test_exec.write_to_csv() for _ in range(nb_CSV_writes)], 1)
+            # challenge executions are not kept by test executions: same content as run_test_code writes
+            challenge_exec = AutoResilMgTestDef.ChallengeExecution(test_exec.challenge_exec_ID, "challenge execution",
+                                                                   BENCHMARK_TEST_DEF_ID)
+            challenge_exec.timeline = test_exec.timeline
+            challenge_exec.start_time = test_exec.timeline.get_wall_datetime("challenge_start")
+            challenge_exec.stop_time = test_exec.timeline.get_wall_datetime("challenge_stop")
+            challenge_exec.log.append_to_list("challenge execution created")
+            challenge_exec.log.append_to_list("challenge execution finished")
+            results["challenge_exec_CSV_write_ms"] = 1000 / nb_CSV_writes * measure_seconds(
+                lambda: [challenge_exec.write_to_csv() for _ in range(nb_CSV_writes)], 1)
+        finally:
+            os.chdir(previous_directory)
+    return results, failed_checks
+
+
+######################################################################
+# baseline
+
+def make_baseline(results, tolerance=DEFAULT_TOLERANCE):
+    """Return a baseline (dictionary, written as JSON) from benchmark results."""
+    return {"format":               BASELINE_FORMAT,
+            "benchmark_version":    BENCHMARK_VERSION,
+            "created":              time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine":              platform.platform() + ", Python " + platform.python_version(),
+            "metrics":              {name: {"value": round(value, 6), "unit": METRICS[name][0],
+                                            "higher_is_better": METRICS[name][1], "tolerance": tolerance}
+                                     for name, value in results.items()}}
+
+
+def read_baseline(file_name=BASELINE_FILE):
+    """Return a baseline, or None if the file does not exist or is not a baseline of this benchmark version."""
+    try:
+        with open(file_name) as baseline_file:
+            baseline = json.load(baseline_file)
+    except FileNotFoundError:
+        print("Baseline file not found:", file_name)
+        return None
+    if baseline.get("format") != BASELINE_FORMAT or baseline.get("benchmark_version") != BENCHMARK_VERSION:
+        print("Baseline", file_name, "is for benchmark version", baseline.get("benchmark_version"),
+              "(current version:", str(BENCHMARK_VERSION) + "): update it with --update-baseline")
+        return None
+    return baseline
+
+
+def write_baseline(baseline, file_name=BASELINE_FILE):
+    with open(file_name, "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=4, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def compare_to_baseline(results, baseline):
+    """Print results next to baseline values; return the list of regressed gated metric names
+    (other metrics worse than their limit are only reported as slower)."""
+    regressions = []
+    for name in METRICS:
+        unit, higher_is_better, slack, gated = METRICS[name]
+        reference = baseline["metrics"].get(name)
+        value = results.get(name)
+        if value == None:
+            print(name.ljust(38), "(not measured)")
+            continue
+        if reference == None:
+            print(name.ljust(38), "%12.3f" % value, unit, "(no baseline value)")
+            continue
+        tolerance = reference.get("tolerance", DEFAULT_TOLERANCE)
+        if higher_is_better:
+            limit = reference["value"] / (1 + tolerance) - slack
+            worse = value < limit
+        else:
+            limit = reference["value"] * (1 + tolerance) + slack
+            worse = value > limit
+        note = ""
+        if worse:
+            note = " REGRESSION" if gated else " slower (timing: reported only)"
+        print(name.ljust(38), "%12.3f" % value, unit.ljust(15),
+              "baseline %12.3f" % reference["value"], " limit %12.3f" % limit, note)
+        if worse and gated:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resiliency tool against a simulated cloud, "
+                                                 "compare results to a baseline")
+    parser.add_argument("--executions", type=int, default=NB_EXECUTIONS, metavar="N",
+                        help="number of test executions (default: " + str(NB_EXECUTIONS) + ")")
+    parser.add_argument("--baseline", default=BASELINE_FILE, metavar="FILE",
+                        help="baseline file (default: " + os.path.basename(BASELINE_FILE) + " next to this module)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write results to the baseline file instead of comparing them")
+    parser.add_argument("--output", metavar="FILE", help="also write results to this file (baseline format)")
+    parsed_arguments = parser.parse_args()
+
+    # messages from definitions and campaigns go to standard error: standard output is the report
+    with contextlib.redirect_stdout(sys.stderr):
+        results, failed_checks = run_benchmarks(parsed_arguments.executions)
+    if parsed_arguments.output != None:
+        write_baseline(make_baseline(results), parsed_arguments.output)
+    for failed_check in failed_checks:
+        print("FAILED check:", failed_check)
+    if parsed_arguments.update_baseline:
+        if len(failed_checks) > 0:
+            print("Baseline not written: checks failed")
+            sys.exit(EXIT_CHECK_FAILED)
+        write_baseline(make_baseline(results), parsed_arguments.baseline)
+        for name, value in results.items():
+            print(name.ljust(38), "%12.3f" % value, METRICS[name][0])
+        print("Baseline written:", parsed_arguments.baseline)
+        sys.exit(EXIT_NO_REGRESSION)
+
+    baseline = read_baseline(parsed_arguments.baseline)
+    if baseline == None:
+        sys.exit(EXIT_NO_BASELINE)
+    regressions = compare_to_baseline(results, baseline)
+    if len(regressions) > 0:
+        print("FAILED: regressions:", ", ".join(regressions))
+        sys.exit(EXIT_REGRESSION)
+    if len(failed_checks) > 0:
+        sys.exit(EXIT_CHECK_FAILED)
+    print("OK")
+    sys.exit(EXIT_NO_REGRESSION)
+
+if __name__ == "__main__":
+    main()
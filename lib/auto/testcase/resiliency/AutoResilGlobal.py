@@ -37,6 +37,7 @@ Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
 
 ######################################################################
 # import statements
+import threading
 
 
 # global variables
@@ -49,3 +50,28 @@ physical_resource_list =        None
 cloud_virtual_resource_list =   None
 VNF_Service_list =              None
 
+
+# lazy loading of global lists: a list registered with set_lazy_list() is loaded the first time it is used
+lazy_loaders =                  {}
+lazy_loaders_lock =             threading.Lock()
+
+
+def set_lazy_list(list_name, loader):
+    """Register a function (no arguments, returns a list) to load a global list on first access."""
+    with lazy_loaders_lock:
+        # remove current value, so that module-level __getattr__ gets called on next access
+        globals().pop(list_name, None)
+        lazy_loaders[list_name] = loader
+
+
+def __getattr__(name):
+    """Called for missing module attributes only: load a lazily registered global list."""
+    with lazy_loaders_lock:
+        if name in globals():
+            return globals()[name]  # loaded by another thread in the meantime
+        if name in lazy_loaders:
+            loaded_list = lazy_loaders.pop(name)()
+            globals()[name] = loaded_list
+            return loaded_list
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: import-time guard for the resiliency tool (run it in CI, or before changing imports)
+# The tool is launched once per test (e.g. in containers), so importing its main module must stay fast:
+#   - heavy packages (cloud SDKs, numpy, message queue clients, asyncio) must not be imported by AutoResilMain,
+#     only by the codes which need them
+#   - import time of AutoResilMain (best of several runs, in fresh interpreters) must stay below a budget
+# Exit code: 0 if both checks pass, 1 otherwise.
+
+
+#docstring
+"""This module checks import time of OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+# Constants
+CHECKED_MODULE =                "AutoResilMain"
+IMPORT_TIME_BUDGET_SECONDS =    0.25
+NB_IMPORT_RUNS =                5
+LAZY_MODULES = ["openstack", "keystoneauth1", "novaclient", "requests", "numpy", "kombu", "asyncio", "concurrent.futures"]
+
+# code run in a fresh interpreter: import the checked module, print import time and loaded lazy modules (JSON)
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{"seconds": duration, "loaded": [name for name in {lazy_modules} if name in sys.modules]}}))
+"""
+
+
+######################################################################
+
+def measure_import(module_name=CHECKED_MODULE, lazy_modules=LAZY_MODULES):
+    """Import a module in a fresh interpreter (in this module's directory); return (seconds, loaded lazy modules)."""
+    resiliency_directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([resiliency_directory] + [path for path in
+                                                environment.get("PYTHONPATH", "").split(os.pathsep) if path != ""])
+    probe = IMPORT_PROBE.format(module=module_name, lazy_modules=repr(list(lazy_modules)))
+    completed = subprocess.run([sys.executable, "-c", probe], env=environment,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if completed.returncode != 0:
+        raise RuntimeError("import of " + module_name + " failed:\n" + completed.stderr)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def check_import(module_name=CHECKED_MODULE, budget_seconds=IMPORT_TIME_BUDGET_SECONDS, nb_runs=NB_IMPORT_RUNS):
+    """Run the import checks, print results; return True if they pass."""
+    durations = []
+    loaded_lazy_modules = set()
+    for _ in range(nb_runs):
+        seconds, loaded = measure_import(module_name)
+        durations.append(seconds)
+        loaded_lazy_modules.update(loaded)
+
+    best_seconds = min(durations)
+    print("import", module_name, ": best of", nb_runs, "runs:", round(best_seconds*1000, 1), "ms (budget:",
+          round(budget_seconds*1000, 1), "ms)")
+    passed = True
+    if best_seconds > budget_seconds:
+        print("  FAILED: import time is over budget")
+        passed = False
+    if len(loaded_lazy_modules) > 0:
+        print("  FAILED: modules which must only be imported when needed were imported:", sorted(loaded_lazy_modules))
+        passed = False
+    if passed:
+        print("  OK")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time of the resiliency tool main module")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_SECONDS, metavar="SECONDS",
+                        help="maximum import time (default: " + str(IMPORT_TIME_BUDGET_SECONDS) + ")")
+    parser.add_argument("--runs", type=int, default=NB_IMPORT_RUNS, metavar="N",
+                        help="number of measurements, the best one is kept (default: " + str(NB_IMPORT_RUNS) + ")")
+    parser.add_argument("--module", default=CHECKED_MODULE, help="module to check (default: " + CHECKED_MODULE + ")")
+    parsed_arguments = parser.parse_args()
+    try:
+        passed = check_import(parsed_arguments.module, parsed_arguments.budget, parsed_arguments.runs)
+    except Exception as e:
+        print(type(e), e)
+        sys.exit(1)
+    sys.exit(0 if passed else 1)
+
+if __name__ == "__main__":
+    main()
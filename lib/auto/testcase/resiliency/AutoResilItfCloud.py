@@ -35,12 +35,141 @@
 import AutoResilGlobal
 import time
 
-# for method 1 and 2
-import openstack
-
-#for method 3
+# OpenStack SDK (openstack) is heavy to import: it is imported only when a connection is actually needed
+# (OpenStackConnectionManager.get_connection), not when this module is imported
+# for method 3
 #from openstack import connection
 
+import threading
+from AutoResilMgTrace import tracer
+
+
+# Constants
+OPENSTACK_CLOUD_NAME =          'unh-hpe-openstack-fraser'  # cloud reference (name and region) should be in clouds.yaml file
+OPENSTACK_REGION_NAME =         'RegionOne'
+TOKEN_REFRESH_MARGIN_SECONDS =  300     # re-authenticate when token expires in less than that
+SERVER_STATUS_TIMEOUT =         120.0   # seconds for a server to reach a status after an action (suspend, ...)
+HTTP_POOL_CONNECTIONS =         10      # number of kept-alive connection pools (one per API endpoint host)
+HTTP_POOL_MAXSIZE =             20      # kept-alive connections per endpoint (concurrent requests from worker threads)
+
+
+######################################################################
+
+class OpenStackConnectionManager:
+    """Connection manager for Auto project: one OpenStack SDK connection per (cloud, region), shared by all
+    challenge and test codes (and threads). A connection is authenticated once, keeps its HTTP connections alive,
+    and its token is renewed before it expires, so that challenge and test codes do not re-authenticate
+    (and open new connections) inside timed windows.
+    """
+    def __init__ (self, token_refresh_margin_seconds=TOKEN_REFRESH_MARGIN_SECONDS):
+        self.token_refresh_margin_seconds = token_refresh_margin_seconds
+        self.__connections = {}  # (cloud name, region name) -> openstack.connection.Connection
+        self.__cloud_options = {}  # cloud name -> openstack.connect() arguments, instead of clouds.yaml entry
+        self.__lock = threading.Lock()  # protects the dictionaries above: never held during network round-trips
+        self.__key_locks = {}  # (cloud name, region name) -> lock held while connecting/authenticating to it
+
+    def set_cloud_options(self, cloud_name, **connect_options):
+        """Connect to a cloud name with explicit openstack.connect() arguments (auth_url, username, ...)
+        instead of its clouds.yaml entry (e.g. for a simulator, see AutoResilItfCloudSim);
+        without arguments, go back to clouds.yaml. Open connections to that cloud are closed."""
+        self.close(cloud_name)
+        with self.__lock:
+            if len(connect_options) > 0:
+                self.__cloud_options[cloud_name] = connect_options
+            else:
+                self.__cloud_options.pop(cloud_name, None)
+
+    def get_connection(self, cloud_name=OPENSTACK_CLOUD_NAME, region_name=OPENSTACK_REGION_NAME):
+        """Return an authenticated connection to a cloud region, with a valid token."""
+        key = (cloud_name, region_name)
+        # usual case: connection exists and its token is valid, no lock needed
+        conn = self.__connections.get(key)
+        if conn != None and self.__has_valid_token(conn):
+            return conn
+
+        # connection and authentication are network round-trips: only threads using the same cloud region wait
+        # (they need the result anyway), other ones are not blocked
+        with self.__get_key_lock(key):
+            with self.__lock:
+                conn = self.__connections.get(key)
+                connect_options = self.__cloud_options.get(cloud_name)
+            if conn == None:
+                with tracer.span("cloud connect", cloud=cloud_name, region=region_name):
+                    import openstack
+                    if connect_options != None:
+                        conn = openstack.connect(region_name=region_name, **connect_options)
+                    else:
+                        conn = openstack.connect(cloud=cloud_name, region_name=region_name)
+                    self.__configure_pool(conn)
+                with self.__lock:
+                    self.__connections[key] = conn
+            with tracer.span("cloud token check", cloud=cloud_name, region=region_name):
+                self.__refresh_token(conn)
+            return conn
+
+    def __get_key_lock(self, key):
+        """Return the lock of a (cloud name, region name) key, created on first use."""
+        with self.__lock:
+            key_lock = self.__key_locks.get(key)
+            if key_lock == None:
+                key_lock = threading.Lock()
+                self.__key_locks[key] = key_lock
+            return key_lock
+
+    def __has_valid_token(self, conn):
+        """Return True if the connection has a token which does not expire soon (no network round-trip)."""
+        auth_ref = getattr(conn.session.auth, "auth_ref", None)
+        return auth_ref != None and not auth_ref.will_expire_soon(self.token_refresh_margin_seconds)
+
+    def __configure_pool(self, conn):
+        """Size the keep-alive connection pool of the HTTP session used by the connection."""
+        import requests.adapters  # dependency of openstacksdk (keystoneauth1)
+        http_session = conn.session.session
+        for prefix in ("https://", "http://"):
+            http_session.mount(prefix, requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                                                                      pool_maxsize=HTTP_POOL_MAXSIZE))
+
+    def __refresh_token(self, conn):
+        """Authenticate if not done yet, or re-authenticate if token expires soon."""
+        auth = conn.session.auth
+        access = auth.get_access(conn.session)  # authenticates only if there is no token yet
+        if access.will_expire_soon(self.token_refresh_margin_seconds):
+            auth.invalidate()
+            auth.get_access(conn.session)
+
+    def close(self, cloud_name=None, region_name=None):
+        """Close one connection, all connections to a cloud if no region name is given,
+        or all of them if no cloud name is given."""
+        with self.__lock:
+            for key in list(self.__connections):
+                if cloud_name == None or key == (cloud_name, region_name) or (region_name == None and key[0] == cloud_name):
+                    self.__connections.pop(key).close()
+
+
+# connection manager shared by all challenge and test codes (unless another one is injected)
+openstack_connections = OpenStackConnectionManager()
+
+def wait_for_server_status(conn, server_ID, target_statuses, timeout=SERVER_STATUS_TIMEOUT, failure_statuses=("ERROR",)):
+    """Wait until a server reaches one of target_statuses (e.g. "SUSPENDED"), with a deadline (seconds);
+    return (status, time.monotonic_ns() at which it was observed). See AutoResilRunDetect.wait_for_state."""
+    import AutoResilRunDetect  # asyncio is only needed by codes which wait
+    return AutoResilRunDetect.wait_for_state(lambda: conn.compute.get_server(server_ID).status,
+                                             target_statuses, timeout, failure_statuses)
+
+def wait_for_stable_server_status(conn, server_ID, target_statuses, timeout=SERVER_STATUS_TIMEOUT,
+                                  failure_statuses=("ERROR",)):
+    """Like wait_for_server_status, but also wait until no task is in progress on the server: e.g. a server being
+    suspended is still ACTIVE (task state "suspending") until it becomes SUSPENDED."""
+    import AutoResilRunDetect  # asyncio is only needed by codes which wait
+
+    def get_stable_status():
+        server = conn.compute.get_server(server_ID)
+        if server.task_state != None:
+            return server.status + " (" + server.task_state + ")"  # transitional: never a target status
+        return server.status
+
+    return AutoResilRunDetect.wait_for_state(get_stable_status, target_statuses, timeout, failure_statuses)
+
 def openstack_list_servers(conn):
     """List OpenStack servers."""
     # see https://docs.openstack.org/python-openstacksdk/latest/user/proxies/compute.html
@@ -160,7 +289,8 @@ def gdtest_openstack():
     #conn = openstack.connect(cloud='armopenstack', region_name='RegionOne')
     #conn = openstack.connect(cloud='hpe16openstackEuphrates', region_name='RegionOne')
     #conn = openstack.connect(cloud='hpe16openstackFraser', region_name='RegionOne')
-    conn = openstack.connect(cloud='unh-hpe-openstack-fraser', region_name='RegionOne')
+    #conn = openstack.connect(cloud='unh-hpe-openstack-fraser', region_name='RegionOne')
+    conn = openstack_connections.get_connection(OPENSTACK_CLOUD_NAME, OPENSTACK_REGION_NAME)  # shared, authenticated connection
     # if getting error: AttributeError: module 'openstack' has no attribute 'connect', check that openstack is installed for this python version
 
 
@@ -215,18 +345,17 @@ def gdtest_openstack():
     print('\ngds.name=',gds.name)
     print('gds.status=',gds.status)
     print('suspending...')
+    request_ns = time.monotonic_ns()
     conn.compute.suspend_server(gds_ID)  # NOT synchronous: returns before suspension action is completed
-    wait_seconds = 10
-    print('  waiting',wait_seconds,'seconds...')
-    time.sleep(wait_seconds)
-    gds = conn.compute.get_server(gds_ID)  # need to refresh data; not maintained live
-    print('gds.status=',gds.status)
+    print('  waiting for SUSPENDED status...')
+    status, observed_ns = wait_for_server_status(conn, gds_ID, ["SUSPENDED"])
+    print('gds.status=',status,' after',(observed_ns - request_ns)/1e9,'s')
     print('resuming...')
+    request_ns = time.monotonic_ns()
     conn.compute.resume_server(gds_ID)
-    print('  waiting',wait_seconds,'seconds...')
-    time.sleep(wait_seconds)
-    gds = conn.compute.get_server(gds_ID)  # need to refresh data; not maintained live
-    print('gds.status=',gds.status)
+    print('  waiting for ACTIVE status...')
+    status, observed_ns = wait_for_server_status(conn, gds_ID, ["ACTIVE"])
+    print('gds.status=',status,' after',(observed_ns - request_ns)/1e9,'s')
 
 
 
@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: offline OpenStack API simulator, to run and benchmark the harness without a real cloud
+# A local HTTP server (standard library only) answering the OpenStack APIs used by challenge and test codes:
+#   - identity (Keystone v3): version discovery, password authentication (token + service catalog), domains/projects/users
+#   - compute (Nova v2.1): servers (list, detail, create, delete, actions: suspend/resume, stop/start, pause/unpause,
+#     reboot), flavors
+#   - network (Neutron v2.0): networks, ports
+#   - block storage (Cinder v3): volumes (list, detail, create, delete)
+#   - image (Glance v2): empty image list
+# Behaviour is configurable: per-call latency (per service, with jitter), delays of state transitions
+# (e.g. SUSPENDED->ACTIVE after a resume), token lifetime, and failure injection (HTTP errors or dropped
+# connections, by service/method/path, with a probability and a count).
+# Transitions happen in real time (a scheduler thread), and can be published as Nova notifications to an event
+# source (e.g. AutoResilRunDetect.LocalEventQueue), for NotificationDetector.
+# Use:
+#   - OpenStack SDK / AutoResilItfCloud: simulator.install() points a connection manager (cloud name) at the simulator
+#   - openstack_lib (python clients): environment variables from get_openrc_environment() (OS_AUTH_URL, ...)
+#   - command line: python3 AutoResilItfCloudSim.py [port] prints "export OS_..." lines and serves until interrupted
+
+
+#docstring
+"""This module contains an offline OpenStack API simulator for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import heapq
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Constants
+SIM_HOST =                  "127.0.0.1"
+SIM_REGION_NAME =           "RegionOne"
+SIM_USER_NAME =             "admin"
+SIM_PASSWORD =              "secret"
+SIM_PROJECT_NAME =          "admin"
+SIM_DOMAIN_NAME =           "Default"
+SIM_DOMAIN_ID =             "default"
+SIM_TOKEN_LIFETIME =        3600.0  # seconds
+SIM_SERVICES =              ("identity", "compute", "network", "block-storage", "image")
+# first path segment of each service, and its versioned path segment
+SERVICE_PATHS = {"identity": "identity", "compute": "compute", "network": "network", "volume": "block-storage", "image": "image"}
+SERVICE_VERSIONS = {"identity": "v3", "compute": "v2.1", "network": "v2.0", "block-storage": "v3", "image": "v2"}
+NANOSECONDS_PER_SECOND =    1000000000
+
+# default delays (seconds) of state transitions: action -> (transitional task state, delay, final status)
+DEFAULT_SERVER_TRANSITIONS = {
+    "create":   ("spawning",      1.0, "ACTIVE"),
+    "suspend":  ("suspending",    0.5, "SUSPENDED"),
+    "resume":   ("resuming",      2.0, "ACTIVE"),
+    "os-stop":  ("powering-off",  1.0, "SHUTOFF"),
+    "os-start": ("powering-on",   1.0, "ACTIVE"),
+    "pause":    ("pausing",       0.5, "PAUSED"),
+    "unpause":  ("unpausing",     0.5, "ACTIVE"),
+    "reboot":   ("rebooting",     3.0, "ACTIVE"),
+    "delete":   ("deleting",      0.5, None),       # None: resource disappears
+}
+# server actions: action -> statuses from which it is allowed
+SERVER_ACTION_SOURCES = {
+    "suspend":  ("ACTIVE",),
+    "resume":   ("SUSPENDED",),
+    "os-stop":  ("ACTIVE", "PAUSED", "SUSPENDED"),
+    "os-start": ("SHUTOFF",),
+    "pause":    ("ACTIVE",),
+    "unpause":  ("PAUSED",),
+    "reboot":   ("ACTIVE", "SHUTOFF"),
+}
+# Nova vm_state and power_state of server statuses
+SERVER_STATES = {
+    "BUILD":        ("building",  0),
+    "ACTIVE":       ("active",    1),
+    "SUSPENDED":    ("suspended", 7),
+    "SHUTOFF":      ("stopped",   4),
+    "PAUSED":       ("paused",    3),
+    "REBOOT":       ("active",    1),
+}
+DEFAULT_VOLUME_TRANSITIONS = {
+    "create":   ("creating",      1.0, "available"),
+    "delete":   ("deleting",      0.5, None),
+}
+
+
+######################################################################
+
+def get_iso_time(timestamp_ns=None):
+    """Return an OpenStack-style UTC time string (e.g. 2018-06-01T10:00:00Z), now or for a time.time_ns() value."""
+    if timestamp_ns == None:
+        timestamp_ns = time.time_ns()
+    return datetime.fromtimestamp(timestamp_ns / NANOSECONDS_PER_SECOND, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FailureRule:
+    """Failure injected into matching API calls: HTTP error status (0: connection dropped without response),
+    with a probability, for a number of calls (None: unlimited), optionally after an extra delay (seconds)."""
+    def __init__ (self, rule_service=None, rule_method=None, rule_pathPattern=None, rule_status=503,
+                  rule_probability=1.0, rule_count=None, rule_delay=0.0):
+        self.service = rule_service
+        self.method = rule_method
+        self.path_pattern = re.compile(rule_pathPattern) if rule_pathPattern != None else None
+        self.status = rule_status
+        self.probability = rule_probability
+        self.remaining = rule_count
+        self.delay = rule_delay
+        self.nb_injected = 0
+
+    def matches(self, service, method, path):
+        if self.remaining != None and self.remaining <= 0:
+            return False
+        if self.service != None and self.service != service:
+            return False
+        if self.method != None and self.method != method:
+            return False
+        if self.path_pattern != None and self.path_pattern.search(path) == None:
+            return False
+        return True
+
+
+class CloudSimulator:
+    """Simulated OpenStack cloud for Auto project (one region, one project), served over HTTP on a local port.
+    Resources are dictionaries in API format; state transitions happen after configurable delays."""
+    def __init__ (self, sim_port=0, sim_host=SIM_HOST, sim_latency=0.0, sim_latencyJitter=0.0, sim_seed=None,
+                  sim_eventSource=None, sim_tokenLifetime=SIM_TOKEN_LIFETIME):
+        self.host = sim_host
+        self.port = sim_port
+        self.latency = {service: sim_latency for service in SIM_SERVICES}  # seconds added to each call
+        self.latency_jitter = sim_latencyJitter  # uniform random extra latency, up to that many seconds
+        self.random = random.Random(sim_seed)
+        self.event_source = sim_eventSource  # publish(message) receives Nova notifications of transitions
+        self.token_lifetime = sim_tokenLifetime
+        self.server_transitions = dict(DEFAULT_SERVER_TRANSITIONS)
+        self.volume_transitions = dict(DEFAULT_VOLUME_TRANSITIONS)
+        self.failure_rules = []
+        self.request_counts = {}  # (service, method) -> number of calls
+        self.transition_log = []  # (kind, resource ID, action, time.monotonic_ns() of transition end)
+        self.project_ID = uuid.uuid4().hex
+        self.user_ID = uuid.uuid4().hex
+
+        self.servers = {}
+        self.volumes = {}
+        self.networks = {}
+        self.flavors = {"1": {"id": "1", "name": "m1.small", "vcpus": 1, "ram": 2048, "disk": 20}}
+        self.__tokens = {}  # token -> expiry (time.time_ns())
+
+        self.__lock = threading.RLock()
+        self.__transitions = []  # heap of (due monotonic ns, sequence, kind, resource ID, action)
+        self.__transition_condition = threading.Condition(self.__lock)
+        self.__sequence = 0
+        self.__http_server = None
+        self.__threads = []
+        self.__stopping = False
+
+    ##################################################################
+    # life cycle
+
+    def start(self):
+        """Start serving (in background threads); return the base URL."""
+        self.__stopping = False
+        self.__http_server = ThreadingHTTPServer((self.host, self.port), SimulatorRequestHandler)
+        self.__http_server.daemon_threads = True
+        self.__http_server.simulator = self
+        self.port = self.__http_server.server_address[1]
+        self.__threads = [threading.Thread(target=self.__http_server.serve_forever, name="CloudSimulatorHTTP", daemon=True),
+                          threading.Thread(target=self.__run_transitions, name="CloudSimulatorTransitions", daemon=True)]
+        for thread in self.__threads:
+            thread.start()
+        return self.get_base_URL()
+
+    def stop(self):
+        with self.__lock:
+            self.__stopping = True
+            self.__transition_condition.notify()
+        if self.__http_server != None:
+            self.__http_server.shutdown()
+            self.__http_server.server_close()
+            self.__http_server = None
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def get_base_URL(self):
+        return "http://" + self.host + ":" + str(self.port)
+
+    def get_auth_URL(self):
+        return self.get_base_URL() + "/identity/v3"
+
+    def get_connect_options(self):
+        """Return openstack.connect() keyword arguments for this simulator (instead of a clouds.yaml entry)."""
+        return {"auth_url":             self.get_auth_URL(),
+                "username":             SIM_USER_NAME,
+                "password":             SIM_PASSWORD,
+                "project_name":         SIM_PROJECT_NAME,
+                "user_domain_name":     SIM_DOMAIN_NAME,
+                "project_domain_name":  SIM_DOMAIN_NAME,
+                "identity_api_version": "3"}
+
+    def get_openrc_environment(self):
+        """Return environment variables (openrc) for this simulator, as used by openstack_lib and OpenStack clients."""
+        return {"OS_AUTH_URL":              self.get_auth_URL(),
+                "OS_IDENTITY_API_VERSION":  "3",
+                "OS_USERNAME":              SIM_USER_NAME,
+                "OS_PASSWORD":              SIM_PASSWORD,
+                "OS_PROJECT_NAME":          SIM_PROJECT_NAME,
+                "OS_USER_DOMAIN_NAME":      SIM_DOMAIN_NAME,
+                "OS_PROJECT_DOMAIN_NAME":   SIM_DOMAIN_NAME,
+                "OS_REGION_NAME":           SIM_REGION_NAME,
+                "OS_INTERFACE":             "public"}
+
+    def install(self, connection_manager=None, cloud_name=None):
+        """Make a connection manager (default: AutoResilItfCloud.openstack_connections) connect to this simulator
+        for a cloud name (default: the cloud used by challenge and test codes)."""
+        import AutoResilItfCloud
+        if connection_manager == None:
+            connection_manager = AutoResilItfCloud.openstack_connections
+        if cloud_name == None:
+            cloud_name = AutoResilItfCloud.OPENSTACK_CLOUD_NAME
+        connection_manager.set_cloud_options(cloud_name, **self.get_connect_options())
+
+    ##################################################################
+    # configuration and resources
+
+    def set_latency(self, seconds, service=None):
+        """Set latency added to each call (seconds), for one service or all of them."""
+        for latency_service in SIM_SERVICES if service == None else (service,):
+            self.latency[latency_service] = seconds
+
+    def set_transition_delay(self, action, seconds, kind="server"):
+        """Set the delay (seconds) of a state transition, e.g. ("resume", 5.0) for SUSPENDED->ACTIVE."""
+        transitions = self.server_transitions if kind == "server" else self.volume_transitions
+        task_state, _, final_status = transitions[action]
+        transitions[action] = (task_state, seconds, final_status)
+
+    def inject_failure(self, service=None, method=None, path_pattern=None, status=503,
+                       probability=1.0, count=None, delay=0.0):
+        """Add a failure rule (see FailureRule); return it (its nb_injected counts injected failures)."""
+        rule = FailureRule(service, method, path_pattern, status, probability, count, delay)
+        with self.__lock:
+            self.failure_rules.append(rule)
+        return rule
+
+    def clear_failures(self):
+        with self.__lock:
+            self.failure_rules = []
+
+    def add_server(self, server_name, server_ID=None, server_status="ACTIVE"):
+        """Add a server (e.g. with TEST_VM_ID as ID); return its ID."""
+        if server_ID == None:
+            server_ID = str(uuid.uuid4())
+        now = get_iso_time()
+        server = {"id": server_ID, "name": server_name, "status": server_status,
+                  "tenant_id": self.project_ID, "user_id": self.user_ID, "hostId": uuid.uuid4().hex,
+                  "created": now, "updated": now, "flavor": {"id": "1"}, "image": {"id": ""},
+                  "addresses": {}, "metadata": {}, "OS-EXT-STS:task_state": None,
+                  "links": [{"rel": "self", "href": self.get_base_URL() + "/compute/v2.1/servers/" + server_ID}]}
+        self.__set_server_status(server, server_status)
+        with self.__lock:
+            self.servers[server_ID] = server
+        return server_ID
+
+    def add_network(self, network_name, network_ID=None):
+        if network_ID == None:
+            network_ID = str(uuid.uuid4())
+        with self.__lock:
+            self.networks[network_ID] = {"id": network_ID, "name": network_name, "status": "ACTIVE",
+                                         "admin_state_up": True, "shared": False, "subnets": [],
+                                         "tenant_id": self.project_ID, "project_id": self.project_ID}
+        return network_ID
+
+    def add_volume(self, volume_name, volume_size=1, volume_ID=None, volume_status="available"):
+        if volume_ID == None:
+            volume_ID = str(uuid.uuid4())
+        with self.__lock:
+            self.volumes[volume_ID] = {"id": volume_ID, "name": volume_name, "size": volume_size,
+                                       "status": volume_status, "created_at": get_iso_time(), "attachments": [],
+                                       "availability_zone": "nova", "bootable": "false", "encrypted": False,
+                                       "volume_type": "lvmdriver-1", "metadata": {},
+                                       "os-vol-tenant-attr:tenant_id": self.project_ID,
+                                       "links": [{"rel": "self", "href": self.get_base_URL() + "/volume/v3/" +
+                                                  self.project_ID + "/volumes/" + volume_ID}]}
+        return volume_ID
+
+    def get_server_status(self, server_ID):
+        """Return status of a server (None if it does not exist)."""
+        with self.__lock:
+            server = self.servers.get(server_ID)
+            return None if server == None else server["status"]
+
+    def get_transition_instants(self, resource_ID, action):
+        """Return time.monotonic_ns() instants at which transitions of a resource ended (e.g. actual restoration
+        instants of a VM for action "resume": reference for detection accuracy)."""
+        with self.__lock:
+            return [end_ns for _, logged_ID, logged_action, end_ns in self.transition_log
+                    if logged_ID == resource_ID and logged_action == action]
+
+    def get_request_count(self, service=None, method=None):
+        """Return the number of API calls received, optionally for one service and/or HTTP method."""
+        with self.__lock:
+            return sum(count for (count_service, count_method), count in self.request_counts.items()
+                       if (service == None or service == count_service) and (method == None or method == count_method))
+
+    ##################################################################
+    # state transitions
+
+    def __set_server_status(self, server, status):
+        server["status"] = status
+        vm_state, power_state = SERVER_STATES.get(status, (status.lower(), 0))
+        server["OS-EXT-STS:vm_state"] = vm_state
+        server["OS-EXT-STS:power_state"] = power_state
+        server["updated"] = get_iso_time()
+
+    def __schedule_transition(self, kind, resource_ID, action, delay):
+        """Schedule the end of a transition (caller holds the lock)."""
+        self.__sequence += 1
+        heapq.heappush(self.__transitions, (time.monotonic_ns() + int(delay * NANOSECONDS_PER_SECOND),
+                                            self.__sequence, kind, resource_ID, action))
+        self.__transition_condition.notify()
+
+    def __run_transitions(self):
+        """Scheduler thread: end transitions when they are due."""
+        with self.__lock:
+            while not self.__stopping:
+                if len(self.__transitions) == 0:
+                    self.__transition_condition.wait()
+                    continue
+                wait_ns = self.__transitions[0][0] - time.monotonic_ns()
+                if wait_ns > 0:
+                    self.__transition_condition.wait(wait_ns / NANOSECONDS_PER_SECOND)
+                    continue
+                _, _, kind, resource_ID, action = heapq.heappop(self.__transitions)
+                self.__end_transition(kind, resource_ID, action)
+
+    def __end_transition(self, kind, resource_ID, action):
+        self.transition_log.append((kind, resource_ID, action, time.monotonic_ns()))
+        if kind == "server":
+            server = self.servers.get(resource_ID)
+            if server == None:
+                return
+            final_status = self.server_transitions[action][2]
+            if final_status == None:
+                del self.servers[resource_ID]
+                self.__publish_server_event(server, action, "deleted")
+                return
+            server["OS-EXT-STS:task_state"] = None
+            self.__set_server_status(server, final_status)
+            self.__publish_server_event(server, action, server["OS-EXT-STS:vm_state"])
+        else:
+            volume = self.volumes.get(resource_ID)
+            if volume == None:
+                return
+            final_status = self.volume_transitions[action][2]
+            if final_status == None:
+                del self.volumes[resource_ID]
+            else:
+                volume["status"] = final_status
+
+    def __publish_server_event(self, server, action, state):
+        """Publish a Nova versioned notification (instance.<action>.end) to the event source, if any."""
+        if self.event_source == None:
+            return
+        event_name = {"os-stop": "power_off", "os-start": "power_on"}.get(action, action)
+        self.event_source.publish({"event_type": "instance." + event_name + ".end",
+                                   "priority": "INFO",
+                                   "publisher_id": "nova-compute:simulator",
+                                   "timestamp": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=" "),
+                                   "payload": {"nova_object.name": "InstanceActionPayload",
+                                               "nova_object.data": {"uuid": server["id"],
+                                                                    "display_name": server["name"],
+                                                                    "state": state}}})
+
+    ##################################################################
+    # request handling (independent of HTTP: used by SimulatorRequestHandler)
+
+    def get_latency(self, service):
+        latency = self.latency.get(service, 0.0)
+        if self.latency_jitter > 0:
+            latency += self.random.uniform(0.0, self.latency_jitter)
+        return latency
+
+    def get_injected_failure(self, service, method, path):
+        """Return the failure rule to apply to a call, or None."""
+        with self.__lock:
+            for rule in self.failure_rules:
+                if rule.matches(service, method, path) and self.random.random() < rule.probability:
+                    if rule.remaining != None:
+                        rule.remaining -= 1
+                    rule.nb_injected += 1
+                    return rule
+        return None
+
+    def handle_request(self, method, path, headers, body):
+        """Answer an API call; return (HTTP status, extra headers, JSON-able body or None)."""
+        path = path.split("?", 1)[0].rstrip("/")
+        parts = path.strip("/").split("/")
+        service = SERVICE_PATHS.get(parts[0])
+        if service == None:
+            return 404, {}, {"error": {"code": 404, "message": "Unknown service: " + path}}
+        with self.__lock:
+            self.request_counts[(service, method)] = self.request_counts.get((service, method), 0) + 1
+
+        # version discovery documents need no token (block storage: also with the project ID of the catalog URL)
+        if method == "GET" and (len(parts) == 1 or (parts[1] == SERVICE_VERSIONS[service] and
+                                (len(parts) == 2 or parts[2:] == [self.project_ID]))):
+            return self.__get_version_document(service, len(parts) > 1)
+        if service == "identity" and parts[1:] == ["v3", "auth", "tokens"] and method == "POST":
+            return self.__authenticate(body)
+        if not self.__is_token_valid(headers.get("X-Auth-Token")):
+            return 401, {}, {"error": {"code": 401, "title": "Unauthorized",
+                                       "message": "The request you have made requires authentication."}}
+
+        with self.__lock:
+            if service == "identity":
+                return self.__handle_identity(method, parts[2:], headers)
+            if service == "compute":
+                return self.__handle_compute(method, parts[2:], body)
+            if service == "network":
+                return self.__handle_network(method, parts[2:])
+            if service == "block-storage":
+                return self.__handle_block_storage(method, parts[3:], body)
+            if parts[1:] == ["v2", "images"]:
+                return 200, {}, {"images": []}
+        return 404, {}, {"error": {"code": 404, "message": "Not found: " + path}}
+
+    def __get_version_document(self, service, versioned):
+        base = self.get_base_URL()
+        versions = {"identity":      ("v3.14", base + "/identity/v3/", {}),
+                    "compute":       ("v2.1",  base + "/compute/v2.1/", {"version": "2.79", "min_version": "2.1"}),
+                    "network":       ("v2.0",  base + "/network/v2.0/", {}),
+                    "block-storage": ("v3.0",  base + "/volume/v3/", {"version": "3.60", "min_version": "3.0"}),
+                    "image":         ("v2.6",  base + "/image/v2/", {})}
+        version_ID, href, microversions = versions[service]
+        version = {"id": version_ID, "status": "stable" if service == "identity" else "CURRENT",
+                   "updated": "2018-06-01T00:00:00Z", "links": [{"rel": "self", "href": href}],
+                   "media-types": [{"base": "application/json", "type": "application/json"}]}
+        version.update(microversions)
+        if versioned:
+            return 200, {}, {"version": version}
+        if service == "identity":
+            return 300, {}, {"versions": {"values": [version]}}
+        return 200 if service != "image" else 300, {}, {"versions": [version]}
+
+    def __get_catalog(self):
+        base = self.get_base_URL()
+        def entry(service_type, service_name, URL):
+            return {"type": service_type, "name": service_name, "id": uuid.uuid5(uuid.NAMESPACE_URL, service_type).hex,
+                    "endpoints": [{"id": uuid.uuid5(uuid.NAMESPACE_URL, URL + interface).hex, "interface": interface,
+                                   "region": SIM_REGION_NAME, "region_id": SIM_REGION_NAME, "url": URL}
+                                  for interface in ("public", "internal", "admin")]}
+        return [entry("identity", "keystone", base + "/identity"),
+                entry("compute", "nova", base + "/compute/v2.1"),
+                entry("network", "neutron", base + "/network"),
+                entry("block-storage", "cinder", base + "/volume/v3/" + self.project_ID),
+                entry("volumev3", "cinderv3", base + "/volume/v3/" + self.project_ID),
+                entry("image", "glance", base + "/image")]
+
+    def __authenticate(self, body):
+        try:
+            password = body["auth"]["identity"]["password"]["user"]
+            valid = password.get("name", SIM_USER_NAME) == SIM_USER_NAME and password["password"] == SIM_PASSWORD
+        except (KeyError, TypeError):
+            valid = False
+        if not valid:
+            return 401, {}, {"error": {"code": 401, "title": "Unauthorized", "message": "Invalid credentials."}}
+        token = uuid.uuid4().hex
+        issued_ns = time.time_ns()
+        expires_ns = issued_ns + int(self.token_lifetime * NANOSECONDS_PER_SECOND)
+        with self.__lock:
+            self.__tokens[token] = expires_ns
+        domain = {"id": SIM_DOMAIN_ID, "name": SIM_DOMAIN_NAME}
+        return 201, {"X-Subject-Token": token}, {"token": {
+            "methods": ["password"],
+            "issued_at": get_iso_time(issued_ns).replace("Z", ".000000Z"),
+            "expires_at": get_iso_time(expires_ns).replace("Z", ".000000Z"),
+            "user": {"id": self.user_ID, "name": SIM_USER_NAME, "domain": domain, "password_expires_at": None},
+            "project": {"id": self.project_ID, "name": SIM_PROJECT_NAME, "domain": domain},
+            "roles": [{"id": uuid.uuid5(uuid.NAMESPACE_URL, "admin").hex, "name": "admin"}],
+            "is_domain": False,
+            "catalog": self.__get_catalog()}}
+
+    def __is_token_valid(self, token):
+        with self.__lock:
+            expires_ns = self.__tokens.get(token)
+        return expires_ns != None and expires_ns > time.time_ns()
+
+    def __handle_identity(self, method, parts, headers):
+        domain = {"id": SIM_DOMAIN_ID, "name": SIM_DOMAIN_NAME, "enabled": True, "description": ""}
+        if method == "GET" and parts == ["auth", "tokens"]:
+            return (200, {"X-Subject-Token": headers.get("X-Subject-Token")}, {}) \
+                if self.__is_token_valid(headers.get("X-Subject-Token")) else (404, {}, {"error": {"code": 404}})
+        if method == "GET" and parts == ["domains"]:
+            return 200, {}, {"domains": [domain]}
+        if method == "GET" and parts == ["projects"]:
+            return 200, {}, {"projects": [{"id": self.project_ID, "name": SIM_PROJECT_NAME, "domain_id": SIM_DOMAIN_ID,
+                                           "enabled": True, "is_domain": False, "description": ""}]}
+        if method == "GET" and parts == ["users"]:
+            return 200, {}, {"users": [{"id": self.user_ID, "name": SIM_USER_NAME, "domain_id": SIM_DOMAIN_ID,
+                                        "enabled": True}]}
+        return 404, {}, {"error": {"code": 404, "message": "Not found"}}
+
+    def __handle_compute(self, method, parts, body):
+        def not_found():
+            return 404, {}, {"itemNotFound": {"code": 404, "message": "Instance could not be found."}}
+
+        if len(parts) >= 1 and parts[0] == "flavors":
+            if len(parts) == 1 or parts[1] == "detail":
+                return 200, {}, {"flavors": list(self.flavors.values())}
+            if parts[1] in self.flavors:
+                return 200, {}, {"flavor": self.flavors[parts[1]]}
+            return 404, {}, {"itemNotFound": {"code": 404, "message": "Flavor could not be found."}}
+        if len(parts) == 0 or parts[0] != "servers":
+            return 404, {}, {"itemNotFound": {"code": 404, "message": "Not found."}}
+
+        if len(parts) == 1 and method == "GET":
+            return 200, {}, {"servers": [{"id": server["id"], "name": server["name"], "links": server["links"]}
+                                         for server in self.servers.values()]}
+        if len(parts) == 2 and parts[1] == "detail" and method == "GET":
+            return 200, {}, {"servers": list(self.servers.values())}
+        if len(parts) == 1 and method == "POST":
+            request = (body or {}).get("server", {})
+            server_ID = self.add_server(request.get("name", "server"), server_status="BUILD")
+            self.servers[server_ID]["OS-EXT-STS:task_state"] = self.server_transitions["create"][0]
+            self.__schedule_transition("server", server_ID, "create", self.server_transitions["create"][1])
+            return 202, {}, {"server": {"id": server_ID, "links": self.servers[server_ID]["links"],
+                                        "adminPass": uuid.uuid4().hex[:12]}}
+
+        server = self.servers.get(parts[1])
+        if server == None:
+            return not_found()
+        if len(parts) == 2 and method == "GET":
+            return 200, {}, {"server": server}
+        if len(parts) == 2 and method == "DELETE":
+            server["OS-EXT-STS:task_state"] = self.server_transitions["delete"][0]
+            self.__schedule_transition("server", server["id"], "delete", self.server_transitions["delete"][1])
+            return 204, {}, None
+        if len(parts) == 3 and parts[2] == "action" and method == "POST":
+            action = next(iter(body or {}), None)
+            if action not in SERVER_ACTION_SOURCES:
+                return 400, {}, {"badRequest": {"code": 400, "message": "Unsupported action: " + str(action)}}
+            if server["status"] not in SERVER_ACTION_SOURCES[action] or server["OS-EXT-STS:task_state"] != None:
+                return 409, {}, {"conflictingRequest": {"code": 409, "message":
+                                 "Cannot '" + action + "' instance " + server["id"] + " while it is in vm_state " +
+                                 server["OS-EXT-STS:vm_state"]}}
+            task_state, delay, _ = self.server_transitions[action]
+            server["OS-EXT-STS:task_state"] = task_state
+            if action == "reboot":
+                self.__set_server_status(server, "REBOOT")
+            self.__schedule_transition("server", server["id"], action, delay)
+            return 202, {}, None
+        return not_found()
+
+    def __handle_network(self, method, parts):
+        if method != "GET" or len(parts) < 1:
+            return 404, {}, {"NeutronError": {"type": "HTTPNotFound", "message": "Not found", "detail": ""}}
+        parts = [part[:-5] if part.endswith(".json") else part for part in parts]
+        if parts == ["networks"]:
+            return 200, {}, {"networks": list(self.networks.values())}
+        if len(parts) == 2 and parts[0] == "networks" and parts[1] in self.networks:
+            return 200, {}, {"network": self.networks[parts[1]]}
+        if parts == ["ports"]:
+            return 200, {}, {"ports": []}
+        return 404, {}, {"NeutronError": {"type": "NetworkNotFound", "message": "Not found", "detail": ""}}
+
+    def __handle_block_storage(self, method, parts, body):
+        def not_found():
+            return 404, {}, {"itemNotFound": {"code": 404, "message": "Volume could not be found."}}
+
+        if len(parts) == 0 or parts[0] != "volumes":
+            return not_found()
+        if len(parts) == 1 and method == "GET":
+            return 200, {}, {"volumes": [{"id": volume["id"], "name": volume["name"], "links": volume["links"]}
+                                         for volume in self.volumes.values()]}
+        if len(parts) == 2 and parts[1] == "detail" and method == "GET":
+            return 200, {}, {"volumes": list(self.volumes.values())}
+        if len(parts) == 1 and method == "POST":
+            request = (body or {}).get("volume", {})
+            volume_ID = self.add_volume(request.get("name"), request.get("size", 1),
+                                        volume_status=self.volume_transitions["create"][0])
+            self.__schedule_transition("volume", volume_ID, "create", self.volume_transitions["create"][1])
+            return 202, {}, {"volume": self.volumes[volume_ID]}
+
+        volume = self.volumes.get(parts[1])
+        if volume == None:
+            return not_found()
+        if len(parts) == 2 and method == "GET":
+            return 200, {}, {"volume": volume}
+        if len(parts) == 2 and method == "DELETE":
+            volume["status"] = self.volume_transitions["delete"][0]
+            self.__schedule_transition("volume", volume["id"], "delete", self.volume_transitions["delete"][1])
+            return 202, {}, None
+        return not_found()
+
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    """HTTP plumbing of CloudSimulator: keep-alive connections, JSON bodies, latency and failure injection."""
+    protocol_version = "HTTP/1.1"
+    server_version = "AutoResilCloudSimulator/1.0"
+
+    def log_message(self, format, *args):
+        pass  # no access log on standard error
+
+    def __handle(self, method):
+        simulator = self.server.simulator
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > 0:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = None
+
+        service = SERVICE_PATHS.get(self.path.strip("/").split("/")[0])
+        latency = simulator.get_latency(service)
+        rule = simulator.get_injected_failure(service, method, self.path)
+        if rule != None:
+            latency += rule.delay
+        if latency > 0:
+            time.sleep(latency)
+
+        if rule != None:
+            if rule.status == 0:
+                self.close_connection = True  # connection dropped, no response
+                return
+            status, headers, response = rule.status, {}, {"error": {"code": rule.status, "message": "Injected failure"}}
+        else:
+            status, headers, response = simulator.handle_request(method, self.path, self.headers, body)
+
+        data = b"" if response == None else json.dumps(response).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if response != None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Openstack-Request-Id", "req-" + str(uuid.uuid4()))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.__handle("GET")
+
+    def do_POST(self):
+        self.__handle("POST")
+
+    def do_PUT(self):
+        self.__handle("PUT")
+
+    def do_DELETE(self):
+        self.__handle("DELETE")
+
+
+######################################################################
+
+def main():
+    """Serve a simulator with one test VM (TEST_VM_ID of challenge code 005), until interrupted."""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    simulator = CloudSimulator(port)
+    simulator.add_server("test-VM", "5d07da11-0e85-4256-9894-482dcee4a5f0")  # AutoResilMgTestDef.TEST_VM_ID
+    simulator.add_network("test-network")
+    simulator.start()
+    for name, value in simulator.get_openrc_environment().items():
+        print("export " + name + "=" + value)
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -33,7 +33,10 @@
 # 1) select a test definition to run
 # 2) view definition of selected test (pull all data from definition files)
 # 3) start test
-# 4) exit
+# 4) start several tests in parallel
+# 5) exit
+# or, with command-line arguments, headless batch mode (no menu): run test definitions (repeated, in parallel),
+# write one JSON line per execution, exit code tells if all executions succeeded; see parse_arguments, or -h
 
 
 #docstring
@@ -47,11 +50,22 @@ Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
 ######################################################################
 # import statements
 import AutoResilGlobal
+import argparse
+import contextlib
+import json
 from AutoResilMgTestDef import *
+from AutoResilRunTest import run_test_defs_in_parallel, SCHEDULER_MAX_WORKERS, TestScheduler
+from AutoResilMgTrace import tracer
 
 # Constants
 PROJECT_NAME = "Auto"
 USE_CASE_NAME = "Resilience Improvements Through ONAP"
+INCREMENTAL_INIT = True  # False: rebuild and rewrite all definition files at each launch
+
+# exit codes in headless batch mode
+EXIT_SUCCESS =          0   # all executions succeeded
+EXIT_FAILURE =          1   # at least one execution failed
+EXIT_USAGE_ERROR =      2   # incorrect arguments (same as argparse)
 
 
 
@@ -67,7 +81,8 @@ def show_menu(selected_test_def_ID):
     print("1: select Test Definition ID")
     print("2: view currently selected Test Definition details")
     print("3: start an execution of currently selected Test Definition")
-    print("4: exit")
+    print("4: start executions of several Test Definitions in parallel")
+    print("5: exit")
 
 
 def get_menu_choice():
@@ -78,8 +93,8 @@ def get_menu_choice():
         except ValueError:
             print("  Invalid choice (must be an integer). Try again.")
             continue
-        if user_choice < 1 or user_choice > 4:
-            print("  Invalid choice (must be between 1 and 4). Try again.")
+        if user_choice < 1 or user_choice > 5:
+            print("  Invalid choice (must be between 1 and 5). Try again.")
             continue
         else:
             return user_choice
@@ -109,26 +124,148 @@ def get_test_def_ID():
             continue
 
 
+def get_test_def_ID_list():
+    """Get a user input (a list of test definition IDs, separated by commas)."""
+    while True:
+        try:
+            user_test_def_ID_list = [int(ID) for ID in input("    Test Definition IDs (comma-separated): ").split(",")]
+        except ValueError:
+            print("    Invalid choice (must be integers separated by commas). Try again.")
+            continue
+
+        test_defs = read_list_bin(FILE_TEST_DEFINITIONS)
+        if (test_defs == None) or (test_defs==[]):
+            print("Problem with test definition file: empty")
+            sys.exit()  # stop entire program, because test definition file MUST be correct
+
+        unknown_IDs = [ID for ID in user_test_def_ID_list if not index_already_there(ID, test_defs)]
+        if len(unknown_IDs) == 0:
+            return user_test_def_ID_list
+        else:
+            print("Invalid choice (Test Definition IDs",unknown_IDs,"do not exist). Try again.")
+            continue
+
+
+
+######################################################################
+def parse_arguments(arguments=None):
+    """Parse command-line arguments for headless batch mode (argparse exits with EXIT_USAGE_ERROR if incorrect)."""
+    parser = argparse.ArgumentParser(description=PROJECT_NAME + " " + USE_CASE_NAME + ": run test definitions without menu, "
+                                                 "write one JSON line per execution (without arguments: interactive menu)")
+    parser.add_argument("test_def_IDs", metavar="TEST_DEF_ID", type=int, nargs="+",
+                        help="ID of a test definition to run")
+    parser.add_argument("-n", "--repeat", type=int, default=1, metavar="N",
+                        help="number of executions of each test definition (default: 1)")
+    parser.add_argument("-p", "--parallel", type=int, default=SCHEDULER_MAX_WORKERS, metavar="N",
+                        help="maximum number of executions at the same time; conflicting ones are never "
+                             "run together (default: " + str(SCHEDULER_MAX_WORKERS) + ")")
+    parser.add_argument("-o", "--output", default="-", metavar="FILE",
+                        help="JSON-lines output file, appended to (default: - for standard output; "
+                             "then, anything else printed goes to standard error)")
+    parser.add_argument("--stop-on-failure", action="store_true",
+                        help="stop running a test definition after its first failed execution")
+    parser.add_argument("--full-init", action="store_true",
+                        help="rebuild and rewrite all definition files before running")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record execution phases (setup, challenge, detection, ...) and write them "
+                             "to a Chrome trace JSON file (chrome://tracing, ui.perfetto.dev)")
+    parsed_arguments = parser.parse_args(arguments)
+    if parsed_arguments.repeat < 1 or parsed_arguments.parallel < 1:
+        parser.error("--repeat and --parallel must be positive integers")
+    return parsed_arguments
+
+
+def execution_to_JSON(campaign, run_number, test_exec):
+    """Return one JSON line (without end of line) describing a test execution (test_exec None: failed execution)."""
+    record = {"type": "execution",
+              "test_def_ID": campaign.test_def.ID,
+              "run": run_number,
+              "status": "failed" if test_exec == None else ("not restored" if test_exec.restored == False else "ok")}
+    if test_exec != None:
+        record["test_exec_ID"] = test_exec.ID
+        record["challenge_exec_ID"] = test_exec.challenge_exec_ID
+        record["start_time"] = test_exec.start_time.isoformat()
+        record["challenge_start_time"] = test_exec.challenge_start_time.isoformat()
+        if test_exec.restoration_detection_time != None:
+            record["restoration_detection_time"] = test_exec.restoration_detection_time.isoformat()
+        record["recovery_time_ns"] = test_exec.recovery_time_ns
+        record["time_to_impair_ns"] = test_exec.time_to_impair_ns
+        record["CSV_file"] = test_exec.get_CSV_file_name()
+    return json.dumps(record)
+
+
+def campaign_to_JSON(campaign):
+    """Return one JSON line (without end of line) summarizing all executions of a test definition."""
+    record = {"type": "summary",
+              "test_def_ID": campaign.test_def.ID,
+              "failed_runs": campaign.failed_runs}
+    record.update(campaign.get_statistics())
+    return json.dumps(record)
+
+
+def run_headless(parsed_arguments):
+    """Run test definitions as requested by command-line arguments, stream JSON lines; return an exit code."""
+    standard_output = sys.stdout
+
+    # only JSON lines on output: messages from definitions and codes go to standard error
+    with contextlib.redirect_stdout(sys.stderr):
+        if parsed_arguments.trace != None:
+            tracer.enable()
+        init_all_definitions(incremental=INCREMENTAL_INIT and not parsed_arguments.full_init)
+
+        unknown_IDs = [ID for ID in parsed_arguments.test_def_IDs
+                       if get_indexed_item_from_list(ID, AutoResilGlobal.test_definition_list) == None]
+        if len(unknown_IDs) > 0:
+            print("Test Definition IDs", unknown_IDs, "do not exist")
+            return EXIT_USAGE_ERROR
+
+        if parsed_arguments.output == "-":
+            output_file = standard_output
+        else:
+            output_file = open(parsed_arguments.output, "a")
+
+        def write_execution(campaign, run_number, test_exec):
+            output_file.write(execution_to_JSON(campaign, run_number, test_exec) + "\n")
+            output_file.flush()  # followers (tail -f, log shippers) see each result as soon as it is known
+
+        scheduler = TestScheduler(parsed_arguments.parallel)
+        scheduler.run_callbacks.append(write_execution)
+        for test_def_ID in parsed_arguments.test_def_IDs:
+            scheduler.add_test_def(test_def_ID, parsed_arguments.repeat, parsed_arguments.stop_on_failure)
+        try:
+            scheduler.run()
+        finally:
+            scheduler.write_to_csv()
+            for campaign in scheduler.campaigns:
+                if campaign.start_time != None:
+                    output_file.write(campaign_to_JSON(campaign) + "\n")
+            output_file.flush()
+            if output_file is not standard_output:
+                output_file.close()
+            if parsed_arguments.trace != None:
+                tracer.write_chrome_trace(parsed_arguments.trace)
+
+    if any(len(campaign.failed_runs) > 0 for campaign in scheduler.campaigns):
+        return EXIT_FAILURE
+    return EXIT_SUCCESS
+
 
 ######################################################################
 def main():
 
+    # with arguments: headless batch mode, no menu
+    if len(sys.argv) > 1:
+        sys.exit(run_headless(parse_arguments()))
+
     print("\nProject:\t", PROJECT_NAME)
     print("Use Case:\t",USE_CASE_NAME)
 
 
-    # Run initializations, to refresh data and make sure files are here. Also, this loads the lists in memory.
+    # Run initializations, to refresh data and make sure files are here. Also, this sets the lists in memory.
     # For now, initialization functions are self-contained and hard-coded:
     # all definition data is initialized from the code, not from user interaction.
-    AutoResilGlobal.test_case_list =                init_test_cases()
-    AutoResilGlobal.test_definition_list =          init_test_definitions()
-    AutoResilGlobal.recipient_list =                init_recipients()
-    AutoResilGlobal.challenge_definition_list =     init_challenge_definitions()
-    AutoResilGlobal.metric_definition_list =        init_metric_definitions()
-
-    AutoResilGlobal.physical_resource_list =        init_physical_resources()
-    AutoResilGlobal.cloud_virtual_resource_list =   init_cloud_virtual_resources()
-    AutoResilGlobal.VNF_Service_list =              init_VNFs_Services()
+    # In incremental mode, unchanged definition sets are not rewritten, and are loaded from files when first used.
+    init_all_definitions(incremental=INCREMENTAL_INIT)
 
 
     # start with no test definition selected
@@ -172,7 +309,12 @@ def main():
                 print("No current selection of Test Definition. Try again.")
                 continue
 
-        if user_choice == 4:  # exit
+        if user_choice == 4:  # start executions of several Test Definitions in parallel (resource conflicts are serialized)
+            test_def_ID_list = get_test_def_ID_list()
+            run_test_defs_in_parallel(test_def_ID_list, 1, SCHEDULER_MAX_WORKERS)
+            continue
+
+        if user_choice == 5:  # exit
             print("\nEnd of Main Program")
             print("\nProject:\t", PROJECT_NAME)
             print("Use Case:\t",USE_CASE_NAME)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: registries of test codes and challenge codes (implementations selected by TestDefinition
+# and ChallengeDefinition instances), by name:
+#   - a test code is a function f(test_def, *args, **kwargs); it may return the time.monotonic_ns() value
+#     at which it observed restoration
+#   - a challenge code is a ChallengeCode: a start function and a stop function, both f(challenge_def, *args, **kwargs)
+# An implementation can be registered as an object, or as a "module:attribute" reference, imported only when
+# the code is first used. Codes are also discovered from installed packages, through entry points
+# (groups TEST_CODE_ENTRY_POINT_GROUP and CHALLENGE_CODE_ENTRY_POINT_GROUP), scanned only for unknown names.
+# Built-in numbered codes (test_code001, challenge_code001, ...) are registered by AutoResilMgTestDef.
+
+
+#docstring
+"""This module contains test and challenge code registries for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import importlib
+import sys
+import threading
+
+
+# Constants
+TEST_CODE_ENTRY_POINT_GROUP =       "opnfv_auto.resiliency.test_codes"
+CHALLENGE_CODE_ENTRY_POINT_GROUP =  "opnfv_auto.resiliency.challenge_codes"
+
+
+######################################################################
+
+class ChallengeCode:
+    """Challenge code for Auto project: start and stop functions, always used together."""
+    def __init__ (self, start_function, stop_function):
+        self.start = start_function
+        self.stop = stop_function
+
+
+def load_reference(reference):
+    """Import and return the object designated by a "module:attribute" (or "module:attribute.attribute") string."""
+    module_name, _, attribute_path = reference.partition(":")
+    loaded = importlib.import_module(module_name)
+    if attribute_path != "":
+        for attribute_name in attribute_path.split("."):
+            loaded = getattr(loaded, attribute_name)
+    return loaded
+
+
+def iter_entry_points(group):
+    """Return the entry points of a group, from installed package metadata."""
+    from importlib import metadata
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=group)
+    return entry_points.get(group, [])  # Python < 3.10
+
+
+class CodeRegistry:
+    """Registry of code implementations (test codes or challenge codes), by name, with lazy loading."""
+    def __init__ (self, registry_kind, registry_entryPointGroup):
+        self.kind = registry_kind
+        self.entry_point_group = registry_entryPointGroup
+        self.__codes = {}       # name -> loaded implementation
+        self.__references = {}  # name -> "module:attribute" string or entry point, not loaded yet
+        self.__entry_points_scanned = False
+        self.__lock = threading.Lock()
+
+    def register(self, code_name, code=None):
+        """Register an implementation, or a "module:attribute" string to import when first used.
+        Without code, return a decorator registering the decorated function or class."""
+        if code == None:
+            def decorator(decorated):
+                self.register(code_name, decorated)
+                return decorated
+            return decorator
+        with self.__lock:
+            self.__codes.pop(code_name, None)
+            self.__references.pop(code_name, None)
+            if isinstance(code, str):
+                self.__references[code_name] = code
+            else:
+                self.__codes[code_name] = code
+        return code
+
+    def __scan_entry_points(self):
+        """Add references to codes declared by installed packages (once; registered names take precedence).
+        Package metadata is read without the lock; the lock is never held while reading or importing."""
+        with self.__lock:
+            if self.__entry_points_scanned:
+                return
+        entry_points = list(iter_entry_points(self.entry_point_group))
+        with self.__lock:
+            self.__entry_points_scanned = True
+            for entry_point in entry_points:
+                if entry_point.name not in self.__codes and entry_point.name not in self.__references:
+                    self.__references[entry_point.name] = entry_point
+
+    def get(self, code_name):
+        """Return the implementation registered with that name (loaded if needed), or None."""
+        with self.__lock:
+            code = self.__codes.get(code_name)
+            if code != None:
+                return code
+            reference = self.__references.get(code_name)
+        if reference == None:
+            self.__scan_entry_points()
+            with self.__lock:
+                reference = self.__references.get(code_name)
+            if reference == None:
+                return None
+
+        # import without the lock: the loaded module may register codes (decorators run at import time);
+        # if the import fails, the reference stays registered
+        if isinstance(reference, str):
+            code = load_reference(reference)
+        else:
+            code = reference.load()
+
+        with self.__lock:
+            if self.__references.get(code_name) is reference:
+                del self.__references[code_name]
+                self.__codes[code_name] = code
+            elif self.__codes.get(code_name) != None:
+                code = self.__codes[code_name]  # registered again meanwhile (e.g. by the loaded module): that one wins
+        return code
+
+    def has_code(self, code_name):
+        """Return True if a code is registered with that name (without loading it)."""
+        with self.__lock:
+            if code_name in self.__codes or code_name in self.__references:
+                return True
+        self.__scan_entry_points()
+        with self.__lock:
+            return code_name in self.__references
+
+    def get_names(self):
+        """Return the sorted list of registered code names (including entry points, not loaded)."""
+        self.__scan_entry_points()
+        with self.__lock:
+            return sorted(set(self.__codes) | set(self.__references))
+
+
+# registry of check_lazy_registration (the module it loads registers its codes there, when imported)
+lazy_check_registry = None
+
+def check_lazy_registration():
+    """Regression check: a module loaded from a reference may register codes when it is imported (no deadlock),
+    and a reference whose import fails stays registered. Return the list of failed checks."""
+    import os
+    import tempfile
+
+    failed_checks = []
+    registry = CodeRegistry("checked code", "opnfv_auto.resiliency.checked_codes")
+    with tempfile.TemporaryDirectory(prefix="AutoResilMgCodes") as module_directory:
+        module_name = "auto_resil_lazy_codes_" + str(os.getpid())
+        with open(os.path.join(module_directory, module_name + ".py"), "w") as module_file:
+            module_file.write("import AutoResilMgCodes\n"
+                              "registry = AutoResilMgCodes.lazy_check_registry\n"
+                              "@registry.register('lazy_code')\n"
+                              "def lazy_code(test_def):\n"
+                              "    return 'lazy'\n"
+                              "@registry.register('other_code')\n"
+                              "def other_code(test_def):\n"
+                              "    return 'other'\n")
+        global lazy_check_registry
+        lazy_check_registry = registry
+        sys.path.insert(0, module_directory)
+        try:
+            registry.register("lazy_code", module_name + ":lazy_code")
+            registry.register("missing_code", module_name + "_missing:missing_code")
+            loader = threading.Thread(target=lambda: registry.get("lazy_code"), daemon=True)
+            loader.start()
+            loader.join(10.0)
+            if loader.is_alive():
+                failed_checks.append("deadlock: module registering its codes while loaded from a reference")
+                return failed_checks  # registry lock held by the blocked thread: no other check can run
+            if registry.get("lazy_code") == None or registry.get("lazy_code")(None) != "lazy":
+                failed_checks.append("code loaded from a reference not returned")
+            if registry.get("other_code") == None:
+                failed_checks.append("code registered by a module loaded from a reference not kept")
+            try:
+                registry.get("missing_code")
+                failed_checks.append("no error for a reference which cannot be imported")
+            except ImportError:
+                pass
+            if not registry.has_code("missing_code"):
+                failed_checks.append("reference lost after a failed import")
+        finally:
+            sys.path.remove(module_directory)
+            sys.modules.pop(module_name, None)
+            lazy_check_registry = None
+    return failed_checks
+
+
+# registries shared by all definitions
+test_codes = CodeRegistry("test code", TEST_CODE_ENTRY_POINT_GROUP)
+challenge_codes = CodeRegistry("challenge code", CHALLENGE_CODE_ENTRY_POINT_GROUP)
+
+
+if __name__ == "__main__":
+    # regression checks of the registries (run by CI); loaded modules import this module by its name
+    import AutoResilMgCodes
+    failed_checks = AutoResilMgCodes.check_lazy_registration()
+    for failed_check in failed_checks:
+        print("FAILED check:", failed_check)
+    if len(failed_checks) > 0:
+        sys.exit(1)
+    print("OK")
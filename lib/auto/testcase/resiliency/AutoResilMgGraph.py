@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: dependency graph of resources (physical resources, cloud virtual resources, VNFs/services)
+# A resource depends on the resources in its related_* ID lists (e.g. a VM on its host, a VNF on its VMs and hosts).
+# The transitive closure is kept up to date at each addition (no recomputation), in both directions:
+#   - impacted resources: what fails (directly or indirectly) if a resource fails ("blast radius")
+#   - dependencies: what a resource needs (directly or indirectly)
+# so that queries like "which VNFs are affected if host X fails" are dictionary lookups.
+# Resources are nodes (kind, ID), with kind in RESOURCE_KINDS; they may be referenced before being added.
+
+
+#docstring
+"""This module contains the resource dependency graph for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import threading
+
+
+# Constants
+RESOURCE_KINDS = ("physical", "cloud", "VNF")
+
+# dependency attributes of resource objects (lists of resource IDs) -> kind of the resources they refer to
+DEPENDENCY_ATTRIBUTES = {
+    "related_phys_rsrc_ID_list":        "physical",
+    "related_cloud_virt_rsrc_ID_list":  "cloud",
+}
+
+EMPTY_SET = frozenset()
+
+
+######################################################################
+
+class ResourceGraph:
+    """Resource dependency graph for Auto project, with incrementally maintained transitive closure.
+    Query results are shared sets (constant time): they must not be modified by callers.
+    """
+    def __init__ (self):
+        # direct dependencies: node -> set of nodes it depends on
+        self.__direct_dependencies = {}
+        # transitive closure, per kind of node: node -> {kind: set of IDs}
+        self.__dependencies = {}
+        self.__impacted = {}
+        self.__lock = threading.Lock()
+
+    def __add_node(self, node):
+        if node not in self.__direct_dependencies:
+            self.__direct_dependencies[node] = set()
+            self.__dependencies[node] = {kind: set() for kind in RESOURCE_KINDS}
+            self.__impacted[node] = {kind: set() for kind in RESOURCE_KINDS}
+
+    def __iter_closure(self, closure):
+        for kind, IDs in closure.items():
+            for ID in IDs:
+                yield (kind, ID)
+
+    def __add_edge(self, node, dependency):
+        """Add "node depends on dependency", and update the closure: everything impacted by node (and node itself)
+        now depends on everything dependency depends on (and dependency itself)."""
+        if dependency in self.__direct_dependencies[node]:
+            return
+        self.__direct_dependencies[node].add(dependency)
+        if dependency == node or node[1] in self.__dependencies[dependency][node[0]]:
+            return  # self-reference or cycle: direct edge kept, closure unchanged (cycles are not meaningful here)
+        upstream = [node] + list(self.__iter_closure(self.__impacted[node]))
+        downstream = [dependency] + list(self.__iter_closure(self.__dependencies[dependency]))
+        for impacted_node in upstream:
+            dependencies = self.__dependencies[impacted_node]
+            for dependency_node in downstream:
+                if dependency_node[1] in dependencies[dependency_node[0]]:
+                    continue
+                dependencies[dependency_node[0]].add(dependency_node[1])
+                self.__impacted[dependency_node][impacted_node[0]].add(impacted_node[1])
+
+    def add_resource(self, kind, ID, dependencies=()):
+        """Add a resource (or new dependencies of a known resource); dependencies: iterable of (kind, ID)."""
+        node = (kind, ID)
+        with self.__lock:
+            self.__add_node(node)
+            for dependency in dependencies:
+                self.__add_node(dependency)
+                self.__add_edge(node, dependency)
+
+    def add_resource_object(self, kind, resource):
+        """Add a resource object (PhysicalResource, CloudVirtualResource, VNFService), using its related_* ID lists."""
+        dependencies = []
+        for attribute_name, dependency_kind in DEPENDENCY_ATTRIBUTES.items():
+            ID_list = getattr(resource, attribute_name, None)
+            if ID_list != None:
+                dependencies.extend((dependency_kind, ID) for ID in ID_list)
+        self.add_resource(kind, resource.ID, dependencies)
+
+    def has_resource(self, kind, ID):
+        return (kind, ID) in self.__direct_dependencies
+
+    def get_impacted(self, kind, ID, impacted_kind):
+        """Return IDs of the resources of impacted_kind which fail, directly or indirectly, if resource (kind, ID) fails."""
+        closure = self.__impacted.get((kind, ID))
+        if closure == None:
+            return EMPTY_SET
+        return closure[impacted_kind]
+
+    def get_dependencies(self, kind, ID, dependency_kind):
+        """Return IDs of the resources of dependency_kind which resource (kind, ID) needs, directly or indirectly."""
+        closure = self.__dependencies.get((kind, ID))
+        if closure == None:
+            return EMPTY_SET
+        return closure[dependency_kind]
+
+    def is_impacted(self, kind, ID, failed_kind, failed_ID):
+        """Return True if resource (kind, ID) is affected by a failure of resource (failed_kind, failed_ID)."""
+        return ID in self.get_impacted(failed_kind, failed_ID, kind)
+
+    def get_direct_dependencies(self, kind, ID):
+        """Return the (kind, ID) nodes a resource directly depends on."""
+        return self.__direct_dependencies.get((kind, ID), EMPTY_SET)
+
+    def get_impacted_by_all(self, failed_resources, impacted_kind):
+        """Return IDs of the resources of impacted_kind affected by the failure of several resources ((kind, ID) list)."""
+        impacted = set()
+        for kind, ID in failed_resources:
+            impacted |= self.get_impacted(kind, ID, impacted_kind)
+        return impacted
+
+    def get_nb_resources(self):
+        return len(self.__direct_dependencies)
+
+
+def build_resource_graph(physical_resource_list, cloud_resource_list, VNF_service_list):
+    """Build a ResourceGraph from lists of resource objects (any of them may be None)."""
+    resource_graph = ResourceGraph()
+    for kind, resource_list in (("physical", physical_resource_list),
+                                ("cloud", cloud_resource_list),
+                                ("VNF", VNF_service_list)):
+        if resource_list != None:
+            for resource in resource_list:
+                resource_graph.add_resource_object(kind, resource)
+    return resource_graph
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: results warehouse, gathering execution result files (testDefExec*.csv, challDefExec*.csv,
+# see TestExecution and ChallengeExecution) in a columnar store, for trend analysis over many executions
+# Store layout (one directory): one binary file per column (typed array), per table:
+#   - "test" table: one row per test execution (IDs, times, recovery time, typed metric columns "metric_<ID>")
+#   - "challenge" table: one row per challenge execution (IDs, times, duration)
+#   - "VNF" table: VNF IDs of test executions (test rows point to a slice of it: VNF_offset, VNF_count)
+# Times are integer nanoseconds since epoch (-1 when missing); metric values are floats (NaN when missing).
+# A manifest (JSON) lists ingested files (with size and mtime) and committed row counts: ingestion is incremental
+# (only new files are parsed), and rows appended by an interrupted ingestion are dropped at next opening.
+# An execution has one row: a file which changed since its ingestion replaces the rows of its execution ID.
+
+
+#docstring
+"""This module contains the results warehouse for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import csv
+import json
+import math
+import os
+import re
+import sys
+from array import array
+from datetime import datetime
+from AutoResilMgTestDef import (CSV_TIME_FORMAT, FILE_TEST_DEFINITIONS, NANOSECONDS_PER_SECOND,
+                                get_indexed_item_from_file, datetime_to_ns, ns_to_datetime)
+
+
+# Constants
+WAREHOUSE_DIRECTORY =       "ResultsWarehouse"
+MANIFEST_FILE =             "manifest.json"
+WAREHOUSE_FORMAT_VERSION =  1
+MISSING_TIME =              -1  # integer columns: missing value
+METRIC_COLUMN_PREFIX =      "metric_"
+
+# tables with one row per execution: execution ID column
+EXECUTION_ID_COLUMNS = {
+    "test":         "test_exec_ID",
+    "challenge":    "challenge_exec_ID",
+}
+
+# tables: column name -> array typecode ("q": 64-bit integer, "d": float)
+TABLE_COLUMNS = {
+    "test": {
+        "test_exec_ID":                 "q",
+        "test_def_ID":                  "q",
+        "challenge_exec_ID":            "q",
+        "challenge_def_ID":             "q",
+        "start_time_ns":                "q",
+        "finish_time_ns":               "q",
+        "challenge_start_time_ns":      "q",
+        "restoration_detection_time_ns":"q",
+        "recovery_time_ns":             "q",
+        "VNF_offset":                   "q",
+        "VNF_count":                    "q",
+    },
+    "challenge": {
+        "challenge_exec_ID":            "q",
+        "challenge_def_ID":             "q",
+        "start_time_ns":                "q",
+        "stop_time_ns":                 "q",
+        "duration_ns":                  "q",
+    },
+    "VNF": {
+        "VNF_ID":                       "q",
+    },
+}
+
+# result file names: definition ID, start time, and (since execution IDs are unique) execution ID
+RESULT_FILE_PATTERN = re.compile(r"^(testDefExec|challDefExec)(\d+)-(\d{4}-\d\d-\d\d-\d\d-\d\d-\d\d)(?:-(\d+))?\.csv$")
+# metric value rows: "<date> <time> <value>(<metric definition ID>)"
+METRIC_VALUE_PATTERN = re.compile(r"^(\S+ \S+) (.*)\((\d+)\)$")
+SECTION_HEADERS = ("Metric Values:", "Log:", "CLI responses:", "API responses:")
+
+
+######################################################################
+
+def parse_time_ns(text):
+    """Convert a time from a result file (with or without microseconds) to nanoseconds since epoch."""
+    for time_format in (CSV_TIME_FORMAT, "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime_to_ns(datetime.strptime(text, time_format))
+        except ValueError:
+            continue
+    return MISSING_TIME
+
+
+def parse_metric_value(text):
+    """Convert a metric value from a result file (number, or timedelta as [D day[s], ]H:MM:SS[.ffffff]) to a float."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    match = re.match(r"^(?:(-?\d+) days?, )?(\d+):(\d\d):(\d\d(?:\.\d+)?)$", text.strip())
+    if match == None:
+        return math.nan
+    days = int(match.group(1) or 0)
+    return days*86400 + int(match.group(2))*3600 + int(match.group(3))*60 + float(match.group(4))
+
+
+def add_metric_value(metrics, text):
+    """Add a metric value row ("<date> <time> <value>(<metric definition ID>)") to a dictionary: metric def ID -> float."""
+    metric_match = METRIC_VALUE_PATTERN.match(text)
+    if metric_match != None:
+        metrics[int(metric_match.group(3))] = parse_metric_value(metric_match.group(2))
+
+
+def parse_result_file(file_name):
+    """Parse a result CSV file; return (kind "test" or "challenge", dictionary of values), or None if not a complete
+    result file (e.g. still being streamed). Metric values are in a "metrics" dictionary: metric def ID -> float.
+    Both layouts are read: sections (header row, then one-cell rows) and streamed labelled rows (header, item)."""
+    match = RESULT_FILE_PATTERN.match(os.path.basename(file_name))
+    if match == None:
+        return None
+    kind = "test" if match.group(1) == "testDefExec" else "challenge"
+
+    fields = {}
+    metrics = {}
+    section = None
+    with open(file_name, newline="") as result_file:
+        for row in csv.reader(result_file):
+            if len(row) == 0:
+                continue
+            if len(row) == 1 and row[0] in SECTION_HEADERS:
+                section = row[0]
+                continue
+            if len(row) == 2 and row[0] in SECTION_HEADERS:
+                # streamed file: one labelled row per item, fields may follow (section unchanged)
+                if row[0] == "Metric Values:":
+                    add_metric_value(metrics, row[1])
+                continue
+            if section == None:
+                if len(row) >= 2:
+                    fields[row[0]] = row[1]
+            elif section == "Metric Values:":
+                add_metric_value(metrics, row[0])
+
+    def get_int(key, default=MISSING_TIME):
+        try:
+            return int(fields[key])
+        except (KeyError, ValueError):
+            return default
+
+    def get_time(key):
+        return parse_time_ns(fields[key]) if key in fields else MISSING_TIME
+
+    if kind == "test":
+        if "test finish time" not in fields:
+            return None  # execution not finished (streamed file): ingested later
+        recovery_time_ns = get_int("MEASURED RECOVERY TIME (ns)")
+        if recovery_time_ns == MISSING_TIME and "MEASURED RECOVERY TIME (s)" in fields:
+            recovery_time_ns = round(float(fields["MEASURED RECOVERY TIME (s)"]) * NANOSECONDS_PER_SECOND)  # older files
+        return kind, {"test_exec_ID":                   get_int("test execution ID"),
+                      "test_def_ID":                    get_int("test definition ID", int(match.group(2))),
+                      "challenge_exec_ID":              get_int("associated challenge execution ID"),
+                      "start_time_ns":                  get_time("test start time"),
+                      "finish_time_ns":                 get_time("test finish time"),
+                      "challenge_start_time_ns":        get_time("challenge start time"),
+                      "restoration_detection_time_ns":  get_time("restoration detection time"),
+                      "recovery_time_ns":               recovery_time_ns,
+                      "metrics":                        metrics}
+
+    if "challenge stop time" not in fields:
+        return None
+    start_time_ns = get_time("challenge start time")
+    stop_time_ns = get_time("challenge stop time")
+    duration_ns = get_int("challenge duration (ns)")
+    if duration_ns == MISSING_TIME and start_time_ns != MISSING_TIME and stop_time_ns != MISSING_TIME:
+        duration_ns = stop_time_ns - start_time_ns
+    return kind, {"challenge_exec_ID":  get_int("challenge execution ID"),
+                  "challenge_def_ID":   get_int("challenge definition ID", int(match.group(2))),
+                  "start_time_ns":      start_time_ns,
+                  "stop_time_ns":       stop_time_ns,
+                  "duration_ns":        duration_ns}
+
+
+def get_test_def_VNF_IDs(test_def_ID):
+    """Default VNF lookup for ingestion: VNF IDs of a test definition, from the test definition file."""
+    test_def = get_indexed_item_from_file(test_def_ID, FILE_TEST_DEFINITIONS)
+    if test_def == None or test_def.VNF_ID_list == None:
+        return []
+    return list(test_def.VNF_ID_list)
+
+
+class ResultsWarehouse:
+    """Columnar store of execution results for Auto project, with incremental ingestion of result files
+    and queries over recovery times (by test definition, VNF, date range)."""
+    def __init__ (self, warehouse_directory=WAREHOUSE_DIRECTORY, VNF_ID_lookup=get_test_def_VNF_IDs):
+        self.directory = warehouse_directory
+        self.VNF_ID_lookup = VNF_ID_lookup
+        os.makedirs(self.directory, exist_ok=True)
+        self.__manifest = self.__read_manifest()
+        self.__columns = {}  # (table, column) -> array, loaded when first used
+        self.__truncate_uncommitted_rows()
+
+    ##################################################################
+    # storage
+
+    def __read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_FILE)) as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest["version"] > WAREHOUSE_FORMAT_VERSION:
+                print("Results warehouse", self.directory, "has a newer format:", manifest["version"])
+                sys.exit()  # stop entire program, because warehouse MUST be readable
+            return manifest
+        except FileNotFoundError:
+            return {"version":      WAREHOUSE_FORMAT_VERSION,
+                    "files":        {},
+                    "row_counts":   {table: 0 for table in TABLE_COLUMNS},
+                    "columns":      {table: dict(columns) for table, columns in TABLE_COLUMNS.items()}}
+
+    def __write_manifest(self):
+        """Write the manifest atomically (commit point of an ingestion)."""
+        manifest_file_name = os.path.join(self.directory, MANIFEST_FILE)
+        with open(manifest_file_name + ".tmp", "w") as manifest_file:
+            json.dump(self.__manifest, manifest_file)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(manifest_file_name + ".tmp", manifest_file_name)
+
+    def __get_column_file_name(self, table, column):
+        return os.path.join(self.directory, table + "." + column + ".bin")
+
+    def __truncate_uncommitted_rows(self):
+        """Drop rows written after the last committed manifest (interrupted ingestion)."""
+        for table, columns in self.__manifest["columns"].items():
+            for column, typecode in columns.items():
+                column_file_name = self.__get_column_file_name(table, column)
+                committed_size = self.__manifest["row_counts"][table] * array(typecode).itemsize
+                if os.path.isfile(column_file_name) and os.path.getsize(column_file_name) > committed_size:
+                    os.truncate(column_file_name, committed_size)
+
+    def get_column(self, table, column):
+        """Return a column (typed array, shared: do not modify), reading only that column file."""
+        key = (table, column)
+        if key not in self.__columns:
+            typecode = self.__manifest["columns"][table][column]
+            values = array(typecode)
+            nb_rows = self.__manifest["row_counts"][table]
+            if nb_rows > 0:
+                with open(self.__get_column_file_name(table, column), "rb") as column_file:
+                    values.fromfile(column_file, nb_rows)
+            self.__columns[key] = values
+        return self.__columns[key]
+
+    def get_nb_rows(self, table="test"):
+        return self.__manifest["row_counts"][table]
+
+    def get_metric_def_IDs(self):
+        """Return the metric definition IDs which have a column in the test table."""
+        return sorted(int(column[len(METRIC_COLUMN_PREFIX):]) for column in self.__manifest["columns"]["test"]
+                      if column.startswith(METRIC_COLUMN_PREFIX))
+
+    def __append_rows(self, table, rows):
+        """Append rows (dictionaries; missing columns get missing values) to the column files of a table."""
+        columns = self.__manifest["columns"][table]
+        for column, typecode in columns.items():
+            missing_value = math.nan if typecode == "d" else MISSING_TIME
+            values = array(typecode, [row.get(column, missing_value) for row in rows])
+            with open(self.__get_column_file_name(table, column), "ab") as column_file:
+                values.tofile(column_file)
+                column_file.flush()
+                os.fsync(column_file.fileno())
+            if (table, column) in self.__columns:
+                self.__columns[(table, column)].extend(values)
+
+    def __replace_row(self, table, index, row):
+        """Overwrite a row (dictionary; missing columns get missing values) of a table, in place.
+        Not undone by an interrupted ingestion: the file is still listed with its old signature, so it is parsed
+        and replaced again at next ingestion."""
+        for column, typecode in self.__manifest["columns"][table].items():
+            missing_value = math.nan if typecode == "d" else MISSING_TIME
+            values = array(typecode, [row.get(column, missing_value)])
+            with open(self.__get_column_file_name(table, column), "r+b") as column_file:
+                column_file.seek(index * values.itemsize)
+                values.tofile(column_file)
+                column_file.flush()
+                os.fsync(column_file.fileno())
+            if (table, column) in self.__columns:
+                self.__columns[(table, column)][index] = values[0]
+
+    def __get_row_indexes(self, table):
+        """Return a dictionary: execution ID -> row index, for a table with one row per execution."""
+        return {execution_ID: index
+                for index, execution_ID in enumerate(self.get_column(table, EXECUTION_ID_COLUMNS[table]))}
+
+    def __add_metric_column(self, metric_def_ID):
+        """Add a float column for a metric, filled with NaN for existing rows."""
+        column = METRIC_COLUMN_PREFIX + str(metric_def_ID)
+        if column in self.__manifest["columns"]["test"]:
+            return
+        values = array("d", [math.nan]) * self.__manifest["row_counts"]["test"]
+        with open(self.__get_column_file_name("test", column), "wb") as column_file:
+            values.tofile(column_file)
+        self.__manifest["columns"]["test"][column] = "d"
+
+    ##################################################################
+    # ingestion
+
+    def ingest(self, source_directory="."):
+        """Load result files of a directory which were not ingested yet (or changed since); return number of
+        executions loaded. A file which changed since its ingestion replaces the row of its execution (no duplicate)."""
+        new_files = []
+        for file_name in sorted(os.listdir(source_directory)):
+            if RESULT_FILE_PATTERN.match(file_name) == None:
+                continue
+            path = os.path.join(source_directory, file_name)
+            file_stat = os.stat(path)
+            signature = [file_stat.st_size, file_stat.st_mtime_ns]
+            if self.__manifest["files"].get(os.path.abspath(path)) != signature:
+                new_files.append((path, signature))
+
+        parsed = {"test": {}, "challenge": {}}  # execution ID -> row (several files of an execution: the last one)
+        for path, signature in new_files:
+            try:
+                result = parse_result_file(path)
+            except (OSError, ValueError, csv.Error) as e:
+                print("Results warehouse: cannot parse", path, type(e), e)
+                continue
+            if result != None:
+                kind, row = result
+                parsed[kind][row[EXECUTION_ID_COLUMNS[kind]]] = row
+                self.__manifest["files"][os.path.abspath(path)] = signature
+        if len(parsed["test"]) == 0 and len(parsed["challenge"]) == 0:
+            return 0
+
+        # challenges first: test rows get their challenge definition ID from challenge executions
+        challenge_row_indexes = self.__get_row_indexes("challenge")
+        new_challenge_rows = []
+        for challenge_exec_ID, row in parsed["challenge"].items():
+            if challenge_exec_ID in challenge_row_indexes:
+                self.__replace_row("challenge", challenge_row_indexes[challenge_exec_ID], row)
+            else:
+                new_challenge_rows.append(row)
+        self.__append_rows("challenge", new_challenge_rows)
+        self.__manifest["row_counts"]["challenge"] += len(new_challenge_rows)
+        challenge_def_IDs = dict(zip(self.get_column("challenge", "challenge_exec_ID"),
+                                     self.get_column("challenge", "challenge_def_ID")))
+
+        test_row_indexes = self.__get_row_indexes("test")
+        new_test_rows = []
+        VNF_rows = []
+        VNF_offset = self.__manifest["row_counts"]["VNF"]
+        VNF_ID_cache = {}
+        for test_exec_ID, row in parsed["test"].items():
+            row["challenge_def_ID"] = challenge_def_IDs.get(row["challenge_exec_ID"], MISSING_TIME)
+            for metric_def_ID, value in row.pop("metrics").items():
+                self.__add_metric_column(metric_def_ID)
+                row[METRIC_COLUMN_PREFIX + str(metric_def_ID)] = value
+            if test_exec_ID in test_row_indexes:
+                # replaced row: same test definition, keep its slice of the VNF table
+                index = test_row_indexes[test_exec_ID]
+                row["VNF_offset"] = self.get_column("test", "VNF_offset")[index]
+                row["VNF_count"] = self.get_column("test", "VNF_count")[index]
+                self.__replace_row("test", index, row)
+                continue
+            if row["test_def_ID"] not in VNF_ID_cache:
+                VNF_ID_cache[row["test_def_ID"]] = self.VNF_ID_lookup(row["test_def_ID"])
+            VNF_IDs = VNF_ID_cache[row["test_def_ID"]]
+            row["VNF_offset"] = VNF_offset + len(VNF_rows)
+            row["VNF_count"] = len(VNF_IDs)
+            VNF_rows.extend({"VNF_ID": VNF_ID} for VNF_ID in VNF_IDs)
+            new_test_rows.append(row)
+
+        self.__append_rows("VNF", VNF_rows)
+        self.__manifest["row_counts"]["VNF"] += len(VNF_rows)
+        self.__append_rows("test", new_test_rows)
+        self.__manifest["row_counts"]["test"] += len(new_test_rows)
+        self.__write_manifest()
+        return len(parsed["test"]) + len(parsed["challenge"])
+
+    ##################################################################
+    # queries
+
+    def select_test_rows(self, test_def_ID=None, VNF_ID=None, start_time=None, end_time=None):
+        """Return indexes of test executions matching all given criteria:
+        test definition ID, tested VNF ID, test start time in [start_time; end_time[ (datetimes)."""
+        nb_rows = self.get_nb_rows("test")
+        selected = range(nb_rows)
+        if test_def_ID != None:
+            test_def_IDs = self.get_column("test", "test_def_ID")
+            selected = [index for index in selected if test_def_IDs[index] == test_def_ID]
+        if start_time != None or end_time != None:
+            start_times_ns = self.get_column("test", "start_time_ns")
+            low_ns = datetime_to_ns(start_time) if start_time != None else -2**63
+            high_ns = datetime_to_ns(end_time) if end_time != None else 2**63 - 1
+            selected = [index for index in selected if low_ns <= start_times_ns[index] < high_ns]
+        if VNF_ID != None:
+            VNF_offsets = self.get_column("test", "VNF_offset")
+            VNF_counts = self.get_column("test", "VNF_count")
+            VNF_IDs = self.get_column("VNF", "VNF_ID")
+            selected = [index for index in selected
+                        if VNF_ID in VNF_IDs[VNF_offsets[index]:VNF_offsets[index] + VNF_counts[index]]]
+        return list(selected)
+
+    def query_recovery_times(self, test_def_ID=None, VNF_ID=None, start_time=None, end_time=None):
+        """Return (test execution ID, test definition ID, test start time [datetime], recovery time [ns]) tuples,
+        for executions matching the criteria (see select_test_rows) and having a recovery time."""
+        test_exec_IDs = self.get_column("test", "test_exec_ID")
+        test_def_IDs = self.get_column("test", "test_def_ID")
+        start_times_ns = self.get_column("test", "start_time_ns")
+        recovery_times_ns = self.get_column("test", "recovery_time_ns")
+        return [(test_exec_IDs[index], test_def_IDs[index], ns_to_datetime(start_times_ns[index]), recovery_times_ns[index])
+                for index in self.select_test_rows(test_def_ID, VNF_ID, start_time, end_time)
+                if recovery_times_ns[index] != MISSING_TIME]
+
+    def query_metric_values(self, metric_def_ID, test_def_ID=None, VNF_ID=None, start_time=None, end_time=None):
+        """Return (test execution ID, value) tuples of a metric, for executions matching the criteria."""
+        column = METRIC_COLUMN_PREFIX + str(metric_def_ID)
+        if column not in self.__manifest["columns"]["test"]:
+            return []
+        test_exec_IDs = self.get_column("test", "test_exec_ID")
+        values = self.get_column("test", column)
+        return [(test_exec_IDs[index], values[index])
+                for index in self.select_test_rows(test_def_ID, VNF_ID, start_time, end_time)
+                if not math.isnan(values[index])]
+
+    def get_recovery_time_statistics(self, test_def_ID=None, VNF_ID=None, start_time=None, end_time=None):
+        """Return a dictionary of recovery time statistics (seconds) for executions matching the criteria."""
+        recovery_times = sorted(recovery_time_ns / NANOSECONDS_PER_SECOND for _, _, _, recovery_time_ns in
+                                self.query_recovery_times(test_def_ID, VNF_ID, start_time, end_time))
+        statistics = {"count": len(recovery_times)}
+        if len(recovery_times) > 0:
+            statistics["min (s)"] = recovery_times[0]
+            statistics["max (s)"] = recovery_times[-1]
+            statistics["mean (s)"] = sum(recovery_times) / len(recovery_times)
+            for percentile in (50, 95, 99):
+                # nearest-rank percentile
+                rank = max(1, math.ceil(percentile / 100 * len(recovery_times)))
+                statistics["p" + str(percentile) + " (s)"] = recovery_times[rank - 1]
+        return statistics
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: streaming statistics (aggregates) for resiliency metrics
+# Aggregates are updated one sample at a time (no need to keep all samples), have a bounded size,
+# and can be merged (e.g. aggregates from several runs, or from several hosts, into one):
+#   LogHistogram: HDR-style histogram with logarithmic buckets, for percentiles (p50, p95, p99) and mean (MTTR)
+#   FailureStatistics: failure count, total downtime and observation span, for MTBF
+#   RollingAvailability: uptime/downtime per fixed time bucket, for availability over a rolling window
+# Aggregates can be saved to and loaded from JSON files (see save_aggregate, load_aggregate).
+
+
+#docstring
+"""This module contains streaming statistics for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import json
+import math
+import sys
+
+
+# Constants
+DEFAULT_RELATIVE_ACCURACY =     0.01    # LogHistogram: 1% relative error on percentiles
+DEFAULT_BUCKET_SECONDS =        3600    # RollingAvailability: 1 hour buckets
+DEFAULT_RETENTION_SECONDS =     30*24*3600  # RollingAvailability: keep 30 days of buckets
+
+
+######################################################################
+
+class LogHistogram:
+    """HDR-style histogram for Auto project: positive values are counted in logarithmic buckets,
+    so that any percentile is known with a bounded relative error (relative_accuracy), whatever the number of samples.
+    Count, sum, min and max are exact. Two histograms with the same relative_accuracy can be merged.
+    """
+    def __init__ (self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0.0 < relative_accuracy < 1.0:
+            print("LogHistogram constructor: incorrect relative_accuracy=",relative_accuracy)
+            sys.exit()  # stop entire program, because accuracy MUST be correct
+        self.relative_accuracy = relative_accuracy
+        # bucket i holds values in (gamma^(i-1), gamma^i]
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}       # bucket index -> count
+        self.zero_count = 0     # values <= 0 (e.g. restoration detected at first check)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value, count=1):
+        """Add a value (count times)."""
+        if value > 0.0:
+            bucket_index = int(math.ceil(math.log(value) / self.log_gamma))
+            self.buckets[bucket_index] = self.buckets.get(bucket_index, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        if self.min == None or value < self.min:
+            self.min = value
+        if self.max == None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add all values of another LogHistogram (same relative_accuracy) to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            print("LogHistogram merge: different relative accuracies ",self.relative_accuracy,other.relative_accuracy)
+            sys.exit()  # stop entire program, because merged buckets would be wrong
+        for bucket_index, bucket_count in other.buckets.items():
+            self.buckets[bucket_index] = self.buckets.get(bucket_index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min != None and (self.min == None or other.min < self.min):
+            self.min = other.min
+        if other.max != None and (self.max == None or other.max > self.max):
+            self.max = other.max
+
+    def get_percentile(self, percentile):
+        """Return the value at a percentile (0 to 100), within relative_accuracy; None if no value."""
+        if self.count == 0:
+            return None
+        if percentile <= 0:
+            return self.min
+        if percentile >= 100:
+            return self.max
+        # rank of the requested value, among values sorted in increasing order (0-based)
+        rank = int(math.ceil(percentile / 100.0 * self.count)) - 1
+        if rank < self.zero_count:
+            return self.min if self.min < 0.0 else 0.0
+        cumulated_count = self.zero_count
+        for bucket_index in sorted(self.buckets):
+            cumulated_count += self.buckets[bucket_index]
+            if cumulated_count > rank:
+                # middle of the bucket, in relative terms; stay within exact min/max
+                value = 2.0 * math.pow(self.gamma, bucket_index) / (self.gamma + 1.0)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def get_mean(self):
+        """Return the exact mean; None if no value."""
+        if self.count == 0:
+            return None
+        return self.sum / self.count
+
+    def to_dict(self):
+        return {"type": "LogHistogram",
+                "relative_accuracy": self.relative_accuracy,
+                "buckets": {str(bucket_index): bucket_count for bucket_index, bucket_count in self.buckets.items()},
+                "zero_count": self.zero_count, "count": self.count, "sum": self.sum, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["relative_accuracy"])
+        histogram.buckets = {int(bucket_index): bucket_count for bucket_index, bucket_count in data["buckets"].items()}
+        histogram.zero_count = data["zero_count"]
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+######################################################################
+
+class FailureStatistics:
+    """Failure statistics for Auto project: number of failures, total downtime, and observation span
+    (earliest failure start to latest restoration, unless wider bounds are given), for MTTR and MTBF.
+    Times are numbers in seconds (e.g. POSIX timestamps). Can be merged.
+    """
+    def __init__ (self):
+        self.failure_count = 0
+        self.total_downtime = 0.0
+        self.observation_start = None
+        self.observation_end = None
+
+    def record_failure(self, failure_start, restoration_time):
+        """Add one failure, from its start time to its restoration time."""
+        self.failure_count += 1
+        self.total_downtime += restoration_time - failure_start
+        self.extend_observation(failure_start, restoration_time)
+
+    def extend_observation(self, observation_start, observation_end):
+        """Widen the observation span (e.g. to the whole campaign duration, including failure-free time)."""
+        if self.observation_start == None or observation_start < self.observation_start:
+            self.observation_start = observation_start
+        if self.observation_end == None or observation_end > self.observation_end:
+            self.observation_end = observation_end
+
+    def merge(self, other):
+        self.failure_count += other.failure_count
+        self.total_downtime += other.total_downtime
+        if other.observation_start != None:
+            self.extend_observation(other.observation_start, other.observation_end)
+
+    def get_MTTR(self):
+        """Mean Time To Repair/Recover (seconds); None if no failure."""
+        if self.failure_count == 0:
+            return None
+        return self.total_downtime / self.failure_count
+
+    def get_MTBF(self):
+        """Mean Time Between Failures (seconds): total uptime over the observation span, per failure; None if no failure."""
+        if self.failure_count == 0:
+            return None
+        return (self.observation_end - self.observation_start - self.total_downtime) / self.failure_count
+
+    def to_dict(self):
+        return {"type": "FailureStatistics",
+                "failure_count": self.failure_count, "total_downtime": self.total_downtime,
+                "observation_start": self.observation_start, "observation_end": self.observation_end}
+
+    @classmethod
+    def from_dict(cls, data):
+        statistics = cls()
+        statistics.failure_count = data["failure_count"]
+        statistics.total_downtime = data["total_downtime"]
+        statistics.observation_start = data["observation_start"]
+        statistics.observation_end = data["observation_end"]
+        return statistics
+
+
+######################################################################
+
+class RollingAvailability:
+    """Rolling availability for Auto project: downtime per fixed time bucket (bucket_seconds),
+    so that availability over any recent window is computed from a bounded number of buckets.
+    Buckets older than retention_seconds (relative to the latest recorded time) are dropped. Can be merged.
+    Times are numbers in seconds (e.g. POSIX timestamps).
+    """
+    def __init__ (self, bucket_seconds=DEFAULT_BUCKET_SECONDS, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.downtime_buckets = {}  # bucket index (time // bucket_seconds) -> downtime seconds in bucket
+        self.latest_time = None
+
+    def record_downtime(self, downtime_start, downtime_end):
+        """Add a downtime interval, split over the buckets it overlaps."""
+        current_time = downtime_start
+        while current_time < downtime_end:
+            bucket_index = int(current_time // self.bucket_seconds)
+            bucket_end = (bucket_index + 1) * self.bucket_seconds
+            interval_end = min(bucket_end, downtime_end)
+            self.downtime_buckets[bucket_index] = self.downtime_buckets.get(bucket_index, 0.0) + interval_end - current_time
+            current_time = interval_end
+        self.__update_latest_time(downtime_end)
+
+    def __update_latest_time(self, time_value):
+        if self.latest_time == None or time_value > self.latest_time:
+            self.latest_time = time_value
+        oldest_bucket_index = int((self.latest_time - self.retention_seconds) // self.bucket_seconds)
+        for bucket_index in [index for index in self.downtime_buckets if index < oldest_bucket_index]:
+            del self.downtime_buckets[bucket_index]
+
+    def merge(self, other):
+        if other.bucket_seconds != self.bucket_seconds:
+            print("RollingAvailability merge: different bucket sizes ",self.bucket_seconds,other.bucket_seconds)
+            sys.exit()  # stop entire program, because merged buckets would be wrong
+        for bucket_index, downtime in other.downtime_buckets.items():
+            self.downtime_buckets[bucket_index] = self.downtime_buckets.get(bucket_index, 0.0) + downtime
+        if other.latest_time != None:
+            self.__update_latest_time(other.latest_time)
+
+    def get_availability(self, window_seconds, window_end=None):
+        """Return availability (0 to 100) over the window_seconds before window_end (default: latest recorded time),
+        at bucket resolution; None if nothing was recorded."""
+        if window_end == None:
+            window_end = self.latest_time
+        if window_end == None or window_seconds <= 0:
+            return None
+        first_bucket_index = int((window_end - window_seconds) // self.bucket_seconds)
+        last_bucket_index = int(window_end // self.bucket_seconds)
+        downtime = 0.0
+        for bucket_index in range(first_bucket_index, last_bucket_index + 1):
+            downtime += self.downtime_buckets.get(bucket_index, 0.0)
+        return max(0.0, 100.0 * (window_seconds - downtime) / window_seconds)
+
+    def to_dict(self):
+        return {"type": "RollingAvailability",
+                "bucket_seconds": self.bucket_seconds, "retention_seconds": self.retention_seconds,
+                "downtime_buckets": {str(bucket_index): downtime for bucket_index, downtime in self.downtime_buckets.items()},
+                "latest_time": self.latest_time}
+
+    @classmethod
+    def from_dict(cls, data):
+        availability = cls(data["bucket_seconds"], data["retention_seconds"])
+        availability.downtime_buckets = {int(bucket_index): downtime
+                                         for bucket_index, downtime in data["downtime_buckets"].items()}
+        availability.latest_time = data["latest_time"]
+        return availability
+
+
+######################################################################
+
+AGGREGATE_CLASSES = {
+    "LogHistogram":         LogHistogram,
+    "FailureStatistics":    FailureStatistics,
+    "RollingAvailability":  RollingAvailability,
+}
+
+
+def save_aggregate(aggregate, file_name):
+    """Write an aggregate to a JSON file (replace content)."""
+    try:
+        with open(file_name, "w") as json_file:
+            json.dump(aggregate.to_dict(), json_file)
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
+
+
+def load_aggregate(file_name):
+    """Read an aggregate from a JSON file; None if the file does not exist."""
+    try:
+        with open(file_name, "r") as json_file:
+            data = json.load(json_file)
+        return AGGREGATE_CLASSES[data["type"]].from_dict(data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
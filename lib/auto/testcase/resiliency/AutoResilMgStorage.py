@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: storage of definition data and execution results in an SQLite database
+# (alternative to the binary pickle files; selected with AutoResilMgTestDef.set_storage_backend)
+
+# One row per definition object, indexed by store (FILE_* constant) and ID, with extra indexed columns/tables
+# for queries by test case and by related/impacted resource. Objects are stored as their class name and their
+# attributes in plain JSON (encoded and decoded by functions given by the caller, the same as definitions snapshots
+# use): the database is shared by several runners, and reading it must not run code (as unpickling could).
+# Databases of schema version 1 (pickled objects) are not read: their tables are renamed (*_pickled), and kept.
+# Each write is a transaction; the database is in WAL mode, so several test runners can share it.
+
+
+#docstring
+"""This module contains the SQLite storage backend for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import sqlite3
+import threading
+
+
+# Constants
+DATABASE_FILE =         "AutoResilDefinitions.db"
+DATABASE_TIMEOUT =      30.0  # seconds to wait for a lock held by another runner
+SCHEMA_VERSION =        2     # version 1: objects as pickles
+
+SCHEMA_STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS definitions (
+           store TEXT NOT NULL,
+           ID INTEGER NOT NULL,
+           position INTEGER NOT NULL,
+           name TEXT,
+           test_case_ID INTEGER,
+           class TEXT NOT NULL,
+           attributes TEXT NOT NULL,
+           PRIMARY KEY (store, ID))""",
+    """CREATE INDEX IF NOT EXISTS definitions_test_case ON definitions (test_case_ID)""",
+    """CREATE TABLE IF NOT EXISTS related_resources (
+           store TEXT NOT NULL,
+           ID INTEGER NOT NULL,
+           attribute TEXT NOT NULL,
+           resource_kind TEXT NOT NULL,
+           resource_ID INTEGER NOT NULL)""",
+    """CREATE INDEX IF NOT EXISTS related_resources_resource ON related_resources (resource_kind, resource_ID)""",
+    """CREATE INDEX IF NOT EXISTS related_resources_item ON related_resources (store, ID)""",
+    """CREATE TABLE IF NOT EXISTS store_versions (
+           store TEXT PRIMARY KEY,
+           version INTEGER NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS executions (
+           kind TEXT NOT NULL,
+           ID INTEGER NOT NULL,
+           definition_ID INTEGER,
+           start_time TEXT,
+           recovery_time_seconds REAL,
+           class TEXT NOT NULL,
+           attributes TEXT NOT NULL,
+           PRIMARY KEY (kind, ID))""",
+    """CREATE INDEX IF NOT EXISTS executions_definition ON executions (kind, definition_ID)""",
+]
+
+
+######################################################################
+
+class SQLiteDefinitionStore:
+    """Definition and results store for Auto project, in an SQLite database file.
+    A store name (usually a FILE_* constant) plays the role of a binary file name.
+    related_resource_attributes maps object attribute names (lists of resource IDs) to resource kinds.
+    encode_item(item) returns (class name, attributes as JSON text); decode_item(class name, attributes JSON text)
+    rebuilds the object (see AutoResilMgTestDef.encode_stored_item and decode_stored_item).
+    """
+    def __init__ (self, database_file=DATABASE_FILE, related_resource_attributes=None,
+                  encode_item=None, decode_item=None):
+        self.database_file = database_file
+        if related_resource_attributes == None:
+            related_resource_attributes = {}
+        self.related_resource_attributes = related_resource_attributes
+        self.encode_item = encode_item
+        self.decode_item = decode_item
+        # sqlite3 connections must not be shared between threads: one per thread
+        self.__local = threading.local()
+        conn = self.__get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self.__set_aside_pickled_tables(conn)
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(statement)
+            conn.execute("PRAGMA user_version = " + str(SCHEMA_VERSION))
+
+    def __set_aside_pickled_tables(self, conn):
+        """Rename tables of a schema version 1 database (pickled objects, never read): definitions must be written
+        again (e.g. by init_all_definitions), executions are still in their CSV files."""
+        table_names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for table_name, index_name in (("definitions", "definitions_test_case"), ("executions", "executions_definition")):
+            if table_name in table_names and table_name + "_pickled" not in table_names:
+                conn.execute("DROP INDEX IF EXISTS " + index_name)
+                conn.execute("ALTER TABLE " + table_name + " RENAME TO " + table_name + "_pickled")
+                print("Database", self.database_file, "has pickled objects in table", table_name,
+                      "(not read): renamed to", table_name + "_pickled")
+        # stores of renamed tables do not exist anymore
+        for table_name in ("related_resources", "store_versions"):
+            if table_name in table_names:
+                conn.execute("DELETE FROM " + table_name)
+
+    def __get_connection(self):
+        conn = getattr(self.__local, "conn", None)
+        if conn == None:
+            conn = sqlite3.connect(self.database_file, timeout=DATABASE_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.__local.conn = conn
+        return conn
+
+    def close(self):
+        """Close the connection of the calling thread."""
+        conn = getattr(self.__local, "conn", None)
+        if conn != None:
+            conn.close()
+            self.__local.conn = None
+
+    def __insert_row(self, conn, store, item, position):
+        """Insert one object and its related resources; return False if the ID is already in the store."""
+        class_name, attributes_JSON = self.encode_item(item)
+        cursor = conn.execute("INSERT OR IGNORE INTO definitions (store, ID, position, name, test_case_ID, class, "
+                              "attributes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (store, item.ID, position, getattr(item, "name", None),
+                               getattr(item, "test_case_ID", None), class_name, attributes_JSON))
+        if cursor.rowcount == 0:
+            return False
+        for attribute_name, resource_kind in self.related_resource_attributes.items():
+            resource_ID_list = getattr(item, attribute_name, None)
+            if resource_ID_list != None:
+                conn.executemany("INSERT INTO related_resources (store, ID, attribute, resource_kind, resource_ID) "
+                                 "VALUES (?, ?, ?, ?, ?)",
+                                 [(store, item.ID, attribute_name, resource_kind, resource_ID)
+                                  for resource_ID in resource_ID_list])
+        return True
+
+    def __bump_version(self, conn, store):
+        conn.execute("INSERT OR IGNORE INTO store_versions (store, version) VALUES (?, 0)", (store,))
+        conn.execute("UPDATE store_versions SET version = version + 1 WHERE store = ?", (store,))
+
+    def write_list(self, inserted_list, store):
+        """Replace the content of a store with a list of objects (one transaction)."""
+        conn = self.__get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM definitions WHERE store = ?", (store,))
+            conn.execute("DELETE FROM related_resources WHERE store = ?", (store,))
+            position = 0
+            for item in inserted_list:
+                # duplicate IDs: keep the first one, like a linear scan of the list would
+                if self.__insert_row(conn, store, item, position):
+                    position += 1
+            self.__bump_version(conn, store)
+
+    def read_list(self, store):
+        """Return all objects of a store, in insertion order (empty list if store is empty or unknown)."""
+        rows = self.__get_connection().execute("SELECT class, attributes FROM definitions WHERE store = ? "
+                                               "ORDER BY position", (store,))
+        return [self.decode_item(*row) for row in rows]
+
+    def insert_item(self, item, store):
+        """Add one object to a store (one transaction, no rewrite); return False if its ID is already there."""
+        conn = self.__get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM definitions WHERE store = ?",
+                                    (store,)).fetchone()[0]
+            inserted = self.__insert_row(conn, store, item, position)
+            if inserted:
+                self.__bump_version(conn, store)
+        return inserted
+
+    def iter_list(self, store):
+        """Yield the objects of a store one by one, in insertion order, without loading the whole store."""
+        cursor = self.__get_connection().execute("SELECT class, attributes FROM definitions WHERE store = ? "
+                                                 "ORDER BY position", (store,))
+        for row in cursor:
+            yield self.decode_item(*row)
+
+    def get_version(self, store):
+        """Return a number that changes each time the store is written (0 if never written)."""
+        row = self.__get_connection().execute("SELECT version FROM store_versions WHERE store = ?",
+                                              (store,)).fetchone()
+        if row == None:
+            return 0
+        return row[0]
+
+    def get_item(self, index, store):
+        """Return the object with that ID in a store, or None."""
+        row = self.__get_connection().execute("SELECT class, attributes FROM definitions WHERE store = ? AND ID = ?",
+                                              (store, index)).fetchone()
+        if row == None:
+            return None
+        return self.decode_item(*row)
+
+    def get_items_by_test_case(self, test_case_ID, store=None):
+        """Return objects associated to a test case (e.g. test definitions), optionally limited to one store."""
+        query = "SELECT class, attributes FROM definitions WHERE test_case_ID = ?"
+        params = [test_case_ID]
+        if store != None:
+            query += " AND store = ?"
+            params.append(store)
+        rows = self.__get_connection().execute(query + " ORDER BY store, position", params)
+        return [self.decode_item(*row) for row in rows]
+
+    def get_items_by_related_resource(self, resource_kind, resource_ID, store=None, impacted_only=False):
+        """Return objects related to a resource (resource_kind: "physical", "cloud", "VNF").
+        With impacted_only, only objects listing it as impacted (challenge definitions) are returned.
+        """
+        query = ("SELECT DISTINCT d.store, d.position, d.class, d.attributes FROM definitions d JOIN related_resources r "
+                 "ON d.store = r.store AND d.ID = r.ID WHERE r.resource_kind = ? AND r.resource_ID = ?")
+        params = [resource_kind, resource_ID]
+        if store != None:
+            query += " AND d.store = ?"
+            params.append(store)
+        if impacted_only:
+            query += " AND r.attribute LIKE 'impacted%'"
+        rows = self.__get_connection().execute(query + " ORDER BY d.store, d.position", params)
+        return [self.decode_item(row[2], row[3]) for row in rows]
+
+    def get_items_by_impacted_resource(self, resource_kind, resource_ID):
+        """Return challenge definitions impacting a resource (resource_kind: "physical" or "cloud")."""
+        return self.get_items_by_related_resource(resource_kind, resource_ID, impacted_only=True)
+
+    def insert_execution(self, kind, execution, definition_ID, start_time=None, recovery_time_seconds=None):
+        """Store one execution result (kind: "test" or "challenge"); replaces a previous result with same kind and ID."""
+        class_name, attributes_JSON = self.encode_item(execution)
+        conn = self.__get_connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO executions (kind, ID, definition_ID, start_time, recovery_time_seconds, "
+                         "class, attributes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (kind, execution.ID, definition_ID, start_time, recovery_time_seconds, class_name,
+                          attributes_JSON))
+
+    def get_executions(self, kind, definition_ID=None):
+        """Return stored execution results of one kind, optionally for one definition ID."""
+        query = "SELECT class, attributes FROM executions WHERE kind = ?"
+        params = [kind]
+        if definition_ID != None:
+            query += " AND definition_ID = ?"
+            params.append(definition_ID)
+        rows = self.__get_connection().execute(query + " ORDER BY ID", params)
+        return [self.decode_item(*row) for row in rows]
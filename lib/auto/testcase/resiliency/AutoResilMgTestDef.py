@@ -50,12 +50,27 @@ Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
 # import statements
 import pickle
 import csv
+import gzip
+import base64
+import io
 import sys
+import os
+import hashlib
+import threading
+import json
+import types
+import fcntl
+from array import array
 from enum import Enum
 from datetime import datetime, timedelta
 import AutoResilGlobal
-import openstack
+import AutoResilMgStorage
+import AutoResilMgStats
+import AutoResilMgGraph
+import AutoResilMgCodes
+import AutoResilItfCloud
 import time
+from AutoResilMgTrace import tracer
 
 
 # Constants with definition file names
@@ -68,14 +83,66 @@ FILE_METRIC_DEFINITIONS =       "DefinitionsMetrics.bin"
 FILE_CHALLENGE_DEFINITIONS =    "DefinitionsChallenges.bin"
 FILE_TEST_DEFINITIONS =         "DefinitionsTests.bin"
 
+# Streaming of execution results (see ResultStreamWriter): if True, run_test_code appends results to CSV files
+# as they happen, instead of writing them all at the end; rows are flushed every RESULT_STREAM_FLUSH_ROWS rows,
+# and synced to disk (fsync) at least every RESULT_STREAM_FSYNC_SECONDS seconds
+STREAM_EXECUTION_RESULTS =      False
+RESULT_STREAM_FLUSH_ROWS =      50
+RESULT_STREAM_FSYNC_SECONDS =   5.0
+
+# format of times in result CSV files (wall clock, for display; durations come from a monotonic clock)
+CSV_TIME_FORMAT =               "%Y-%m-%d %H:%M:%S.%f"
+
+# last allocated execution IDs, per kind of execution (see allocate_execution_ID)
+FILE_EXECUTION_IDS =            "ExecutionIDs.json"
+
+# fingerprints of definition sets, for incremental initialization (see init_all_definitions)
+FILE_DEFINITION_FINGERPRINTS =  "DefinitionsFingerprints.json"
+
 # Other constants
 INDENTATION_MULTIPLIER =        4
 
+# OpenStack test environment used by challenge and test codes 005 (connections: see AutoResilItfCloud)
+TEST_CLOUD_NAME =               AutoResilItfCloud.OPENSTACK_CLOUD_NAME
+TEST_CLOUD_REGION_NAME =        AutoResilItfCloud.OPENSTACK_REGION_NAME
+TEST_VM_ID =                    '5d07da11-0e85-4256-9894-482dcee4a5f0'  # arbitrary in this test, grab from OpenStack
+
+# Definition file cache: validation mode ("mtime": file mtime and size, "hash": content hash),
+# and minimum delay (seconds) between two validations of the same file (0: validate on every lookup)
+DEFINITION_CACHE_VALIDATION =           "mtime"
+DEFINITION_CACHE_REVALIDATE_SECONDS =   1.0
+
+# Storage backend for definition data: "pickle" (one binary file per FILE_* constant)
+# or "sqlite" (one database, FILE_* constants are store names); change with set_storage_backend()
+STORAGE_BACKEND =                       "pickle"
+definition_store =                      None   # AutoResilMgStorage.SQLiteDefinitionStore, if backend is "sqlite"
+
 
 ######################################################################
 
+def set_storage_backend(backend, database_file=AutoResilMgStorage.DATABASE_FILE):
+    """Select where definition lists are stored: "pickle" (binary files) or "sqlite" (database_file)."""
+    global STORAGE_BACKEND, definition_store
+    if backend == "sqlite":
+        definition_store = AutoResilMgStorage.SQLiteDefinitionStore(database_file, RELATED_RESOURCE_ATTRIBUTES,
+                                                                    encode_stored_item, decode_stored_item)
+    elif backend == "pickle":
+        definition_store = None
+    else:
+        print("Unknown storage backend: ",backend)
+        sys.exit()  # stop entire program, because storage backend MUST be correct
+    STORAGE_BACKEND = backend
+    definition_file_cache.invalidate()
+
+
 def read_list_bin(file_name):
     """Generic function to extract a list from a binary file."""
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            return DefinitionRegistry(definition_store.read_list(file_name))
+        except Exception as e:
+            print(type(e), e)
+            sys.exit()
     try:
         extracted_list = []
         with open(file_name, "rb") as binary_file:
@@ -91,13 +158,107 @@ def read_list_bin(file_name):
 def write_list_bin(inserted_list, file_name):
     """Generic function to write a list to a binary file (replace content)."""
     try:
-        with open(file_name, "wb") as binary_file:
-            pickle.dump(inserted_list, binary_file)
+        if STORAGE_BACKEND == "sqlite":
+            definition_store.write_list(inserted_list, file_name)
+        else:
+            with open(file_name, "wb") as binary_file:
+                pickle.dump(inserted_list, binary_file)
+        # file changed: the next cached lookup must reload it
+        definition_file_cache.invalidate(file_name)
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
+
+
+execution_ID_lock = threading.Lock()
+
+def allocate_execution_ID(kind):
+    """Return a new unique execution ID for a kind of execution ("test" or "challenge"), starting at 1.
+    Last IDs are kept in FILE_EXECUTION_IDS, locked while updated, so that concurrent threads and processes
+    never get the same ID."""
+    try:
+        with execution_ID_lock:
+            with open(FILE_EXECUTION_IDS, "a+") as json_file:
+                fcntl.flock(json_file, fcntl.LOCK_EX)  # released when file is closed
+                json_file.seek(0)
+                content = json_file.read()
+                last_IDs = json.loads(content) if content != "" else {}
+                new_ID = last_IDs.get(kind, 0) + 1
+                last_IDs[kind] = new_ID
+                json_file.seek(0)
+                json_file.truncate()
+                json.dump(last_IDs, json_file)
+        return new_ID
     except Exception as e:
         print(type(e), e)
         sys.exit()
 
 
+class DefinitionFileCache:
+    """In-process cache of lists stored in definition binary files, shared by all FILE_* constants.
+    An entry is reloaded when the file changes, detected by mtime and size, or by content hash.
+    """
+    def __init__ (self, validation=DEFINITION_CACHE_VALIDATION,
+                  revalidate_seconds=DEFINITION_CACHE_REVALIDATE_SECONDS):
+        if validation not in ("mtime", "hash"):
+            print("DefinitionFileCache constructor: incorrect validation=",validation)
+            sys.exit()  # stop entire program, because validation mode MUST be correct
+        self.validation = validation
+        self.revalidate_seconds = revalidate_seconds
+        # file name -> [validation key, extracted list, monotonic time of last validation]
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+    def __get_validation_key(self, file_name):
+        """Return a key that changes when the file content changes (None if file does not exist)."""
+        if STORAGE_BACKEND == "sqlite":
+            return ("sqlite", definition_store.get_version(file_name))
+        try:
+            if self.validation == "hash":
+                with open(file_name, "rb") as binary_file:
+                    return hashlib.sha1(binary_file.read()).hexdigest()
+            file_stat = os.stat(file_name)
+            return (file_stat.st_mtime_ns, file_stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def get_list(self, file_name):
+        """Return the list stored in a binary file, from memory if the file did not change since it was loaded.
+        The returned registry is shared by all callers: do not change its items in place (copy them first, like
+        copy.copy), or call its reindex() after the change."""
+        with self.__lock:
+            now = time.monotonic()
+            entry = self.__entries.get(file_name)
+            if entry != None and now - entry[2] < self.revalidate_seconds:
+                return entry[1]  # hot lookup: no disk access at all
+
+            validation_key = self.__get_validation_key(file_name)
+            if entry != None and validation_key != None and entry[0] == validation_key:
+                entry[2] = now
+                return entry[1]
+
+            extracted_list = read_list_bin(file_name)
+            if extracted_list != None and not isinstance(extracted_list, DefinitionRegistry):
+                extracted_list = DefinitionRegistry(extracted_list)  # file written before registries: index it once
+            if extracted_list != None and validation_key != None:
+                self.__entries[file_name] = [validation_key, extracted_list, now]
+            else:
+                self.__entries.pop(file_name, None)
+            return extracted_list
+
+    def invalidate(self, file_name=None):
+        """Forget one cached file, or all of them if no file name is given."""
+        with self.__lock:
+            if file_name == None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(file_name, None)
+
+
+# cache instance shared by all definition files
+definition_file_cache = DefinitionFileCache()
+
+
 class AutoBaseObject:
     """Base class for Auto project, with common attributes (ID, name)."""
     def __init__ (self, param_ID, param_name):
@@ -111,9 +272,121 @@ class AutoBaseObject:
         return ("ID="+str(self.ID)+" name="+self.name)
 
 
+# attributes holding lists of related resource IDs, indexed by DefinitionRegistry (attribute name -> resource kind)
+RELATED_RESOURCE_ATTRIBUTES = {
+    "related_phys_rsrc_ID_list":        "physical",
+    "related_cloud_virt_rsrc_ID_list":  "cloud",
+    "impacted_phys_resource_ID_list":   "physical",
+    "impacted_cloud_resource_ID_list":  "cloud",
+    "VNF_ID_list":                      "VNF",
+}
+
+
+class DefinitionRegistry(list):
+    """Registry of AutoBaseObject for Auto project: a list, with a hash index by ID,
+    and secondary indexes by name and by related resource (kind, ID).
+    It can be used wherever a list of AutoBaseObject was used (init functions, binary files, AutoResilGlobal).
+    Items are indexed when they are added: after changing an item in place (ID, name or related resource lists),
+    call reindex(), or lookups keep returning the item under its old values.
+    """
+    def __init__ (self, items=()):
+        list.__init__(self)
+        self.__reset_indexes()
+        self.extend(items)
+
+    def __reset_indexes(self):
+        self.__by_ID = {}
+        self.__by_name = {}
+        self.__by_related_resource = {}
+
+    def __index_item(self, item):
+        if not isinstance(item, AutoBaseObject):
+            print("Issue with list: item is not AutoBaseObject")
+            print(" item=\n",item)
+            sys.exit()  # stop entire program, because registry MUST only contain AutoBaseObject
+        # keep first item for a given ID, like a linear scan would
+        self.__by_ID.setdefault(item.ID, item)
+        self.__by_name.setdefault(item.name, []).append(item)
+        for attribute_name, resource_kind in RELATED_RESOURCE_ATTRIBUTES.items():
+            resource_ID_list = getattr(item, attribute_name, None)
+            if resource_ID_list != None:
+                for resource_ID in resource_ID_list:
+                    self.__by_related_resource.setdefault((resource_kind, resource_ID), []).append(item)
+
+    def __rebuild_indexes(self):
+        self.__reset_indexes()
+        for item in self:
+            self.__index_item(item)
+
+    def reindex(self):
+        """Rebuild all indexes from the current items (call it after changing items in place)."""
+        self.__rebuild_indexes()
+
+    # list mutators: keep indexes in sync (appends are incremental, other changes rebuild)
+    def append(self, item):
+        self.__index_item(item)
+        list.append(self, item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, position, item):
+        list.insert(self, position, item)
+        self.__rebuild_indexes()
+
+    def remove(self, item):
+        list.remove(self, item)
+        self.__rebuild_indexes()
+
+    def pop(self, *args):
+        item = list.pop(self, *args)
+        self.__rebuild_indexes()
+        return item
+
+    def clear(self):
+        list.clear(self)
+        self.__reset_indexes()
+
+    def __setitem__(self, key, value):
+        list.__setitem__(self, key, value)
+        self.__rebuild_indexes()
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self.__rebuild_indexes()
+
+    # pickle as a plain list of items: indexes are rebuilt when loaded
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    # lookups, O(1)
+    def has_ID(self, index):
+        return index in self.__by_ID
+
+    def get_by_ID(self, index):
+        return self.__by_ID.get(index)
+
+    def get_by_name(self, name):
+        """Return the list of items with that name (names are not unique)."""
+        return list(self.__by_name.get(name, []))
+
+    def get_by_related_resource(self, resource_kind, resource_ID):
+        """Return the list of items related to a resource; resource_kind is one of the values of RELATED_RESOURCE_ATTRIBUTES
+        ("physical", "cloud", "VNF")."""
+        return list(self.__by_related_resource.get((resource_kind, resource_ID), []))
+
+
 def index_already_there(index, given_list):
     """Generic function to check if an index already exists in a list of AutoBaseObject."""
 
+    if isinstance(given_list, DefinitionRegistry):
+        return given_list.has_ID(index)
+
     # check if ID already exists
     already_there = False
     if len(given_list)>0:
@@ -132,6 +405,9 @@ def index_already_there(index, given_list):
 def get_indexed_item_from_list(index, given_list):
     """Generic function to get an indexed entry from a list of AutoBaseObject."""
 
+    if isinstance(given_list, DefinitionRegistry):
+        return given_list.get_by_ID(index)
+
     returned_item = None
 
     if len(given_list)>0:
@@ -150,7 +426,9 @@ def get_indexed_item_from_list(index, given_list):
 def get_indexed_item_from_file(index, file_name):
     """Generic function to get an indexed entry from a list of AutoBaseObject stored in a binary file."""
 
-    list_in_file = read_list_bin(file_name)
+    list_in_file = definition_file_cache.get_list(file_name)
+    if list_in_file == None:
+        return None
     return get_indexed_item_from_list(index, list_in_file)
 
 
@@ -180,27 +458,81 @@ class TestCase(AutoBaseObject):
         print(indent, "|-JIRA URL:", self.JIRA_URL, sep='')
 
 
+def add_item_to_file(item, file_name):
+    """Generic function to add one AutoBaseObject to a definition file, unless its ID is already there;
+    return True if added. With the sqlite backend, this is a single-row insert instead of a file rewrite."""
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            added = definition_store.insert_item(item, file_name)
+        except Exception as e:
+            print(type(e), e)
+            sys.exit()
+        definition_file_cache.invalidate(file_name)
+        return added
+
+    items = read_list_bin(file_name)
+    if items == None:
+        items = DefinitionRegistry()
+    if index_already_there(item.ID, items):
+        return False
+    items.append(item)
+    write_list_bin(items, file_name)
+    return True
+
+
+# resource dependency graph (see AutoResilMgGraph), built from the global resource lists when first needed,
+# then updated incrementally by add_resource_to_file
+RESOURCE_FILE_KINDS = {
+    FILE_PHYSICAL_RESOURCES:    "physical",
+    FILE_CLOUD_RESOURCES:       "cloud",
+    FILE_VNFS_SERVICES:         "VNF",
+}
+resource_graph = None
+resource_graph_lock = threading.Lock()
+
+def get_resource_graph():
+    """Return the resource dependency graph of the global resource lists."""
+    global resource_graph
+    with resource_graph_lock:
+        if resource_graph == None:
+            resource_graph = AutoResilMgGraph.build_resource_graph(AutoResilGlobal.physical_resource_list,
+                                                                  AutoResilGlobal.cloud_virtual_resource_list,
+                                                                  AutoResilGlobal.VNF_Service_list)
+        return resource_graph
+
+def reset_resource_graph():
+    """Forget the resource dependency graph (global resource lists were replaced); rebuilt when next needed."""
+    global resource_graph
+    with resource_graph_lock:
+        resource_graph = None
+
+def add_resource_to_file(resource, file_name):
+    """Add a resource (physical, cloud virtual, VNF/service) to its definition file and to the dependency graph,
+    unless its ID is already there; return True if added."""
+    added = add_item_to_file(resource, file_name)
+    if added:
+        with resource_graph_lock:
+            if resource_graph != None:
+                resource_graph.add_resource_object(RESOURCE_FILE_KINDS[file_name], resource)
+    return added
+
+
 # no need for functions to remove data: ever-growing library, arbitrary ID
 # initial version: should not even add data dynamically, in case object signature changes
 # better stick to initialization functions only to fill data, unless 100% sure signature does not change
 def add_test_case_to_file(test_case_ID, test_case_name, test_case_JIRA_URL):
     """Function to add persistent data about test cases (in binary file)."""
 
-    test_cases = read_list_bin(FILE_TEST_CASES)
-
-    if index_already_there(test_case_ID, test_cases):
+    if not add_item_to_file(TestCase(test_case_ID, test_case_name, test_case_JIRA_URL), FILE_TEST_CASES):
         print("Test Case ID=",test_case_ID," is already defined and can't be added")
-    else:
-        test_cases.append(TestCase(test_case_ID, test_case_name, test_case_JIRA_URL))
-        write_list_bin(test_cases, FILE_TEST_CASES)
 
-    return test_cases
+    return read_list_bin(FILE_TEST_CASES)
 
 
 
 def init_test_cases():
     """Function to initialize test case data."""
-    test_cases = []
+    test_cases = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     test_case_ID = 1
@@ -295,10 +627,11 @@ class TestDefinition(AutoBaseObject):
 
         # constant for total number of test codes (one of them is used per TestDefinition instance); would be 1 per test case
         self.TOTAL_NUMBER_OF_TEST_CODES = 10
-        # chosen test code ID (the ID is an index in a list of method names) for this instance; convention: [1;N]; in list, index is [0;N-1]
+        # chosen test code for this instance: either a number in [1;N] (built-in code test_code001 to test_codeN),
+        # or the name of a code registered in AutoResilMgCodes.test_codes (possibly provided by another package)
         # a test code could use for instance Python clients (for OpenStack, Kubernetes, etc.), or HTTP APIs, or some of the CLI/API commands
         try:
-            if 1 <= test_def_codeID <= self.TOTAL_NUMBER_OF_TEST_CODES:
+            if isinstance(test_def_codeID, str) or 1 <= test_def_codeID <= self.TOTAL_NUMBER_OF_TEST_CODES:
                 self.test_code_ID = test_def_codeID
             else:
                 print("TestDefinition constructor: incorrect test_def_codeID=",test_def_codeID)
@@ -307,83 +640,210 @@ class TestDefinition(AutoBaseObject):
             print(type(e), e)
             sys.exit()  # stop entire program, because code ID MUST be correct
 
-        self.test_code_list = []  # list of method names; leave as per-object method (i.e. not as class methods or as static methods)
-        # add one by one, for easier later additions of new methods
-        self.test_code_list.append(self.test_code001)
-        self.test_code_list.append(self.test_code002)
-        self.test_code_list.append(self.test_code003)
-        self.test_code_list.append(self.test_code004)
-        self.test_code_list.append(self.test_code005)
-        self.test_code_list.append(self.test_code006)
-        self.test_code_list.append(self.test_code007)
-        self.test_code_list.append(self.test_code008)
-        self.test_code_list.append(self.test_code009)
-        self.test_code_list.append(self.test_code010)
+        # selected test code, bound to this instance when first run (only that one: see get_test_code)
+        self.__bound_test_code = None
+
+        # cloud connection manager used by test codes (None: shared manager, AutoResilItfCloud.openstack_connections)
+        self.connection_manager = None
+
+    # connection manager holds open connections, bound code refers to the instance: never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["connection_manager"] = None
+        state.pop("_TestDefinition__bound_test_code", None)
+        return state
+
+    def __setstate__(self, state):
+        state.pop("test_code_list", None)  # objects pickled with a list of all bound test codes
+        self.__dict__.update(state)
+        self.__dict__.setdefault("connection_manager", None)
+        self.__bound_test_code = None
+
+    def get_cloud_connection(self, cloud_name=TEST_CLOUD_NAME, region_name=TEST_CLOUD_REGION_NAME):
+        """Return a shared, authenticated OpenStack connection, from the injected connection manager if any."""
+        connection_manager = self.connection_manager
+        if connection_manager == None:
+            connection_manager = AutoResilItfCloud.openstack_connections
+        return connection_manager.get_connection(cloud_name, region_name)
+
+    def get_test_code_name(self):
+        """Return the registry name of the selected test code."""
+        if isinstance(self.test_code_ID, str):
+            return self.test_code_ID
+        return "test_code" + "{0:0=3d}".format(self.test_code_ID)
+
+    def get_test_code(self):
+        """Return the selected test code, bound to this instance (loaded from the registry and bound on first use)."""
+        if self.__bound_test_code == None:
+            test_code = AutoResilMgCodes.test_codes.get(self.get_test_code_name())
+            if test_code == None:
+                print("TestDefinition #", self.ID, ": unknown test code ", self.get_test_code_name(), sep='')
+                sys.exit()  # stop entire program, because code MUST be correct
+            self.__bound_test_code = types.MethodType(test_code, self)
+        return self.__bound_test_code
 
 
     def run_test_code(self, *test_code_args, **test_code_kwargs):
-        """Run currently selected test code. Common code runs here, specific code is invoked through test_code_list and test_code_ID.
-        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code."""
+        """Run currently selected test code. Common code runs here, specific code is invoked through get_test_code (selected by test_code_ID).
+        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code.
+        Returns the TestExecution instance (its challenge_exec_ID refers to the associated ChallengeExecution);
+        if the test code raised TimeoutError (restoration not detected in time), its restored attribute is False.
+        A challenge which was started is always stopped, even if the execution fails."""
+        chall_exec = None
+        test_exec = None
+        challenge_def = None
+        challenge_stop_needed = False
         try:
             # here, trigger start code from challenge def (to simulate VM failure), manage Recovery time measurement,
             # specific monitoring of VNF, trigger stop code from challenge def
 
-            time1 = datetime.now()  # get time as soon as execution starts
-
-            # create challenge execution instance
-            chall_exec_ID = 1  # ideally, would be incremented, but need to maintain a number of challenge executions somewhere. or could be random.
-            chall_exec_name = 'challenge execution'  # challenge def ID is already passed
-            chall_exec_challDefID = self.challenge_def_ID
-            chall_exec = ChallengeExecution(chall_exec_ID, chall_exec_name, chall_exec_challDefID)
-            chall_exec.log.append_to_list('challenge execution created')
-
-            # create test execution instance
-            test_exec_ID = 1  # ideally, would be incremented, but need to maintain a number of text executions somewhere. or could be random.
-            test_exec_name = 'test execution'  # test def ID is already passed
-            test_exec_testDefID = self.ID
-            test_exec_userID = ''  # or get user name from getpass module: import getpass and test_exec_userID = getpass.getuser()
-            test_exec = TestExecution(test_exec_ID, test_exec_name, test_exec_testDefID, chall_exec_ID, test_exec_userID)
-            test_exec.log.append_to_list('test execution created')
-
-            # get time1 before anything else, so the setup time is counted
-            test_exec.start_time = time1
-
-            # get challenge definition instance, and start challenge
-            challenge_def = get_indexed_item_from_list(self.challenge_def_ID, AutoResilGlobal.challenge_definition_list)
-            challenge_def.run_start_challenge_code()
-
-            # memorize challenge start time
-            chall_exec.start_time = datetime.now()
+            # all instants are recorded with a monotonic clock; datetimes are derived from it, for display only
+            timeline = MonotonicTimeline()
+            timeline.mark("test_start")  # get time as soon as execution starts
+
+            # each phase is a tracing span (see AutoResilMgTrace; no-op if tracing is disabled)
+            with tracer.span("setup", test_def_ID=self.ID):
+                # create challenge execution instance
+                chall_exec_ID = allocate_execution_ID("challenge")
+                chall_exec_name = 'challenge execution'  # challenge def ID is already passed
+                chall_exec_challDefID = self.challenge_def_ID
+                chall_exec = ChallengeExecution(chall_exec_ID, chall_exec_name, chall_exec_challDefID)
+                chall_exec.timeline = timeline
+                chall_exec.log.append_to_list('challenge execution created')
+
+                # create test execution instance
+                test_exec_ID = allocate_execution_ID("test")
+                test_exec_name = 'test execution'  # test def ID is already passed
+                test_exec_testDefID = self.ID
+                test_exec_userID = ''  # or get user name from getpass module: import getpass and test_exec_userID = getpass.getuser()
+                test_exec = TestExecution(test_exec_ID, test_exec_name, test_exec_testDefID, chall_exec_ID, test_exec_userID)
+                test_exec.timeline = timeline
+                test_exec.log.append_to_list('test execution created')
+
+                # test start was marked before anything else, so the setup time is counted
+                test_exec.start_time = timeline.get_wall_datetime("test_start")
+                if STREAM_EXECUTION_RESULTS:
+                    test_exec.start_streaming()
+
+                # get Recovery Time (ID=1) and Time To Impair (ID=7) metric definitions before the challenge starts,
+                # so that these lookups are not timed
+                recovery_time_metric_def = get_indexed_item_from_file(1,FILE_METRIC_DEFINITIONS)
+                time_to_impair_metric_def = get_indexed_item_from_file(7,FILE_METRIC_DEFINITIONS)
+
+                # get challenge definition instance
+                challenge_def = get_indexed_item_from_list(self.challenge_def_ID, AutoResilGlobal.challenge_definition_list)
+
+            # start challenge; a challenge code may return the time.monotonic_ns() value at which it observed
+            # the impaired state (e.g. VM actually suspended): the challenge starts then, not when it was requested
+            timeline.mark("challenge_request")
+            challenge_stop_needed = True  # even if the start code fails: it may have impaired some resources
+            with tracer.span("challenge start", challenge_def_ID=self.challenge_def_ID):
+                impairment_ns = challenge_def.run_start_challenge_code()
+
+            # memorize challenge start time, and time to impair
+            if type(impairment_ns) == int:
+                timeline.mark("challenge_start", impairment_ns)
+            else:
+                timeline.mark("challenge_start")
+            test_exec.time_to_impair_ns = timeline.elapsed_ns("challenge_request", "challenge_start")
+            test_exec.associated_metric_values.append_to_list(
+                time_to_impair_metric_def.compute_from_ns(timeline.get_ns("challenge_request"),
+                                                          timeline.get_ns("challenge_start")))
+            chall_exec.start_time = timeline.get_wall_datetime("challenge_start")
             test_exec.challenge_start_time = chall_exec.start_time
+            if STREAM_EXECUTION_RESULTS:
+                chall_exec.start_streaming()
 
             # call specific test definition code, via table of functions; this code should monitor a VNF and return when restoration is observed
-            test_code_index = self.test_code_ID - 1  # lists are indexed from 0 to N-1
-            # invoke corresponding method, via index; could check for return code
-            self.test_code_list[test_code_index](*test_code_args, **test_code_kwargs)
-
-            # memorize restoration detection time and compute recovery time
-            test_exec.restoration_detection_time = datetime.now()
-            recovery_time_metric_def = get_indexed_item_from_file(1,FILE_METRIC_DEFINITIONS)  # get Recovery Time metric definition: ID=1
-            test_exec.recovery_time = recovery_time_metric_def.compute(test_exec.challenge_start_time, test_exec.restoration_detection_time)
+            # invoke corresponding method, via index; a test code may return the time.monotonic_ns() value
+            # at which it observed restoration (more accurate than the time at which it returns)
+            # a test code raises TimeoutError if restoration is not detected in time: an unrestored result, not an error
+            # test codes get the challenge start instant (named parameter challenge_start_ns), e.g. to ignore
+            # events older than the challenge
+            test_code_kwargs.setdefault('challenge_start_ns', timeline.get_ns("challenge_start"))
+            with tracer.span("detection", test_code=self.get_test_code_name()):
+                try:
+                    detection_ns = self.get_test_code()(*test_code_args, **test_code_kwargs)
+                    test_exec.restored = True
+                except TimeoutError as e:
+                    print(type(e), e)
+                    test_exec.restored = False
+                    test_exec.log.append_to_list('restoration not detected: ' + str(e))
+
+            # memorize restoration detection time and compute recovery time (monotonic, full resolution)
+            if test_exec.restored:
+                with tracer.span("metric computation"):
+                    if type(detection_ns) == int:
+                        timeline.mark("restoration_detection", detection_ns)
+                    else:
+                        timeline.mark("restoration_detection")
+                    test_exec.restoration_detection_time = timeline.get_wall_datetime("restoration_detection")
+                    test_exec.recovery_time_ns = timeline.elapsed_ns("challenge_start", "restoration_detection")
+                    test_exec.recovery_time = recovery_time_metric_def.compute_from_ns(timeline.get_ns("challenge_start"),
+                                                                                       timeline.get_ns("restoration_detection"))
 
             # stop challenge
-            challenge_def.run_stop_challenge_code()
+            challenge_stop_needed = False
+            with tracer.span("challenge stop", challenge_def_ID=self.challenge_def_ID):
+                challenge_stop_ns = challenge_def.run_stop_challenge_code()
 
-            # memorize challenge stop time
-            chall_exec.stop_time = datetime.now()
+            # memorize challenge stop time (observed by the challenge code, if it returned it)
+            if type(challenge_stop_ns) == int:
+                timeline.mark("challenge_stop", challenge_stop_ns)
+            else:
+                timeline.mark("challenge_stop")
+            chall_exec.stop_time = timeline.get_wall_datetime("challenge_stop")
+            # fan-out challenge: keep the instants of each target with the challenge execution
+            if challenge_def.fan_out != None:
+                chall_exec.fan_out_targets = challenge_def.fan_out.targets
+                challenge_def.fan_out = None
             chall_exec.log.append_to_list('challenge execution finished')
 
-            # write results to CSV files, memorize test finish time
-            chall_exec.write_to_csv()
-            test_exec.finish_time = datetime.now()
-            test_exec.log.append_to_list('test execution finished')
-            test_exec.write_to_csv()
+            with tracer.span("result persistence"):
+                # write results to CSV files, memorize test finish time
+                chall_exec.write_to_csv()
+                timeline.mark("test_finish")
+                test_exec.finish_time = timeline.get_wall_datetime("test_finish")
+                test_exec.log.append_to_list('test execution finished')
+                test_exec.write_to_csv()
+
+                # with the sqlite backend, also keep results in the database, next to the definitions
+                if STORAGE_BACKEND == "sqlite":
+                    definition_store.insert_execution("challenge", chall_exec, chall_exec.challenge_def_ID,
+                                                      chall_exec.start_time.isoformat())
+                    definition_store.insert_execution("test", test_exec, test_exec.test_def_ID,
+                                                      test_exec.start_time.isoformat(),
+                                                      test_exec.recovery_time_ns / NANOSECONDS_PER_SECOND
+                                                      if test_exec.recovery_time_ns != None else None)
+
+            # whole execution, from the first instant (before tracing code could run) to now
+            tracer.add_span("test execution", timeline.get_ns("test_start"), time.monotonic_ns(),
+                            test_def_ID=self.ID, test_exec_ID=test_exec.ID, recovery_time_ns=test_exec.recovery_time_ns)
+            return test_exec
 
 
         except Exception as e:
             print(type(e), e)
+            for execution in (chall_exec, test_exec):
+                if execution != None and execution.stream_writer != None:
+                    execution.log.append_to_list('execution aborted: ' + str(type(e)) + ' ' + str(e))
             sys.exit()
 
+        finally:
+            # challenge started but not stopped (test code or start code failed): stop it anyway,
+            # e.g. resume suspended VMs, so that they are not left impaired
+            if challenge_stop_needed and challenge_def != None:
+                try:
+                    challenge_def.run_stop_challenge_code()
+                except SystemExit:
+                    pass  # stop code failure already printed by run_stop_challenge_code
+                challenge_def.fan_out = None
+            # streamed results: keep what was already written (partial results), properly synced to disk,
+            # however the execution ended (closing again after write_to_csv does nothing)
+            for execution in (chall_exec, test_exec):
+                if execution != None and execution.stream_writer != None:
+                    execution.stream_writer.close()
+
 
     # library of test codes, probably 1 per test case, so test_case_ID would be the same as test_code_ID
     def test_code001(self, *test_code_args, **test_code_kwargs):
@@ -416,22 +876,39 @@ class TestDefinition(AutoBaseObject):
         # Openstack cloud was created by Fuel/MCP, descriptor in clouds.yaml file
         # VM resume done in Horizon (to simulate an ONAP-based recovery)
         # retrieved status values: {'ACTIVE', 'SUSPENDED'}
-        # loop: wait 2 seconds, check status, stop loop when status is ACTIVE
-        conn = openstack.connect(cloud='unh-hpe-openstack-fraser', region_name='RegionOne')
-        test_VM_ID = '5d07da11-0e85-4256-9894-482dcee4a5f0'  # arbitrary in this test, grab from OpenStack
-        test_VM = conn.compute.get_server(test_VM_ID)
-        print('  test_VM.name=',test_VM.name)
-        print('  test_VM.status=',test_VM.status)
-        test_VM_current_status = test_VM.status
-        wait_seconds = 2
-        nb_seconds_waited = 0
-        while test_VM_current_status != 'ACTIVE':
-            print('  waiting',wait_seconds,'seconds...')
-            time.sleep(wait_seconds)
-            test_VM = conn.compute.get_server(test_VM_ID) # need to get VM object ID, for an updated status attribute
-            test_VM_current_status = test_VM.status
-            nb_seconds_waited = nb_seconds_waited + wait_seconds
-        print('  nb_seconds_waited=',nb_seconds_waited)
+        # wait until status is ACTIVE, for all VMs suspended by the challenge (fan-out targets);
+        # return monotonic detection time of the last one
+        # with an event source (named parameter event_source, see AutoResilRunDetect), use Nova notifications,
+        # and poll only if no event arrives; otherwise, poll status (adaptive interval, with timeout)
+        conn = self.get_cloud_connection()  # shared connection: no authentication in timed window
+        challenge_def = get_indexed_item_from_list(self.challenge_def_ID, AutoResilGlobal.challenge_definition_list)
+        test_VM_ID_list = challenge_def.get_target_server_IDs() if challenge_def != None else [TEST_VM_ID]
+        for test_VM_ID in test_VM_ID_list:
+            test_VM = conn.compute.get_server(test_VM_ID)
+            print('  test_VM.name=',test_VM.name)
+            print('  test_VM.status=',test_VM.status)
+
+        import AutoResilRunDetect  # asyncio-based: imported only when a test code needs it, like cloud SDKs
+        def get_VM_check(test_VM_ID):
+            return lambda: conn.compute.get_server(test_VM_ID).status == 'ACTIVE'  # need updated VM object
+        event_source = test_code_kwargs.get('event_source')
+        if event_source != None:
+            detector = AutoResilRunDetect.NotificationDetector(event_source)
+            for test_VM_ID in test_VM_ID_list:
+                detector.watch(test_VM_ID, check_function=get_VM_check(test_VM_ID))
+            # events since the challenge start count: a VM may be restored before the detector runs
+            all_restored = detector.run(events_since_ns=test_code_kwargs.get('challenge_start_ns'))
+        else:
+            detector = AutoResilRunDetect.RestorationPoller()
+            for test_VM_ID in test_VM_ID_list:
+                detector.add_target(test_VM_ID, get_VM_check(test_VM_ID))
+            all_restored = detector.run()
+        detector.printout_report()
+        if not all_restored:
+            # unrestored result, see run_test_code
+            raise TimeoutError('VM(s) ' + ', '.join(str(target.name) for target in detector.get_failed_targets()) +
+                               ' not restored')
+        return detector.get_last_detection_ns()
 
 
     def test_code006(self, *test_code_args, **test_code_kwargs):
@@ -507,10 +984,16 @@ class TestDefinition(AutoBaseObject):
         # TODO: self.test_API_command_sent_list (depends how API commands are stored: likely a list of strings)
 
 
+# built-in test codes (methods test_code001, test_code002, ...), registered by name; more can be registered
+# with AutoResilMgCodes.test_codes.register, or declared as entry points by other packages
+for code_name in dir(TestDefinition):
+    if code_name.startswith("test_code") and code_name[len("test_code"):].isdigit():
+        AutoResilMgCodes.test_codes.register(code_name, getattr(TestDefinition, code_name))
+
 
 def init_test_definitions():
     """Function to initialize test definition data."""
-    test_definitions = []
+    test_definitions = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     test_def_ID = 5
@@ -610,11 +1093,12 @@ class ChallengeDefinition(AutoBaseObject):
         # start and stop challenges are strictly linked: exactly 1 Stop challenge for each Start challenge, so same ID for Start and for Stop
         self.TOTAL_NUMBER_OF_CHALLENGE_CODES = 10
 
-        # chosen start/stop challenge code ID (the ID is an index in a list of method names) for this instance;
-        # convention: [1;N]; in list, index is [0;N-1]
+        # chosen start/stop challenge code for this instance: either a number in [1;N] (built-in code challenge_code001
+        # to challenge_codeN, i.e. start_challenge_code001/stop_challenge_code001, ...), or the name of a code registered
+        # in AutoResilMgCodes.challenge_codes (possibly provided by another package)
         # a challenge code could use for instance Python clients (for OpenStack, Kubernetes, etc.), or HTTP APIs, or some of the CLI/API commands
         try:
-            if 1 <= chall_def_codeID <= self.TOTAL_NUMBER_OF_CHALLENGE_CODES:
+            if isinstance(chall_def_codeID, str) or 1 <= chall_def_codeID <= self.TOTAL_NUMBER_OF_CHALLENGE_CODES:
                 self.challenge_code_ID = chall_def_codeID
             else:
                 print("ChallengeDefinition constructor: incorrect chall_def_codeID=",chall_def_codeID)
@@ -623,51 +1107,99 @@ class ChallengeDefinition(AutoBaseObject):
             print(type(e), e)
             sys.exit()  # stop entire program, because code ID MUST be correct
 
-        # list of method names; leave as per-object method (i.e. not as class methods or as static methods)
-        self.start_challenge_code_list = []
-        self.stop_challenge_code_list = []
-        # add one by one, for easier later additions of new methods; MUST be same index for Start and for Stop
-        self.start_challenge_code_list.append(self.start_challenge_code001)
-        self.stop_challenge_code_list.append(self.stop_challenge_code001)
-        self.start_challenge_code_list.append(self.start_challenge_code002)
-        self.stop_challenge_code_list.append(self.stop_challenge_code002)
-        self.start_challenge_code_list.append(self.start_challenge_code003)
-        self.stop_challenge_code_list.append(self.stop_challenge_code003)
-        self.start_challenge_code_list.append(self.start_challenge_code004)
-        self.stop_challenge_code_list.append(self.stop_challenge_code004)
-        self.start_challenge_code_list.append(self.start_challenge_code005)
-        self.stop_challenge_code_list.append(self.stop_challenge_code005)
-        self.start_challenge_code_list.append(self.start_challenge_code006)
-        self.stop_challenge_code_list.append(self.stop_challenge_code006)
-        self.start_challenge_code_list.append(self.start_challenge_code007)
-        self.stop_challenge_code_list.append(self.stop_challenge_code007)
-        self.start_challenge_code_list.append(self.start_challenge_code008)
-        self.stop_challenge_code_list.append(self.stop_challenge_code008)
-        self.start_challenge_code_list.append(self.start_challenge_code009)
-        self.stop_challenge_code_list.append(self.stop_challenge_code009)
-        self.start_challenge_code_list.append(self.start_challenge_code010)
-        self.stop_challenge_code_list.append(self.stop_challenge_code010)
+        # selected start and stop codes, bound to this instance when first run (only those: see get_challenge_code)
+        self.__bound_challenge_code = None
+
+        # cloud connection manager used by challenge codes (None: shared manager, AutoResilItfCloud.openstack_connections)
+        self.connection_manager = None
+
+        # fan-out challenge codes: AutoResilRunChallenge.FanOutChallenge of the running challenge (set by the start code,
+        # used by the stop code, then its targets are kept in the ChallengeExecution; see run_test_code)
+        self.fan_out = None
+
+    # connection manager holds open connections, bound code and fan-out refer to functions: never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["connection_manager"] = None
+        state["fan_out"] = None
+        state.pop("_ChallengeDefinition__bound_challenge_code", None)
+        return state
+
+    def __setstate__(self, state):
+        state.pop("start_challenge_code_list", None)  # objects pickled with lists of all bound challenge codes
+        state.pop("stop_challenge_code_list", None)
+        self.__dict__.update(state)
+        self.__dict__.setdefault("connection_manager", None)
+        self.__dict__.setdefault("fan_out", None)
+        self.__bound_challenge_code = None
+
+    def get_cloud_connection(self, cloud_name=TEST_CLOUD_NAME, region_name=TEST_CLOUD_REGION_NAME):
+        """Return a shared, authenticated OpenStack connection, from the injected connection manager if any."""
+        connection_manager = self.connection_manager
+        if connection_manager == None:
+            connection_manager = AutoResilItfCloud.openstack_connections
+        return connection_manager.get_connection(cloud_name, region_name)
+
+    def get_challenge_code_name(self):
+        """Return the registry name of the selected challenge code."""
+        if isinstance(self.challenge_code_ID, str):
+            return self.challenge_code_ID
+        return "challenge_code" + "{0:0=3d}".format(self.challenge_code_ID)
+
+    def get_challenge_code(self):
+        """Return the selected start and stop codes, bound to this instance (loaded and bound on first use)."""
+        if self.__bound_challenge_code == None:
+            challenge_code = AutoResilMgCodes.challenge_codes.get(self.get_challenge_code_name())
+            if challenge_code == None:
+                print("ChallengeDefinition #", self.ID, ": unknown challenge code ", self.get_challenge_code_name(), sep='')
+                sys.exit()  # stop entire program, because code MUST be correct
+            self.__bound_challenge_code = (types.MethodType(challenge_code.start, self),
+                                           types.MethodType(challenge_code.stop, self))
+        return self.__bound_challenge_code
+
+    def get_impacted_VNF_IDs(self):
+        """Return IDs of the VNFs/services affected by this challenge (directly or indirectly, see get_resource_graph)."""
+        impacted_resources = []
+        if self.impacted_cloud_resource_ID_list != None:
+            impacted_resources.extend(("cloud", ID) for ID in self.impacted_cloud_resource_ID_list)
+        if self.impacted_phys_resource_ID_list != None:
+            impacted_resources.extend(("physical", ID) for ID in self.impacted_phys_resource_ID_list)
+        return get_resource_graph().get_impacted_by_all(impacted_resources, "VNF")
+
+    def get_target_server_IDs(self):
+        """Return cloud server IDs of the impacted cloud resources which are VMs (see CloudVirtualResource.server_ID);
+        [TEST_VM_ID] if none is known."""
+        server_ID_list = []
+        if self.impacted_cloud_resource_ID_list != None:
+            for cloud_resource_ID in self.impacted_cloud_resource_ID_list:
+                cloud_resource_item = get_indexed_item_from_list(cloud_resource_ID, AutoResilGlobal.cloud_virtual_resource_list)
+                if cloud_resource_item != None and cloud_resource_item.server_ID != None:
+                    if cloud_resource_item.server_ID not in server_ID_list:
+                        server_ID_list.append(cloud_resource_item.server_ID)
+        if len(server_ID_list) == 0:
+            server_ID_list.append(TEST_VM_ID)
+        return server_ID_list
 
 
     def run_start_challenge_code(self, *chall_code_args, **chall_code_kwargs):
         """Run currently selected challenge code, start portion.
-        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code."""
+        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code.
+        Returns the value returned by the code (None, or a time.monotonic_ns() instant)."""
 
         try:
-            code_index = self.challenge_code_ID - 1  # lists are indexed from 0 to N-1
-            # invoke corresponding start method, via index
-            self.start_challenge_code_list[code_index](*chall_code_args, **chall_code_kwargs)
+            # invoke selected start code; it may return the time.monotonic_ns() value at which it observed the impairment
+            return self.get_challenge_code()[0](*chall_code_args, **chall_code_kwargs)
         except Exception as e:
             print(type(e), e)
             sys.exit()
 
     def run_stop_challenge_code(self, *chall_code_args, **chall_code_kwargs):
         """Run currently selected challenge code, stop portion.
-        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code."""
+        Optional parameters can be passed if needed (unnamed or named), interpreted accordingly by selected test code.
+        Returns the value returned by the code (None, or a time.monotonic_ns() instant)."""
         try:
-            code_index = self.challenge_code_ID - 1  # lists are indexed from 0 to N-1
-            # invoke corresponding stop method, via index
-            self.stop_challenge_code_list[code_index](*chall_code_args, **chall_code_kwargs)
+            # invoke selected stop code; it may return the time.monotonic_ns() value at which it observed the end of the challenge
+            return self.get_challenge_code()[1](*chall_code_args, **chall_code_kwargs)
         except Exception as e:
             print(type(e), e)
             sys.exit()
@@ -718,17 +1250,15 @@ class ChallengeDefinition(AutoBaseObject):
         # VM is created arbitrarily, not yet with ONAP
         # Openstack cloud was created by Fuel/MCP, descriptor in clouds.yaml file
         # VM resume done in Horizon (to simulate an ONAP-based recovery)
-        conn = openstack.connect(cloud='unh-hpe-openstack-fraser', region_name='RegionOne')
-        test_VM_ID = '5d07da11-0e85-4256-9894-482dcee4a5f0'  # arbitrary in this test, grab from OpenStack
-        test_VM = conn.compute.get_server(test_VM_ID)
-        print('  test_VM.name=',test_VM.name)
-        print('  test_VM.status=',test_VM.status)
-        print('  suspending...')
-        conn.compute.suspend_server(test_VM_ID)
-        # wait a bit before continuing: ensure VM is actually suspended
-        wait_seconds = 10
-        print('  waiting',wait_seconds,'seconds...')
-        time.sleep(wait_seconds)
+        # a VNF may span several VMs: all VMs of the impacted cloud resources are suspended concurrently (fan-out)
+        # (no status read before suspending: that would delay the requests, and count in the time to impair)
+        self.fan_out = self.get_VM_suspension_fan_out()
+        print('  suspending', [target.ID for target in self.fan_out.targets], '...')
+        # suspend is asynchronous: wait until VMs are actually suspended (no longer than the deadline),
+        # and return the instant the last one was observed (challenge start, see run_test_code)
+        impairment_ns = self.fan_out.impair()
+        self.fan_out.printout_all()
+        return impairment_ns
 
     def stop_challenge_code005(self, *chall_code_args, **chall_code_kwargs):
         """Stop Challenge code number 005."""
@@ -743,13 +1273,35 @@ class ChallengeDefinition(AutoBaseObject):
 
         # June 2018, test of code logic, using newly released OpenStack SDK 0.14.0
         # this resume would be the normal challenge stop, but not in the case of this test
-        conn = openstack.connect(cloud='unh-hpe-openstack-fraser', region_name='RegionOne')
-        test_VM_ID = '5d07da11-0e85-4256-9894-482dcee4a5f0'  # arbitrary in this test, grab from OpenStack
-        test_VM = conn.compute.get_server(test_VM_ID)
-        print('  test_VM.name=',test_VM.name)
-        print('  test_VM.status=',test_VM.status)
-        print('  suspending...')
-        conn.compute.resume_server(test_VM_ID)
+        if self.fan_out == None:
+            self.fan_out = self.get_VM_suspension_fan_out()  # not started by this instance: resume any suspended VM
+        print('  resuming...')
+        # VMs already restored (e.g. by ONAP) are not resumed; others are resumed concurrently
+        resumed_ns = self.fan_out.restore()
+        self.fan_out.printout_all()
+        return resumed_ns
+
+    def get_VM_suspension_fan_out(self):
+        """Return a FanOutChallenge suspending/resuming the target VMs (see get_target_server_IDs),
+        for challenge code 005."""
+        import AutoResilRunChallenge  # run-time module: only needed when the challenge runs
+        conn = self.get_cloud_connection()  # shared connection: no authentication in timed window
+
+        def suspend_VM(test_VM_ID):
+            conn.compute.suspend_server(test_VM_ID)
+            status, impairment_ns = AutoResilItfCloud.wait_for_server_status(conn, test_VM_ID, ["SUSPENDED"])
+            return impairment_ns
+
+        def resume_VM(test_VM_ID):
+            # a VM may still be suspending (e.g. impairment failed elsewhere): wait for a stable state first
+            status, _ = AutoResilItfCloud.wait_for_stable_server_status(conn, test_VM_ID, ["SUSPENDED", "ACTIVE"])
+            if status != 'SUSPENDED':
+                return None  # already restored (e.g. by ONAP): nothing to resume
+            conn.compute.resume_server(test_VM_ID)
+            status, resumed_ns = AutoResilItfCloud.wait_for_server_status(conn, test_VM_ID, ["ACTIVE"])
+            return resumed_ns
+
+        return AutoResilRunChallenge.FanOutChallenge(self.get_target_server_IDs(), suspend_VM, resume_VM)
 
 
     def start_challenge_code006(self, *chall_code_args, **chall_code_kwargs):
@@ -833,11 +1385,19 @@ class ChallengeDefinition(AutoBaseObject):
         # TODO: self.stop_challenge_API_command_sent (depends how API commands are stored: likely a list of strings)
 
 
+# built-in challenge codes (methods start_challenge_code001/stop_challenge_code001, ...), registered by name
+# (challenge_code001, ...); more can be registered with AutoResilMgCodes.challenge_codes.register,
+# or declared as entry points by other packages
+for code_name in dir(ChallengeDefinition):
+    if code_name.startswith("start_challenge_code") and code_name[len("start_challenge_code"):].isdigit():
+        AutoResilMgCodes.challenge_codes.register(code_name[len("start_"):],
+                                                  AutoResilMgCodes.ChallengeCode(getattr(ChallengeDefinition, code_name),
+                                                                                 getattr(ChallengeDefinition, "stop" + code_name[len("start"):])))
 
 
 def init_challenge_definitions():
     """Function to initialize challenge definition data."""
-    challenge_defs = []
+    challenge_defs = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     chall_def_ID = 5
@@ -936,7 +1496,7 @@ class Recipient(AutoBaseObject):
 
 def init_recipients():
     """Function to initialize recipient data."""
-    test_recipients = []
+    test_recipients = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     recipient_ID = 1
@@ -1013,6 +1573,33 @@ class MetricDefinition(AutoBaseObject):
 
         print(indent, "|-info:", self.info, sep='')
 
+    def compute_batch(self, *input_arrays):
+        """Compute metric values for many executions at once, from NumPy arrays (one array per compute() argument,
+        same shape or broadcastable). Returns a NumPy masked array of numbers (timedelta values in seconds):
+        invalid inputs are masked, instead of stopping the program.
+        Generic version, calling compute() for each entry; subclasses provide vectorized versions.
+        Requires NumPy (optional dependency, imported only when used).
+        """
+        import numpy
+
+        compute = getattr(self, "compute", None)
+        if compute == None:
+            print("MetricDefinition #", self.ID, ": no compute method, batch computation is not possible", sep='')
+            sys.exit()  # stop entire program, because metric definitions MUST be correct
+
+        input_arrays = numpy.broadcast_arrays(*[numpy.asarray(input_array, dtype=object) for input_array in input_arrays])
+        shape = input_arrays[0].shape if len(input_arrays) > 0 else ()
+        values = numpy.zeros(shape, dtype=float)
+        invalid = numpy.zeros(shape, dtype=bool)
+        for index in numpy.ndindex(shape):
+            try:
+                values[index] = get_seconds(compute(*[input_array[index] for input_array in input_arrays]).value)
+            except (Exception, SystemExit):
+                # compute() stops the program on invalid inputs; non-numeric values (None, ...) cannot be stored
+                invalid[index] = True
+        invalid |= numpy.isnan(values)
+        return numpy.ma.masked_array(numpy.where(invalid, 0.0, values), mask=invalid)
+
 
 class MetricValue:
     """Object for storing a measurement of a Metric Definition for Auto project, with common attributes
@@ -1058,6 +1645,73 @@ class RecoveryTimeDef(MetricDefinition):
 
         return MetricValue(measured_metric_value, timestamp, self.ID)
 
+    def compute_from_ns (self,
+                         challenge_started_ns, restoration_detected_ns):
+        """challenge_started_ns: integer nanoseconds, monotonic clock (see MonotonicTimeline), when challenge was started;
+        restoration_detected_ns: integer nanoseconds, same monotonic clock, when restoration was detected;
+        returns a MetricValue containing a timedelta object as value (microsecond resolution;
+        keep restoration_detected_ns - challenge_started_ns for full resolution).
+        """
+
+        # a few checks first
+        if challenge_started_ns > restoration_detected_ns:
+            print("challenge_started_ns should be <= restoration_detected_ns")
+            print("challenge_started_ns=",challenge_started_ns," restoration_detected_ns=",restoration_detected_ns)
+            sys.exit()  # stop entire program, because formulas MUST be correct
+
+        measured_metric_value = timedelta(microseconds=(restoration_detected_ns - challenge_started_ns) // 1000)
+        timestamp = datetime.now()
+
+        return MetricValue(measured_metric_value, timestamp, self.ID)
+
+    def compute_batch (self,
+                       times_challenge_started, times_restoration_detected):
+        """times_challenge_started, times_restoration_detected: arrays (same shape) of datetime64 values,
+        or of numbers in the same unit (e.g. monotonic nanoseconds, or seconds);
+        returns a masked array of recovery times in seconds (datetime64 input) or in the input unit (numbers);
+        entries with a missing value (NaT, NaN) or with challenge start after restoration detection are masked.
+        """
+        import numpy
+
+        started = numpy.asarray(times_challenge_started)
+        detected = numpy.asarray(times_restoration_detected)
+        if started.shape != detected.shape:
+            raise ValueError("input arrays must have the same shape: " + str(started.shape) + " " + str(detected.shape))
+
+        if started.dtype.kind == "M" or detected.dtype.kind == "M":
+            # datetime64: difference is a timedelta64, converted to float seconds (NaT becomes NaN)
+            recovery_times = (detected.astype("datetime64[ns]") - started.astype("datetime64[ns]")) / numpy.timedelta64(1, "s")
+        else:
+            recovery_times = detected.astype(float) - started.astype(float)
+
+        invalid = numpy.isnan(recovery_times) | (recovery_times < 0)
+        return numpy.ma.masked_array(numpy.where(invalid, 0.0, recovery_times), mask=invalid)
+
+
+class TimeToImpairDef(MetricDefinition):
+    """Time To Impair Metric Definition class for Auto project.
+    Formula: time_to_impair = time_impairment_observed - time_challenge_requested
+    (measured duration between the challenge request (e.g. VM suspend API call) and the observation
+    of the impaired state (e.g. VM status SUSPENDED)).
+    """
+    def compute_from_ns (self,
+                         challenge_requested_ns, impairment_observed_ns):
+        """challenge_requested_ns: integer nanoseconds, monotonic clock (see MonotonicTimeline), when challenge was requested;
+        impairment_observed_ns: integer nanoseconds, same monotonic clock, when impaired state was observed;
+        returns a MetricValue containing a timedelta object as value (microsecond resolution).
+        """
+
+        # a few checks first
+        if challenge_requested_ns > impairment_observed_ns:
+            print("challenge_requested_ns should be <= impairment_observed_ns")
+            print("challenge_requested_ns=",challenge_requested_ns," impairment_observed_ns=",impairment_observed_ns)
+            sys.exit()  # stop entire program, because formulas MUST be correct
+
+        measured_metric_value = timedelta(microseconds=(impairment_observed_ns - challenge_requested_ns) // 1000)
+        timestamp = datetime.now()
+
+        return MetricValue(measured_metric_value, timestamp, self.ID)
+
 
 class UptimePercentageDef(MetricDefinition):
     """Uptime Percentage Metric Definition class for Auto project.
@@ -1103,11 +1757,157 @@ class UptimePercentageDef(MetricDefinition):
 
         return MetricValue(measured_metric_value, timestamp, self.ID)
 
+    def compute_batch (self,
+                       measured_uptimes, reference_times, planned_downtimes):
+        """measured_uptimes, reference_times, planned_downtimes: arrays (same shape, or broadcastable) in same unit;
+        returns a masked array of values between 0 and 100;
+        entries failing the same checks as compute() (or with NaN inputs) are masked.
+        """
+        import numpy
+
+        uptimes, references, downtimes = numpy.broadcast_arrays(numpy.asarray(measured_uptimes, dtype=float),
+                                                                numpy.asarray(reference_times, dtype=float),
+                                                                numpy.asarray(planned_downtimes, dtype=float))
+        # comparisons with NaN are False, so NaN inputs fail the "valid" conditions below
+        valid = ((uptimes >= 0.0) & (references > 0.0) & (downtimes >= 0.0) &
+                 (references >= downtimes) & (uptimes <= references) & (uptimes <= references - downtimes))
+        # reference == downtime with uptime 0 is "valid" above, but would divide by zero: mask it too
+        available_times = references - downtimes
+        valid &= available_times > 0.0
+
+        uptime_percentages = 100 * uptimes / numpy.where(valid, available_times, 1.0)
+        return numpy.ma.masked_array(numpy.where(valid, uptime_percentages, 0.0), mask=~valid)
+
+
+
+def get_seconds(time_value):
+    """Convert a time value to seconds: MetricValue (of a timedelta), timedelta, datetime (POSIX timestamp), or number."""
+    if type(time_value) == MetricValue:
+        time_value = time_value.value
+    if type(time_value) == timedelta:
+        return time_value.total_seconds()
+    if type(time_value) == datetime:
+        return time_value.timestamp()
+    return time_value
+
+
+class AggregateMetricDefinition(MetricDefinition):
+    """Aggregate Metric Definition class for Auto project: a metric over many executions (percentiles, MTTR, ...),
+    computed from a streaming aggregate (see AutoResilMgStats) instead of from all samples.
+    Usage: aggregate = create_aggregate(); update(aggregate, ...) for each execution;
+    merge(aggregate, other_aggregate) to combine runs or hosts; compute(aggregate) to get a MetricValue.
+    """
+    def create_aggregate(self):
+        """Return a new, empty aggregate for this metric (each aggregate metric class defines its own)."""
+        print("AggregateMetricDefinition #", self.ID, ": create_aggregate must be defined by ",
+              type(self).__name__, sep='')
+        sys.exit()  # stop entire program, because metric definitions MUST be correct
+
+    def merge(self, aggregate, other_aggregate):
+        """Add other_aggregate (e.g. from another run or host) into aggregate; return aggregate."""
+        aggregate.merge(other_aggregate)
+        return aggregate
+
+
+class RecoveryTimePercentilesDef(AggregateMetricDefinition):
+    """Recovery Time Percentiles Metric Definition class for Auto project.
+    Percentiles (e.g. p50, p95, p99) of recovery times over many executions, from a LogHistogram aggregate
+    (bounded relative error, bounded memory).
+    """
+    def __init__ (self, metric_def_ID, metric_def_name,
+                  metric_def_info,
+                  metric_def_percentiles=(50, 95, 99),
+                  metric_def_relativeAccuracy=AutoResilMgStats.DEFAULT_RELATIVE_ACCURACY):
+
+        # superclass constructor
+        MetricDefinition.__init__(self, metric_def_ID, metric_def_name, metric_def_info)
+
+        # percentiles to compute (0 to 100)
+        self.percentiles = list(metric_def_percentiles)
+        # relative error on computed percentiles
+        self.relative_accuracy = metric_def_relativeAccuracy
+
+    def create_aggregate(self):
+        return AutoResilMgStats.LogHistogram(self.relative_accuracy)
+
+    def update(self, aggregate, recovery_time):
+        """recovery_time: MetricValue (from RecoveryTimeDef), timedelta, or number of seconds."""
+        aggregate.record(get_seconds(recovery_time))
+
+    def compute(self, aggregate):
+        """Returns a MetricValue containing a dictionary as value: percentile -> recovery time in seconds."""
+        measured_metric_value = {percentile: aggregate.get_percentile(percentile) for percentile in self.percentiles}
+        timestamp = datetime.now()
+
+        return MetricValue(measured_metric_value, timestamp, self.ID)
+
+
+class MTTRDef(AggregateMetricDefinition):
+    """Mean Time To Recover Metric Definition class for Auto project.
+    Formula: MTTR = total downtime / number of failures (downtime: from challenge start to restoration detection).
+    """
+    def create_aggregate(self):
+        return AutoResilMgStats.FailureStatistics()
+
+    def update(self, aggregate, time_challenge_started, time_restoration_detected):
+        """Times: datetime objects, or numbers of seconds."""
+        aggregate.record_failure(get_seconds(time_challenge_started), get_seconds(time_restoration_detected))
+
+    def compute(self, aggregate):
+        """Returns a MetricValue containing MTTR in seconds (None if no failure)."""
+        return MetricValue(aggregate.get_MTTR(), datetime.now(), self.ID)
+
+
+class MTBFDef(MTTRDef):
+    """Mean Time Between Failures Metric Definition class for Auto project.
+    Formula: MTBF = (observation span - total downtime) / number of failures;
+    observation span: from first challenge start to last restoration, or wider if given with update_observation().
+    """
+    def update_observation(self, aggregate, observation_start, observation_end):
+        """Widen the observation span (e.g. to a whole campaign). Times: datetime objects, or numbers of seconds."""
+        aggregate.extend_observation(get_seconds(observation_start), get_seconds(observation_end))
+
+    def compute(self, aggregate):
+        """Returns a MetricValue containing MTBF in seconds (None if no failure)."""
+        return MetricValue(aggregate.get_MTBF(), datetime.now(), self.ID)
+
+
+class RollingAvailabilityDef(AggregateMetricDefinition):
+    """Rolling Availability Metric Definition class for Auto project.
+    Formula: 100 * (window - downtime in window) / window, over the last window_seconds, from downtime per time bucket.
+    """
+    def __init__ (self, metric_def_ID, metric_def_name,
+                  metric_def_info,
+                  metric_def_windowSeconds,
+                  metric_def_bucketSeconds=AutoResilMgStats.DEFAULT_BUCKET_SECONDS):
+
+        # superclass constructor
+        MetricDefinition.__init__(self, metric_def_ID, metric_def_name, metric_def_info)
+
+        # duration of the rolling window (seconds)
+        self.window_seconds = metric_def_windowSeconds
+        # time resolution of the aggregate (seconds)
+        self.bucket_seconds = metric_def_bucketSeconds
+
+    def create_aggregate(self):
+        return AutoResilMgStats.RollingAvailability(self.bucket_seconds, max(self.window_seconds,
+                                                                             AutoResilMgStats.DEFAULT_RETENTION_SECONDS))
+
+    def update(self, aggregate, time_challenge_started, time_restoration_detected):
+        """Times: datetime objects, or numbers of seconds."""
+        aggregate.record_downtime(get_seconds(time_challenge_started), get_seconds(time_restoration_detected))
+
+    def compute(self, aggregate, window_end=None):
+        """Returns a MetricValue containing availability (0 to 100) over the window ending at window_end
+        (datetime or seconds; default: latest recorded restoration)."""
+        if window_end != None:
+            window_end = get_seconds(window_end)
+        return MetricValue(aggregate.get_availability(self.window_seconds, window_end), datetime.now(), self.ID)
 
 
 def init_metric_definitions():
     """Function to initialize metric definition data."""
-    metric_definitions = []
+    metric_definitions = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     metric_def_ID = 1
@@ -1122,6 +1922,38 @@ def init_metric_definitions():
     metric_definitions.append(UptimePercentageDef(metric_def_ID, metric_def_name,
                                                   metric_def_info))
 
+    metric_def_ID = 3
+    metric_def_name = "Recovery Time Percentiles"
+    metric_def_info = "p50, p95 and p99 of recovery times over many executions (streaming histogram, 1% accuracy)"
+    metric_definitions.append(RecoveryTimePercentilesDef(metric_def_ID, metric_def_name,
+                                                         metric_def_info))
+
+    metric_def_ID = 4
+    metric_def_name = "MTTR"
+    metric_def_info = "Mean Time To Recover: total downtime divided by number of failures"
+    metric_definitions.append(MTTRDef(metric_def_ID, metric_def_name,
+                                      metric_def_info))
+
+    metric_def_ID = 5
+    metric_def_name = "MTBF"
+    metric_def_info = "Mean Time Between Failures: total uptime over observation span divided by number of failures"
+    metric_definitions.append(MTBFDef(metric_def_ID, metric_def_name,
+                                      metric_def_info))
+
+    metric_def_ID = 6
+    metric_def_name = "Rolling Availability (24h)"
+    metric_def_info = "Percentage of the last 24 hours without downtime (hourly buckets)"
+    metric_def_windowSeconds = 24*3600
+    metric_definitions.append(RollingAvailabilityDef(metric_def_ID, metric_def_name,
+                                                     metric_def_info,
+                                                     metric_def_windowSeconds))
+
+    metric_def_ID = 7
+    metric_def_name = "Time To Impair"
+    metric_def_info = "Measures time between a challenge request and the observation of the impaired state"
+    metric_definitions.append(TimeToImpairDef(metric_def_ID, metric_def_name,
+                                              metric_def_info))
+
 
     # write list to binary file
     write_list_bin(metric_definitions, FILE_METRIC_DEFINITIONS)
@@ -1167,7 +1999,7 @@ class PhysicalResource(AutoBaseObject):
 
 def init_physical_resources():
     """Function to initialize physical resource data."""
-    test_physical_resources = []
+    test_physical_resources = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     phys_resrc_ID = 1
@@ -1218,7 +2050,8 @@ class CloudVirtualResource(AutoBaseObject):
                   cldvirtres_info,
                   cldvirtres_IPAddress,
                   cldvirtres_URL,
-                  cldvirtres_related_phys_rsrcIDs):
+                  cldvirtres_related_phys_rsrcIDs,
+                  cldvirtres_serverID=None):
 
         # superclass constructor
         AutoBaseObject.__init__(self, cldvirtres_ID, cldvirtres_name)
@@ -1233,6 +2066,8 @@ class CloudVirtualResource(AutoBaseObject):
         self.URL = cldvirtres_URL
         # optional: related/associated physical resources (if known and useful or interesting, list of integer IDs)
         self.related_phys_rsrc_ID_list = cldvirtres_related_phys_rsrcIDs
+        # optional: cloud server ID (e.g. OpenStack server UUID) if the resource is a VM, used by challenge codes
+        self.server_ID = cldvirtres_serverID
 
     def printout_all(self, indent_level):
         """Print out all attributes, with an indentation level."""
@@ -1244,6 +2079,7 @@ class CloudVirtualResource(AutoBaseObject):
         print(indent, "|-info:", self.info, sep='')
         print(indent, "|-IP address:", self.IP_address, sep='')
         print(indent, "|-URL:", self.URL, sep='')
+        print(indent, "|-server ID:", self.server_ID, sep='')
 
         if self.related_phys_rsrc_ID_list != None:
             if len(self.related_phys_rsrc_ID_list) >0:
@@ -1256,7 +2092,7 @@ class CloudVirtualResource(AutoBaseObject):
 
 def init_cloud_virtual_resources():
     """Function to initialize cloud virtual resource data."""
-    test_cldvirt_resources = []
+    test_cldvirt_resources = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     cldvirtres_ID = 1
@@ -1265,12 +2101,14 @@ def init_cloud_virtual_resources():
     cldvirtres_IPAddress = "50.60.70.80"
     cldvirtres_URL = "http://50.60.70.80:8080"
     cldvirtres_related_phys_rsrcIDs = [1,3]
+    cldvirtres_serverID = None
 
     test_cldvirt_resources.append(CloudVirtualResource(cldvirtres_ID, cldvirtres_name,
                                                        cldvirtres_info,
                                                        cldvirtres_IPAddress,
                                                        cldvirtres_URL,
-                                                       cldvirtres_related_phys_rsrcIDs))
+                                                       cldvirtres_related_phys_rsrcIDs,
+                                                       cldvirtres_serverID))
 
     cldvirtres_ID = 2
     cldvirtres_name = "nova-compute-2"
@@ -1278,12 +2116,14 @@ def init_cloud_virtual_resources():
     cldvirtres_IPAddress = "50.60.70.80"
     cldvirtres_URL = "http://50.60.70.80:8080"
     cldvirtres_related_phys_rsrcIDs = [2,3]
+    cldvirtres_serverID = TEST_VM_ID
 
     test_cldvirt_resources.append(CloudVirtualResource(cldvirtres_ID, cldvirtres_name,
                                                        cldvirtres_info,
                                                        cldvirtres_IPAddress,
                                                        cldvirtres_URL,
-                                                       cldvirtres_related_phys_rsrcIDs))
+                                                       cldvirtres_related_phys_rsrcIDs,
+                                                       cldvirtres_serverID))
 
     cldvirtres_ID = 3
     cldvirtres_name = "nova-compute-3"
@@ -1291,12 +2131,14 @@ def init_cloud_virtual_resources():
     cldvirtres_IPAddress = "50.60.70.80"
     cldvirtres_URL = "http://50.60.70.80:8080"
     cldvirtres_related_phys_rsrcIDs = [1]
+    cldvirtres_serverID = None
 
     test_cldvirt_resources.append(CloudVirtualResource(cldvirtres_ID, cldvirtres_name,
                                                        cldvirtres_info,
                                                        cldvirtres_IPAddress,
                                                        cldvirtres_URL,
-                                                       cldvirtres_related_phys_rsrcIDs))
+                                                       cldvirtres_related_phys_rsrcIDs,
+                                                       cldvirtres_serverID))
 
 
     # write list to binary file
@@ -1364,7 +2206,7 @@ class VNFService(AutoBaseObject):
 
 def init_VNFs_Services():
     """Function to initialize VNFs and e2e Services data."""
-    test_VNFs_Services = []
+    test_VNFs_Services = DefinitionRegistry()
 
     # add info to list in memory, one by one, following signature values
     vnf_serv_ID = 1
@@ -1407,41 +2249,223 @@ def init_VNFs_Services():
 
 ######################################################################
 
+class ResultStreamWriter:
+    """This is a utility class for Auto project, for execution classes (ChallengeExecution and TestExecution).
+    It appends rows to a CSV result file as they are produced, with buffered flushes and fsync checkpoints,
+    so that memory stays flat during long runs and partial results survive a crash.
+    """
+    def __init__ (self, file_name,
+                  flush_rows=RESULT_STREAM_FLUSH_ROWS, fsync_seconds=RESULT_STREAM_FSYNC_SECONDS):
+        self.file_name = file_name
+        self.flush_rows = flush_rows
+        self.fsync_seconds = fsync_seconds
+        self.__file = open(file_name, "a", newline="")
+        self.__csv_file_writer = csv.writer(self.__file)
+        self.__rows_since_flush = 0
+        self.__last_fsync_time = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def write_row(self, row):
+        """Append one row (a list); flush and fsync when thresholds are reached."""
+        with self.__lock:
+            self.__csv_file_writer.writerow(row)
+            self.__rows_since_flush += 1
+            if self.__rows_since_flush >= self.flush_rows:
+                self.__flush()
+            if time.monotonic() - self.__last_fsync_time >= self.fsync_seconds:
+                self.__checkpoint()
+
+    def __flush(self):
+        # from Python buffer to OS: survives a crash of this process
+        self.__file.flush()
+        self.__rows_since_flush = 0
+
+    def __checkpoint(self):
+        # from OS cache to disk: survives a crash of the machine
+        self.__flush()
+        os.fsync(self.__file.fileno())
+        self.__last_fsync_time = time.monotonic()
+
+    def checkpoint(self):
+        """Force flush and fsync of all rows written so far."""
+        with self.__lock:
+            if not self.__file.closed:
+                self.__checkpoint()
+
+    def close(self):
+        """Checkpoint and close the file (can be called several times)."""
+        with self.__lock:
+            if not self.__file.closed:
+                self.__checkpoint()
+                self.__file.close()
+
+
+######################################################################
+
+# timestamps of TimeStampedStringList and TimeStampedMetricValueList are stored as integer nanoseconds since epoch
+NANOSECONDS_PER_SECOND =        1000000000
+
+def datetime_to_ns(datetime_value):
+    """Convert a (naive, local) datetime to integer nanoseconds since epoch, without float rounding."""
+    seconds = int(datetime_value.replace(microsecond=0).timestamp())
+    return seconds * NANOSECONDS_PER_SECOND + datetime_value.microsecond * 1000
+
+def ns_to_datetime(timestamp_ns):
+    """Convert integer nanoseconds since epoch to a (naive, local) datetime (microsecond resolution)."""
+    seconds, remainder_ns = divmod(timestamp_ns, NANOSECONDS_PER_SECOND)
+    return datetime.fromtimestamp(seconds) + timedelta(microseconds=remainder_ns // 1000)
+
+
+class TimestampFormatter:
+    """Format nanosecond timestamps as "%Y-%m-%d %H:%M:%S" (no microseconds), calling strftime only once per second."""
+    __slots__ = ("__last_second", "__last_string")
+
+    def __init__ (self):
+        self.__last_second = None
+        self.__last_string = None
+
+    def format(self, timestamp_ns):
+        second = timestamp_ns // NANOSECONDS_PER_SECOND
+        if second != self.__last_second:
+            self.__last_second = second
+            self.__last_string = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__last_string
+
+
+class MonotonicTimeline:
+    """This is a utility class for Auto project, for execution classes (ChallengeExecution and TestExecution).
+    It records named instants (challenge start, restoration detection, ...) with a monotonic nanosecond clock,
+    not affected by wall clock adjustments (NTP). Durations are computed from monotonic instants only;
+    wall clock datetimes are derived from one anchor, for display only.
+    """
+    __slots__ = ("anchor_wall_ns", "anchor_monotonic_ns", "marks")
+
+    def __init__ (self):
+        self.anchor_wall_ns = time.time_ns()
+        self.anchor_monotonic_ns = time.monotonic_ns()
+        self.marks = {}  # instant name -> monotonic nanoseconds
+
+    def mark(self, name, monotonic_ns=None):
+        """Record an instant, now or at a given monotonic_ns (e.g. measured by a test code); return it."""
+        if monotonic_ns == None:
+            monotonic_ns = time.monotonic_ns()
+        self.marks[name] = monotonic_ns
+        return monotonic_ns
+
+    def get_ns(self, name):
+        """Return monotonic nanoseconds of an instant (None if not recorded)."""
+        return self.marks.get(name)
+
+    def elapsed_ns(self, start_name, end_name):
+        """Return nanoseconds elapsed between two recorded instants (None if one is missing)."""
+        if start_name not in self.marks or end_name not in self.marks:
+            return None
+        return self.marks[end_name] - self.marks[start_name]
+
+    def get_wall_datetime(self, name):
+        """Return a wall clock datetime for an instant, for display (None if not recorded)."""
+        if name not in self.marks:
+            return None
+        return self.ns_to_wall_datetime(self.marks[name])
+
+    def ns_to_wall_datetime(self, monotonic_ns):
+        """Return a wall clock datetime for any monotonic_ns value (e.g. not recorded as a named instant), for display."""
+        return ns_to_datetime(self.anchor_wall_ns + monotonic_ns - self.anchor_monotonic_ns)
+
+
 class TimeStampedStringList:
     """This is a utility class for Auto project, for execution classes (ChallengeExecution and TestExecution).
     It stores a list of timestrings and timestamps them.
+    Compact storage: timestamps in a typed array (integer nanoseconds), strings interned in a table of unique strings
+    (array of indexes), formatting done only when strings are requested.
     """
+    __slots__ = ("__unique_strings", "__unique_string_indexes", "__string_indexes", "__timestamps_ns",
+                 "__stream_writer", "__stream_label", "__keep_in_memory", "__stream_formatter")
+
     def __init__ (self):
-        self.__string_list = []
-        self.__timestamp_list = []
+        self.__unique_strings = []         # index -> string
+        self.__unique_string_indexes = {}  # string -> index
+        self.__string_indexes = array("I")
+        self.__timestamps_ns = array("q")  # timestamp will have the same index as string
+        # optional streaming: appended strings are written to a ResultStreamWriter, with a row label
+        self.__stream_writer = None
+        self.__stream_label = None
+        self.__keep_in_memory = True
+        self.__stream_formatter = None
+
+    # stream writer is an open file: never pickled
+    def __getstate__(self):
+        return (self.__unique_strings, self.__string_indexes, self.__timestamps_ns,
+                self.__stream_label, self.__keep_in_memory)
+
+    def __setstate__(self, state):
+        (self.__unique_strings, self.__string_indexes, self.__timestamps_ns,
+         self.__stream_label, self.__keep_in_memory) = state
+        self.__unique_string_indexes = {string: index for index, string in enumerate(self.__unique_strings)}
+        self.__stream_writer = None
+        self.__stream_formatter = None
+
+    def __clear(self):
+        self.__unique_strings = []
+        self.__unique_string_indexes = {}
+        self.__string_indexes = array("I")
+        self.__timestamps_ns = array("q")
+
+    def stream_to(self, stream_writer, stream_label, keep_in_memory=True):
+        """Write each appended string to stream_writer (rows: label, timestamped string), as soon as it is appended.
+        Without keep_in_memory, strings are not kept in the list anymore (flat memory, but the list is then empty)."""
+        self.__stream_writer = stream_writer
+        self.__stream_formatter = TimestampFormatter()  # one per list: consecutive rows share its per-second cache
+        self.__stream_label = stream_label
+        self.__keep_in_memory = keep_in_memory
+        # strings appended before streaming started go to the stream first
+        for timestamped_string in self.iter_timestamped_strings():
+            stream_writer.write_row([stream_label, timestamped_string])
+        if not keep_in_memory:
+            self.__clear()
 
     def append_to_list(self, string_to_append):
         """Append an object to a list of strings and adds a timestamp."""
         if type(string_to_append)==str:
-            current_time = datetime.now()
-            self.__string_list.append(string_to_append)
-            self.__timestamp_list.append(current_time)  # timestamp will have the same index as string
+            current_time_ns = time.time_ns()
+            if self.__stream_writer != None:
+                self.__stream_writer.write_row([self.__stream_label,
+                                                self.__stream_formatter.format(current_time_ns)+" "+string_to_append])
+                if not self.__keep_in_memory:
+                    return
+            string_index = self.__unique_string_indexes.get(string_to_append)
+            if string_index == None:
+                string_index = len(self.__unique_strings)
+                self.__unique_strings.append(string_to_append)
+                self.__unique_string_indexes[string_to_append] = string_index
+            self.__string_indexes.append(string_index)
+            self.__timestamps_ns.append(current_time_ns)
         else:
             print("appended object must be a string, string_to_append=",string_to_append)
             sys.exit()  # stop entire program, because string MUST be correct
 
     def get_raw_list(self):
-        return self.__string_list
+        return [self.__unique_strings[string_index] for string_index in self.__string_indexes]
 
     def get_raw_list_timestamps(self):
-        return self.__timestamp_list
+        return [ns_to_datetime(timestamp_ns) for timestamp_ns in self.__timestamps_ns]
+
+    def get_raw_list_timestamps_ns(self):
+        """Return the typed array of timestamps (integer nanoseconds since epoch); not a copy."""
+        return self.__timestamps_ns
+
+    def iter_timestamped_strings(self):
+        """Generate strings with timestamps as prefixes (not showing microseconds), one at a time."""
+        formatter = TimestampFormatter()
+        for string_index, timestamp_ns in zip(self.__string_indexes, self.__timestamps_ns):
+            yield formatter.format(timestamp_ns)+" "+self.__unique_strings[string_index]
 
     def get_timestamped_strings(self):
         """return a list of strings with timestamps as prefixes (not showing microseconds)."""
-        ret_list = []
-        i = 0
-        while i < len(self.__string_list):
-            ret_list.append(self.__timestamp_list[i].strftime("%Y-%m-%d %H:%M:%S")+" "+self.__string_list[i])
-            i += 1
-        return ret_list
+        return list(self.iter_timestamped_strings())
 
     def length(self):
-        return len(self.__string_list)
+        return len(self.__string_indexes)
 
 
 ######################################################################
@@ -1463,34 +2487,108 @@ class ChallengeExecution(AutoBaseObject):
 
         # attributes getting values during execution
 
-        # associated Start and Stop times (when Challenge was started and stopped)
+        # associated Start and Stop times (when Challenge was started and stopped) [datetime, for display]
         self.start_time = None
         self.stop_time = None
+        # optional MonotonicTimeline with the same instants ("challenge_start", "challenge_stop"), for durations
+        self.timeline = None
+        # fan-out challenges: list of AutoResilRunChallenge.FanOutTarget, with the instants of each target
+        # (challenge start is the instant at which all targets were impaired)
+        self.fan_out_targets = None
         # log: list of strings, to capture any interesting or significant event
         self.log = TimeStampedStringList()
         # list of CLI responses
         self.CLI_responses = TimeStampedStringList()
         # list of API responses (convert to strings)
         self.API_responses = TimeStampedStringList()
+        # optional ResultStreamWriter, if results are streamed (see start_streaming)
+        self.stream_writer = None
+
+    # stream writer is an open file: never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["stream_writer"] = None
+        return state
+
+    def get_CSV_file_name(self):
+        """Output CSV file name: challDefExec + definition ID + start time + execution ID + .csv"""
+        return ("challDefExec" + "{0:0=3d}".format(self.challenge_def_ID) + "-" + self.start_time.strftime("%Y-%m-%d-%H-%M-%S") +
+                "-" + "{0:0=6d}".format(self.ID) + ".csv")
+
+    def get_identification_rows(self):
+        """Rows identifying this execution and its definition."""
+        id_rows = []
+        id_rows.append(["challenge execution ID",self.ID])
+        id_rows.append(["challenge execution name",self.name])
+
+        id_rows.append(["challenge definition ID",self.challenge_def_ID])
+        challenge_def_name = get_indexed_item_from_file(self.challenge_def_ID, FILE_CHALLENGE_DEFINITIONS)
+        id_rows.append(["challenge definition name",challenge_def_name])
+        return id_rows
+
+    def get_time_rows(self):
+        """Rows with start/stop times, when known."""
+        time_rows = []
+        if self.start_time != None:
+            time_rows.append(["challenge start time",self.start_time.strftime(CSV_TIME_FORMAT)])
+        if self.stop_time != None:
+            time_rows.append(["challenge stop time",self.stop_time.strftime(CSV_TIME_FORMAT)])
+        if self.timeline != None:
+            challenge_duration_ns = self.timeline.elapsed_ns("challenge_start", "challenge_stop")
+            if challenge_duration_ns != None:
+                time_rows.append(["challenge duration (ns)",challenge_duration_ns])
+        if self.fan_out_targets != None and self.timeline != None:
+            def format_ns(monotonic_ns):
+                if monotonic_ns == None:
+                    return ""
+                return self.timeline.ns_to_wall_datetime(monotonic_ns).strftime(CSV_TIME_FORMAT)
+            request_ns_list = [target.impair_request_ns for target in self.fan_out_targets
+                               if target.impair_request_ns != None]
+            if len(request_ns_list) > 0:
+                time_rows.append(["impairment request skew (ns)",max(request_ns_list) - min(request_ns_list)])
+            for target in self.fan_out_targets:
+                time_rows.append(["target",target.ID,
+                                  "impairment requested",format_ns(target.impair_request_ns),
+                                  "impaired",format_ns(target.impaired_ns),
+                                  "time to impair (ns)",target.get_time_to_impair_ns()])
+                time_rows.append(["target",target.ID,
+                                  "restoration requested",format_ns(target.restore_request_ns),
+                                  "restored",format_ns(target.restored_ns),
+                                  "time to restore (ns)",target.get_time_to_restore_ns()])
+        return time_rows
+
+    def start_streaming(self, keep_in_memory=True):
+        """Open the CSV file now (start_time must be set), and append log entries and responses as they happen.
+        write_to_csv() then only appends the final rows and closes the file.
+        keep_in_memory=False saves memory on long executions, but lists of this instance are then left empty."""
+        self.stream_writer = ResultStreamWriter(self.get_CSV_file_name())
+        for row in self.get_identification_rows():
+            self.stream_writer.write_row(row)
+        self.log.stream_to(self.stream_writer, "Log:", keep_in_memory)
+        self.CLI_responses.stream_to(self.stream_writer, "CLI responses:", keep_in_memory)
+        self.API_responses.stream_to(self.stream_writer, "API responses:", keep_in_memory)
+        self.stream_writer.checkpoint()
 
     def write_to_csv(self):
         """Generic function to dump all Challenge Execution data in a CSV file."""
 
+        if self.stream_writer != None:
+            # streamed: identification, logs and responses are already in the file
+            try:
+                for row in self.get_time_rows():
+                    self.stream_writer.write_row(row)
+                self.stream_writer.close()
+            except Exception as e:
+                print(type(e), e)
+                sys.exit()
+            return
+
         dump_list = []
 
         # add rows one by one, each as a list, even if only 1 element
 
-        dump_list.append(["challenge execution ID",self.ID])
-        dump_list.append(["challenge execution name",self.name])
-
-        dump_list.append(["challenge definition ID",self.challenge_def_ID])
-        challenge_def_name = get_indexed_item_from_file(self.challenge_def_ID, FILE_CHALLENGE_DEFINITIONS)
-        dump_list.append(["challenge definition name",challenge_def_name])
-
-        if self.start_time != None:
-            dump_list.append(["challenge start time",self.start_time.strftime("%Y-%m-%d %H:%M:%S")])
-        if self.stop_time != None:
-            dump_list.append(["challenge stop time",self.stop_time.strftime("%Y-%m-%d %H:%M:%S")])
+        dump_list.extend(self.get_identification_rows())
+        dump_list.extend(self.get_time_rows())
 
         if self.log.length() > 0 :
             dump_list.append(["Log:"])
@@ -1508,8 +2606,7 @@ class ChallengeExecution(AutoBaseObject):
                 dump_list.append([item])
 
         try:
-            # output CSV file name: challDefExec + ID + start time + .csv
-            file_name = "challDefExec" + "{0:0=3d}".format(self.challenge_def_ID) + "-" + self.start_time.strftime("%Y-%m-%d-%H-%M-%S") + ".csv"
+            file_name = self.get_CSV_file_name()
             with open(file_name, "w", newline="") as file:
                 csv_file_writer = csv.writer(file)
                 csv_file_writer.writerows(dump_list)
@@ -1524,36 +2621,132 @@ class ChallengeExecution(AutoBaseObject):
 class TimeStampedMetricValueList:
     """This is a utility class for Auto project, for the test execution class (TestExecution).
     It stores a list of Metric Values (with their respective timestamps).
+    Compact storage: one typed array per field (timestamp in integer nanoseconds, value, metric def ID, value type)
+    instead of one MetricValue object per sample; MetricValue objects are rebuilt on request.
     """
+    __slots__ = ("__timestamps_ns", "__values", "__metric_def_IDs", "__value_types", "__other_values",
+                 "__stream_writer", "__stream_label", "__keep_in_memory", "__stream_formatter")
+
+    # value types: floats, integers and timedelta are stored in the array of values (timedelta as microseconds),
+    # with their type, so that they are returned as they were appended; integers only if a double holds them exactly;
+    # any other value (or larger integer) is kept as an object, in a dictionary (index -> value)
+    VALUE_TYPE_NUMBER =     0
+    VALUE_TYPE_TIMEDELTA =  1
+    VALUE_TYPE_OTHER =      2
+    VALUE_TYPE_INTEGER =    3
+    MAX_EXACT_INTEGER =     2**53  # integers up to this absolute value are exact as doubles
+
     def __init__ (self):
-        self.__metric_value_list = []
+        self.__clear()
+        # optional streaming: appended values are written to a ResultStreamWriter, with a row label
+        self.__stream_writer = None
+        self.__stream_label = None
+        self.__keep_in_memory = True
+        self.__stream_formatter = None
+
+    # stream writer is an open file: never pickled
+    def __getstate__(self):
+        return (self.__timestamps_ns, self.__values, self.__metric_def_IDs, self.__value_types, self.__other_values,
+                self.__stream_label, self.__keep_in_memory)
+
+    def __setstate__(self, state):
+        (self.__timestamps_ns, self.__values, self.__metric_def_IDs, self.__value_types, self.__other_values,
+         self.__stream_label, self.__keep_in_memory) = state
+        self.__stream_writer = None
+        self.__stream_formatter = None
+
+    def __clear(self):
+        self.__timestamps_ns = array("q")
+        self.__values = array("d")
+        self.__metric_def_IDs = array("q")
+        self.__value_types = array("b")
+        self.__other_values = {}
+
+    def stream_to(self, stream_writer, stream_label, keep_in_memory=True):
+        """Write each appended metric value to stream_writer, as soon as it is appended.
+        Without keep_in_memory, values are not kept in the list anymore (flat memory, but the list is then empty)."""
+        self.__stream_writer = stream_writer
+        self.__stream_formatter = TimestampFormatter()  # one per list: consecutive rows share its per-second cache
+        self.__stream_label = stream_label
+        self.__keep_in_memory = keep_in_memory
+        # values appended before streaming started go to the stream first
+        for timestamped_value in self.iter_timestamped_metric_values_as_strings():
+            stream_writer.write_row([stream_label, timestamped_value])
+        if not keep_in_memory:
+            self.__clear()
 
     def append_to_list(self, metric_value_to_append):
         """Append a metric value (MetricValue) to the list. MetricValue already has a timestamp attribute."""
         if type(metric_value_to_append)==MetricValue:
-            self.__metric_value_list.append(metric_value_to_append)
+            self.append_value(metric_value_to_append.value, metric_value_to_append.metric_def_ID,
+                              datetime_to_ns(metric_value_to_append.timestamp))
         else:
             print("appended object must be a MetricValue, metric_value_to_append=",metric_value_to_append)
             sys.exit()  # stop entire program, because metric_value_to_append MUST be correct
 
+    def append_value(self, value, metric_def_ID, timestamp_ns=None):
+        """Append a metric value without creating a MetricValue object (for high-rate sampling);
+        timestamp_ns: integer nanoseconds since epoch, current time if None."""
+        if timestamp_ns == None:
+            timestamp_ns = time.time_ns()
+        if self.__stream_writer != None:
+            self.__stream_writer.write_row([self.__stream_label,
+                                            self.__stream_formatter.format(timestamp_ns) + " " +
+                                            str(value) + "(" + str(metric_def_ID) + ")"])
+            if not self.__keep_in_memory:
+                return
+        if type(value) == float:
+            self.__values.append(value)
+            self.__value_types.append(self.VALUE_TYPE_NUMBER)
+        elif type(value) == int and abs(value) <= self.MAX_EXACT_INTEGER:
+            self.__values.append(value)
+            self.__value_types.append(self.VALUE_TYPE_INTEGER)
+        elif type(value) == timedelta:
+            self.__values.append(value // timedelta(microseconds=1))
+            self.__value_types.append(self.VALUE_TYPE_TIMEDELTA)
+        else:
+            self.__other_values[len(self.__values)] = value
+            self.__values.append(0.0)
+            self.__value_types.append(self.VALUE_TYPE_OTHER)
+        self.__timestamps_ns.append(timestamp_ns)
+        self.__metric_def_IDs.append(metric_def_ID)
+
+    def __get_value(self, index):
+        value_type = self.__value_types[index]
+        if value_type == self.VALUE_TYPE_TIMEDELTA:
+            return timedelta(microseconds=self.__values[index])
+        if value_type == self.VALUE_TYPE_OTHER:
+            return self.__other_values[index]
+        if value_type == self.VALUE_TYPE_INTEGER:
+            return int(self.__values[index])
+        return self.__values[index]
+
     def get_raw_list(self):
-        return self.__metric_value_list
+        return [MetricValue(self.__get_value(index), ns_to_datetime(self.__timestamps_ns[index]), self.__metric_def_IDs[index])
+                for index in range(len(self.__values))]
+
+    def get_raw_arrays(self):
+        """Return the typed arrays (timestamps in ns, values, metric def IDs, value types); not copies."""
+        return self.__timestamps_ns, self.__values, self.__metric_def_IDs, self.__value_types
+
+    def iter_timestamped_metric_values_as_strings(self):
+        """Generate strings with metric values and timestamps as prefixes (not showing microseconds), one at a time.
+        Also show the metric def ID in parentheses.
+        """
+        formatter = TimestampFormatter()
+        for index in range(len(self.__values)):
+            yield (formatter.format(self.__timestamps_ns[index]) + " " +
+                   str(self.__get_value(index)) +
+                   "(" + str(self.__metric_def_IDs[index]) + ")")
 
     def get_timestamped_metric_values_as_strings(self):
         """Return a list of strings with metric values and timestamps as prefixes (not showing microseconds).
         Also show the metric def ID in parentheses.
         """
-        ret_list = []
-        i = 0
-        while i < len(self.__metric_value_list):
-            ret_list.append(self.__metric_value_list[i].timestamp.strftime("%Y-%m-%d %H:%M:%S") + " " +
-                            str(self.__metric_value_list[i].value) +
-                            "(" + str(self.__metric_value_list[i].metric_def_ID) + ")")
-            i += 1
-        return ret_list
+        return list(self.iter_timestamped_metric_values_as_strings())
 
     def length(self):
-        return len(self.__metric_value_list)
+        return len(self.__values)
 
 
 
@@ -1588,10 +2781,20 @@ class TestExecution(AutoBaseObject):
         # time when the challenge was started [datetime]; same value as associated ChallengeExecution.start_time;
         # keep a copy here for print convenience;
         self.challenge_start_time = None
+        # time between the challenge request and the observation of the impaired state [int nanoseconds]
+        # (also in associated_metric_values, as a Time To Impair metric value)
+        self.time_to_impair_ns = None
+        # True if the test code detected the VNF/service restoration, False if not in time (None: not known yet)
+        self.restored = None
         # time when the VNF/service restoration (by ONAP) was detected by the test code [datetime]
         self.restoration_detection_time = None
         # key metric: recovery time, defined as time elapsed between start of challenge and restoration detection [timedelta]
         self.recovery_time = None
+        # same, at full resolution, from a monotonic clock [integer nanoseconds]
+        self.recovery_time_ns = None
+        # optional MonotonicTimeline with the instants of this execution ("test_start", "challenge_start",
+        # "restoration_detection", "challenge_stop", "test_finish"); datetime attributes above are for display
+        self.timeline = None
         # list of associated metric values
         self.associated_metric_values = TimeStampedMetricValueList()
         # log: list of strings, to capture any interesting or significant event
@@ -1600,47 +2803,100 @@ class TestExecution(AutoBaseObject):
         self.CLI_responses = TimeStampedStringList()
         # list of API responses (convert to strings)
         self.API_responses = TimeStampedStringList()
-
-
-    def write_to_csv(self):
-        """Generic function to dump all Test Execution data in a CSV file."""
-
-        dump_list = []
-
-        # add rows one by one, each as a list, even if only 1 element
-
-        dump_list.append(["test execution ID",self.ID])
-        dump_list.append(["test execution name",self.name])
-
-        dump_list.append(["test definition ID",self.test_def_ID])
+        # optional ResultStreamWriter, if results are streamed (see start_streaming)
+        self.stream_writer = None
+
+    # stream writer is an open file: never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["stream_writer"] = None
+        return state
+
+    def get_CSV_file_name(self):
+        """Output CSV file name: testDefExec + definition ID + start time + execution ID + .csv"""
+        return ("testDefExec" + "{0:0=3d}".format(self.test_def_ID) + "-" + self.start_time.strftime("%Y-%m-%d-%H-%M-%S") +
+                "-" + "{0:0=6d}".format(self.ID) + ".csv")
+
+    def get_identification_rows(self):
+        """Rows identifying this execution, its definition, challenge execution and user."""
+        id_rows = []
+        id_rows.append(["test execution ID",self.ID])
+        id_rows.append(["test execution name",self.name])
+
+        id_rows.append(["test definition ID",self.test_def_ID])
         test_def_name = get_indexed_item_from_file(self.test_def_ID, FILE_TEST_DEFINITIONS)
-        dump_list.append(["test definition name",test_def_name])
+        id_rows.append(["test definition name",test_def_name])
 
-        dump_list.append(["associated challenge execution ID",self.challenge_exec_ID])
-        dump_list.append(["user ID",self.user_ID])
+        id_rows.append(["associated challenge execution ID",self.challenge_exec_ID])
+        id_rows.append(["user ID",self.user_ID])
+        return id_rows
 
+    def get_time_rows(self):
+        """Rows with times and measured recovery time, when known."""
+        time_rows = []
         if self.start_time != None:
-            dump_list.append(["test start time",self.start_time.strftime("%Y-%m-%d %H:%M:%S")])
+            time_rows.append(["test start time",self.start_time.strftime(CSV_TIME_FORMAT)])
 
         if self.finish_time != None:
-            dump_list.append(["test finish time",self.finish_time.strftime("%Y-%m-%d %H:%M:%S")])
+            time_rows.append(["test finish time",self.finish_time.strftime(CSV_TIME_FORMAT)])
 
         if self.challenge_start_time != None:
-            dump_list.append(["challenge stop time",self.challenge_start_time.strftime("%Y-%m-%d %H:%M:%S")])
+            time_rows.append(["challenge start time",self.challenge_start_time.strftime(CSV_TIME_FORMAT)])
+        if self.time_to_impair_ns != None:
+            time_rows.append(["MEASURED TIME TO IMPAIR (ns)",self.time_to_impair_ns])
+        if self.restored != None:
+            time_rows.append(["restoration detected",self.restored])
         if self.restoration_detection_time != None:
-            dump_list.append(["restoration detection time",self.restoration_detection_time.strftime("%Y-%m-%d %H:%M:%S")])
+            time_rows.append(["restoration detection time",self.restoration_detection_time.strftime(CSV_TIME_FORMAT)])
+        if self.recovery_time_ns != None:
+            time_rows.append(["MEASURED RECOVERY TIME (ns)",self.recovery_time_ns])
         if self.recovery_time != None:
             if self.recovery_time.value != None:
                 if type(self.recovery_time.value)==timedelta:
                     # timedelta: days and seconds are attributes, total_seconds() is a method
-                    dump_list.append(["MEASURED RECOVERY TIME (s)",self.recovery_time.value.total_seconds()])
+                    time_rows.append(["MEASURED RECOVERY TIME (s)",self.recovery_time.value.total_seconds()])
                     rtday = self.recovery_time.value.days
                     rthrs = self.recovery_time.value.seconds // 3600
                     rtmin = (self.recovery_time.value.seconds % 3600) // 60
                     rtsec = self.recovery_time.value.seconds % 60
                     rtmil = self.recovery_time.value.microseconds
-                    dump_list.append(["MEASURED RECOVERY TIME (days, hours, mins, seconds, microseconds)",
+                    time_rows.append(["MEASURED RECOVERY TIME (days, hours, mins, seconds, microseconds)",
                                       rtday, rthrs, rtmin, rtsec, rtmil])
+        return time_rows
+
+    def start_streaming(self, keep_in_memory=True):
+        """Open the CSV file now (start_time must be set), and append metric values, log entries and responses
+        as they happen. write_to_csv() then only appends the final rows and closes the file.
+        keep_in_memory=False saves memory on long executions, but lists of this instance are then left empty."""
+        self.stream_writer = ResultStreamWriter(self.get_CSV_file_name())
+        for row in self.get_identification_rows():
+            self.stream_writer.write_row(row)
+        self.associated_metric_values.stream_to(self.stream_writer, "Metric Values:", keep_in_memory)
+        self.log.stream_to(self.stream_writer, "Log:", keep_in_memory)
+        self.CLI_responses.stream_to(self.stream_writer, "CLI responses:", keep_in_memory)
+        self.API_responses.stream_to(self.stream_writer, "API responses:", keep_in_memory)
+        self.stream_writer.checkpoint()
+
+    def write_to_csv(self):
+        """Generic function to dump all Test Execution data in a CSV file."""
+
+        if self.stream_writer != None:
+            # streamed: identification, metric values, logs and responses are already in the file
+            try:
+                for row in self.get_time_rows():
+                    self.stream_writer.write_row(row)
+                self.stream_writer.close()
+            except Exception as e:
+                print(type(e), e)
+                sys.exit()
+            return
+
+        dump_list = []
+
+        # add rows one by one, each as a list, even if only 1 element
+
+        dump_list.extend(self.get_identification_rows())
+        dump_list.extend(self.get_time_rows())
 
         if self.associated_metric_values.length() > 0 :
             dump_list.append(["Metric Values:"])
@@ -1663,8 +2919,7 @@ class TestExecution(AutoBaseObject):
                 dump_list.append([item])
 
         try:
-            # output CSV file name: testDefExec + ID + start time + .csv
-            file_name = "testDefExec" + "{0:0=3d}".format(self.test_def_ID) + "-" + self.start_time.strftime("%Y-%m-%d-%H-%M-%S") + ".csv"
+            file_name = self.get_CSV_file_name()
             with open(file_name, "w", newline="") as file:
                 csv_file_writer = csv.writer(file)
                 csv_file_writer.writerows(dump_list)
@@ -1674,10 +2929,348 @@ class TestExecution(AutoBaseObject):
 
 
 ######################################################################
-def dump_all_binaries_to_CSV():
-    """Get all content from all Definition data binary files, and dump everything in a snapshot CSV file."""
-    ## TODO
+
+# global list name -> (initialization function, definition file), in initialization order
+DEFINITION_SETS = [
+    ("test_case_list",              init_test_cases,                FILE_TEST_CASES),
+    ("test_definition_list",        init_test_definitions,          FILE_TEST_DEFINITIONS),
+    ("recipient_list",              init_recipients,                FILE_RECIPIENTS),
+    ("challenge_definition_list",   init_challenge_definitions,     FILE_CHALLENGE_DEFINITIONS),
+    ("metric_definition_list",      init_metric_definitions,        FILE_METRIC_DEFINITIONS),
+    ("physical_resource_list",      init_physical_resources,        FILE_PHYSICAL_RESOURCES),
+    ("cloud_virtual_resource_list", init_cloud_virtual_resources,   FILE_CLOUD_RESOURCES),
+    ("VNF_Service_list",            init_VNFs_Services,             FILE_VNFS_SERVICES),
+]
+
+
+def update_digest_with_code(digest, code, global_values=None):
+    """Add a code object (bytecode, names, constants, nested code objects) to a hashlib digest.
+    With global_values (e.g. function.__globals__), also add the values of the module globals it reads
+    (data only, e.g. TEST_VM_ID: functions, classes and modules are not data)."""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    if global_values != None:
+        for name in code.co_names:
+            if name in global_values:
+                value = global_values[name]
+                if not (callable(value) or isinstance(value, types.ModuleType)):
+                    digest.update((name + "=" + repr(value)).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            update_digest_with_code(digest, const, global_values)
+        else:
+            digest.update(repr(const).encode())
+
+
+def get_definition_set_fingerprint(init_function):
+    """Fingerprint of a definition set: changes if its initialization function changes (hard-coded data, including
+    module constants it reads), or if the constructor of any AutoBaseObject class changes (object signature)."""
+    digest = hashlib.sha1()
+    update_digest_with_code(digest, init_function.__code__, init_function.__globals__)
+    classes_to_check = [AutoBaseObject]
+    while len(classes_to_check) > 0:
+        current_class = classes_to_check.pop()
+        digest.update(current_class.__name__.encode())
+        if "__init__" in vars(current_class):
+            update_digest_with_code(digest, current_class.__init__.__code__)
+        classes_to_check.extend(current_class.__subclasses__())
+    return digest.hexdigest()
+
+
+def read_definition_fingerprints():
+    """Return the dictionary of stored fingerprints (storage backend + file name -> fingerprint)."""
+    try:
+        with open(FILE_DEFINITION_FINGERPRINTS, "r") as json_file:
+            return json.load(json_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_definition_fingerprints(fingerprints):
+    """Replace the stored fingerprints."""
+    try:
+        with open(FILE_DEFINITION_FINGERPRINTS, "w") as json_file:
+            json.dump(fingerprints, json_file, indent=1, sort_keys=True)
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
+
+
+def definition_file_exists(file_name):
+    """Check if a definition file (or sqlite store) has already been written."""
+    if STORAGE_BACKEND == "sqlite":
+        return definition_store.get_version(file_name) > 0
+    return os.path.isfile(file_name)
+
+
+def init_all_definitions(incremental=True):
+    """Initialize all definition data and set the global lists (AutoResilGlobal).
+    Non-incremental: run all init functions (rebuild lists, rewrite files).
+    Incremental: only run init functions whose fingerprint changed (or whose file is missing);
+    the other lists are loaded from their files, lazily, the first time they are used.
+    """
+    reset_resource_graph()  # resource lists are replaced
+    if not incremental:
+        for list_name, init_function, file_name in DEFINITION_SETS:
+            setattr(AutoResilGlobal, list_name, init_function())
+        return
+
+    stored_fingerprints = read_definition_fingerprints()
+    fingerprints = dict(stored_fingerprints)
+    for list_name, init_function, file_name in DEFINITION_SETS:
+        fingerprint_key = STORAGE_BACKEND + ":" + file_name
+        fingerprint = get_definition_set_fingerprint(init_function)
+        if stored_fingerprints.get(fingerprint_key) == fingerprint and definition_file_exists(file_name):
+            # unchanged: no rebuild, no rewrite; load on first access (default argument binds current file name)
+            AutoResilGlobal.set_lazy_list(list_name,
+                                          lambda file_name=file_name: definition_file_cache.get_list(file_name))
+        else:
+            setattr(AutoResilGlobal, list_name, init_function())
+            fingerprints[fingerprint_key] = fingerprint
+
+    if fingerprints != stored_fingerprints:
+        write_definition_fingerprints(fingerprints)
+
+
+######################################################################
+SNAPSHOT_FORMAT =               "AutoResilDefinitionsSnapshot"
+SNAPSHOT_FORMAT_VERSION =       2  # version 1: objects as base64 pickles (still imported, restricted to definition classes)
+SNAPSHOT_COLUMNS =              ["store", "ID", "class", "name", "attributes (JSON)"]
+SNAPSHOT_ENUM_CLASSES =         {"ChallengeType": ChallengeType}  # enums which can be definition attributes
+
+def iter_definition_items(file_name):
+    """Yield the objects of a definition file (or sqlite store) one by one."""
+    if STORAGE_BACKEND == "sqlite":
+        yield from definition_store.iter_list(file_name)
+    else:
+        # a binary file is a single pickled list: only one file is in memory at a time
+        yield from read_list_bin(file_name) or []
+
+
+def get_definition_classes():
+    """Return the definition classes (AutoBaseObject and its subclasses) by name: the only classes a snapshot creates."""
+    definition_classes = {}
+    classes_to_check = [AutoBaseObject]
+    while len(classes_to_check) > 0:
+        current_class = classes_to_check.pop()
+        definition_classes[current_class.__name__] = current_class
+        classes_to_check.extend(current_class.__subclasses__())
+    return definition_classes
+
+
+def get_stored_value_classes():
+    """Return the classes (by name) of objects which can be attribute values of stored objects: definition classes,
+    and the helper classes of executions."""
+    import AutoResilRunChallenge  # fan-out targets of challenge executions
+    stored_value_classes = get_definition_classes()
+    for stored_value_class in (MetricValue, MonotonicTimeline, TimeStampedStringList, TimeStampedMetricValueList,
+                               AutoResilRunChallenge.FanOutTarget):
+        stored_value_classes[stored_value_class.__name__] = stored_value_class
+    return stored_value_classes
+
+
+def get_object_state(item):
+    """Return the attributes of an object to store (its __getstate__ if its class has one, else its slots or vars)."""
+    getstate_function = getattr(type(item), "__getstate__", None)
+    if getstate_function != None and getstate_function is not getattr(object, "__getstate__", None):
+        return item.__getstate__()
+    if hasattr(type(item), "__slots__"):
+        return {name: getattr(item, name) for name in type(item).__slots__}
+    return dict(vars(item))
+
+
+def set_object_state(item, state):
+    """Set the attributes of an object created without its constructor (see get_object_state)."""
+    if hasattr(item, "__setstate__"):
+        item.__setstate__(state)
+    elif hasattr(type(item), "__slots__"):
+        for name, value in state.items():
+            setattr(item, name, value)
+    else:
+        item.__dict__.update(state)
+
+
+def encode_stored_value(value):
+    """Return a plain JSON value for an attribute value of a stored object (definition or execution): JSON values
+    as they are, other values as tagged dictionaries (enums, datetimes, timedeltas, typed arrays, dictionaries with
+    other keys than strings, objects of stored value classes); anything else is refused (TypeError)."""
+    if value == None or type(value) in (bool, int, float, str):
+        return value
+    if type(value) in (list, tuple):
+        return [encode_stored_value(element) for element in value]
+    if type(value) == dict:
+        if all(type(key) == str for key in value):
+            return {key: encode_stored_value(element) for key, element in value.items()}
+        return {"items": [[encode_stored_value(key), encode_stored_value(element)] for key, element in value.items()]}
+    if isinstance(value, Enum) and type(value).__name__ in SNAPSHOT_ENUM_CLASSES:
+        return {"enum": type(value).__name__, "member": value.name}
+    if type(value) == datetime:
+        return {"datetime": value.isoformat()}
+    if type(value) == timedelta:
+        return {"timedelta": [value.days, value.seconds, value.microseconds]}
+    if type(value) == array:
+        return {"array": value.typecode, "items": value.tolist()}
+    if get_stored_value_classes().get(type(value).__name__) == type(value):
+        return {"object": type(value).__name__, "state": encode_stored_value(get_object_state(value))}
+    raise TypeError("attribute value not supported in stored objects: " + repr(value))
+
+
+def decode_stored_value(json_object):
+    """JSON decoding (object_hook) of values encoded by encode_stored_value; only stored value classes are created."""
+    keys = set(json_object)
+    if keys == {"enum", "member"}:
+        return SNAPSHOT_ENUM_CLASSES[json_object["enum"]][json_object["member"]]
+    if keys == {"datetime"}:
+        return datetime.fromisoformat(json_object["datetime"])
+    if keys == {"timedelta"}:
+        return timedelta(*json_object["timedelta"])
+    if keys == {"array", "items"}:
+        return array(json_object["array"], json_object["items"])
+    if keys == {"items"}:
+        return {key: element for key, element in json_object["items"]}
+    if keys == {"object", "state"}:
+        stored_value_class = get_stored_value_classes().get(json_object["object"])
+        if stored_value_class == None:
+            raise ValueError("not a stored value class: " + str(json_object["object"]))
+        item = stored_value_class.__new__(stored_value_class)
+        set_object_state(item, json_object["state"])
+        return item
+    return json_object
+
+
+def encode_stored_item(item):
+    """Return (class name, attributes as plain JSON) for a definition or execution object (sqlite store, snapshots)."""
+    return type(item).__name__, json.dumps(encode_stored_value(get_object_state(item)), sort_keys=True)
+
+
+def decode_stored_item(class_name, attributes_JSON):
+    """Rebuild a definition or execution object from encode_stored_item values; only definition classes
+    (and the stored value classes of their attributes) are created, no other code runs."""
+    definition_class = get_definition_classes().get(class_name)
+    if definition_class == None:
+        raise ValueError("not a definition class: " + str(class_name))
+    item = definition_class.__new__(definition_class)
+    set_object_state(item, json.loads(attributes_JSON, object_hook=decode_stored_value))
+    return item
+
+
+class DefinitionUnpickler(pickle.Unpickler):
+    """Unpickler for version 1 snapshots: only definition classes and their enums can be created
+    (a pickle from elsewhere could otherwise run any code)."""
+    def find_class(self, module, name):
+        if module in (__name__, "AutoResilMgTestDef"):
+            if name in get_definition_classes():
+                return get_definition_classes()[name]
+            if name in SNAPSHOT_ENUM_CLASSES:
+                return SNAPSHOT_ENUM_CLASSES[name]
+        raise pickle.UnpicklingError("class not allowed in a definitions snapshot: " + module + "." + name)
+
+
+def get_snapshot_row(file_name, item):
+    """Return a snapshot CSV row for one definition object: all its attributes as plain JSON (readable, and enough
+    to rebuild the object, see get_snapshot_item)."""
+    class_name, attributes_JSON = encode_stored_item(item)
+    return [file_name, item.ID, class_name, getattr(item, "name", ""), attributes_JSON]
+
+
+def get_snapshot_item(row, format_version):
+    """Rebuild a definition object from a snapshot CSV row; only definition classes are created."""
+    if format_version == 1:
+        return DefinitionUnpickler(io.BytesIO(base64.b64decode(row[5]))).load()
+    return decode_stored_item(row[2], row[4])
+
+
+def dump_all_binaries_to_CSV(file_name=None):
+    """Get all content from all Definition data binary files, and dump everything in a snapshot CSV file
+    (gzip-compressed, written row by row); return the file name."""
     timenow = datetime.now()
+    if file_name == None:
+        file_name = "DefinitionsSnapshot-" + timenow.strftime("%Y-%m-%d-%H-%M-%S") + ".csv.gz"
+
+    try:
+        nb_rows = 0
+        with gzip.open(file_name, "wt", newline="") as snapshot_file:
+            csv_file_writer = csv.writer(snapshot_file)
+            csv_file_writer.writerow([SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION, timenow.strftime(CSV_TIME_FORMAT)])
+            csv_file_writer.writerow(SNAPSHOT_COLUMNS)
+            for list_name, init_function, definition_file_name in DEFINITION_SETS:
+                if not definition_file_exists(definition_file_name):
+                    continue
+                for item in iter_definition_items(definition_file_name):
+                    csv_file_writer.writerow(get_snapshot_row(definition_file_name, item))
+                    nb_rows += 1
+            # row count at the end: an import detects a truncated snapshot
+            csv_file_writer.writerow(["END", nb_rows])
+        return file_name
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
+
+
+def open_CSV_snapshot(file_name):
+    """Open a snapshot CSV file, check its header; return (file, CSV reader positioned on the first object row,
+    format version)."""
+    snapshot_file = gzip.open(file_name, "rt", newline="")
+    csv_file_reader = csv.reader(snapshot_file)
+    header = next(csv_file_reader)
+    if header[0] != SNAPSHOT_FORMAT or int(header[1]) > SNAPSHOT_FORMAT_VERSION:
+        print("Not a supported definitions snapshot:", file_name, header[:2])
+        sys.exit()  # stop entire program, because snapshot MUST be correct
+    next(csv_file_reader)  # column names
+    return snapshot_file, csv_file_reader, int(header[1])
+
+
+def check_CSV_snapshot(file_name):
+    """Return True if a snapshot CSV file is complete (its final row count matches), reading it row by row."""
+    snapshot_file, csv_file_reader, format_version = open_CSV_snapshot(file_name)
+    with snapshot_file:
+        nb_rows = 0
+        for row in csv_file_reader:
+            if row[0] == "END":
+                return int(row[1]) == nb_rows
+            nb_rows += 1
+    return False
+
+
+def load_all_binaries_from_CSV(file_name):
+    """Replace Definition data binary files (or sqlite stores) with the content of a snapshot CSV file
+    (see dump_all_binaries_to_CSV), one store at a time; return a dictionary: file name -> number of objects."""
+    counts = {}
+    try:
+        # check first, so that a truncated snapshot does not replace any file
+        if not check_CSV_snapshot(file_name):
+            print("Truncated definitions snapshot:", file_name)
+            sys.exit()  # stop entire program, because snapshot MUST be complete
+
+        snapshot_file, csv_file_reader, format_version = open_CSV_snapshot(file_name)
+        with snapshot_file:
+            # rows are grouped by store: only one store is in memory at a time
+            current_file_name = None
+            items = DefinitionRegistry()
+            for row in csv_file_reader:
+                if row[0] == "END":
+                    break
+                if row[0] != current_file_name:
+                    if current_file_name != None:
+                        write_list_bin(items, current_file_name)
+                        counts[current_file_name] = len(items)
+                    current_file_name = row[0]
+                    items = DefinitionRegistry()
+                items.append(get_snapshot_item(row, format_version))
+            if current_file_name != None:
+                write_list_bin(items, current_file_name)
+                counts[current_file_name] = len(items)
+    except Exception as e:
+        print(type(e), e)
+        sys.exit()
+
+    # in-memory lists must reflect the loaded files: reload them when first used
+    reset_resource_graph()
+    for list_name, init_function, definition_file_name in DEFINITION_SETS:
+        if definition_file_name in counts:
+            AutoResilGlobal.set_lazy_list(list_name,
+                                          lambda definition_file_name=definition_file_name: definition_file_cache.get_list(definition_file_name))
+    return counts
 
 
 ######################################################################
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: tracing of the test harness itself (where does the time of a test execution go?)
+# Phases of an execution (setup, challenge start, detection, metric computation, challenge stop, result persistence),
+# detection iterations and cloud connections are recorded as named spans, with a monotonic nanosecond clock.
+# Tracing is off by default (spans then cost one attribute test); enable it with tracer.enable().
+# Spans are exported in Chrome trace event format (JSON): open with chrome://tracing or https://ui.perfetto.dev
+# Spans are recorded per thread; spans with a "track" (e.g. one per detection target) are shown on their own row.
+
+
+#docstring
+"""This module contains the tracing of execution phases for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import json
+import os
+import threading
+import time
+
+
+# Constants
+TRACE_FILE =                "AutoResilTrace.json"
+TRACE_CATEGORY =            "auto"
+FIRST_TRACK_ID =            1 << 32     # rows of named tracks, above any OS thread ID
+
+
+######################################################################
+
+class TraceSpan:
+    """Span being recorded (context manager): records its duration when the with-block ends,
+    and the exception type if the block raised one (or exited the program)."""
+    __slots__ = ("tracer", "name", "category", "track", "args", "start_ns")
+
+    def __init__ (self, span_tracer, span_name, span_category, span_track, span_args):
+        self.tracer = span_tracer
+        self.name = span_name
+        self.category = span_category
+        self.track = span_track
+        self.args = span_args
+        self.start_ns = None
+
+    def __enter__(self):
+        self.start_ns = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_ns = time.monotonic_ns()
+        if exc_type != None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_span(self.name, self.start_ns, end_ns, self.category, self.track, **self.args)
+        return False
+
+
+class NullSpan:
+    """Span used when tracing is disabled: does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Recorder of spans for Auto project (thread-safe). Times are time.monotonic_ns() values,
+    the same clock as MonotonicTimeline, so spans can also be added afterwards from recorded instants."""
+    def __init__ (self):
+        self.enabled = False
+        self.__lock = threading.Lock()
+        self.__events = []
+        self.__thread_names = {}    # thread ID -> thread name
+        self.__track_IDs = {}       # track name -> row ID
+        self.origin_monotonic_ns = time.monotonic_ns()
+        self.origin_wall_ns = time.time_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        """Forget recorded spans; the time origin becomes now."""
+        with self.__lock:
+            self.__events = []
+            self.__thread_names = {}
+            self.__track_IDs = {}
+            self.origin_monotonic_ns = time.monotonic_ns()
+            self.origin_wall_ns = time.time_ns()
+
+    def span(self, span_name, span_category=TRACE_CATEGORY, span_track=None, **span_args):
+        """Return a context manager recording a span around a with-block (optional arguments are shown with it)."""
+        if not self.enabled:
+            return NULL_SPAN
+        return TraceSpan(self, span_name, span_category, span_track, span_args)
+
+    def add_span(self, span_name, start_ns, end_ns, span_category=TRACE_CATEGORY, span_track=None, **span_args):
+        """Record a span from two time.monotonic_ns() instants (e.g. measured before tracing code could run)."""
+        if not self.enabled or start_ns == None or end_ns == None:
+            return
+        with self.__lock:
+            if span_track == None:
+                row_ID = threading.get_native_id()
+                if row_ID not in self.__thread_names:
+                    self.__thread_names[row_ID] = threading.current_thread().name
+            else:
+                row_ID = self.__track_IDs.get(span_track)
+                if row_ID == None:
+                    row_ID = FIRST_TRACK_ID + len(self.__track_IDs)
+                    self.__track_IDs[span_track] = row_ID
+            self.__events.append((span_name, span_category, start_ns, end_ns - start_ns, row_ID, span_args))
+
+    def get_nb_spans(self):
+        return len(self.__events)
+
+    def get_span_totals(self):
+        """Return a dictionary: span name -> (number of spans, total duration in nanoseconds)."""
+        totals = {}
+        with self.__lock:
+            for span_name, _, _, duration_ns, _, _ in self.__events:
+                count, total_ns = totals.get(span_name, (0, 0))
+                totals[span_name] = (count + 1, total_ns + duration_ns)
+        return totals
+
+    def printout_span_totals(self):
+        """Print number and total duration of spans, per span name, longest first."""
+        totals = self.get_span_totals()
+        for span_name in sorted(totals, key=lambda name: -totals[name][1]):
+            count, total_ns = totals[span_name]
+            print(span_name.ljust(30), str(count).rjust(6), "spans", "%.6f" % (total_ns / 1e9), "s")
+
+    def get_chrome_trace(self):
+        """Return recorded spans as a Chrome trace (dictionary, see Trace Event Format: complete events, in microseconds)."""
+        process_ID = os.getpid()
+        with self.__lock:
+            trace_events = [{"name": "thread_name", "ph": "M", "pid": process_ID, "tid": thread_ID,
+                             "args": {"name": thread_name}}
+                            for thread_ID, thread_name in self.__thread_names.items()]
+            trace_events.extend({"name": "thread_name", "ph": "M", "pid": process_ID, "tid": track_ID,
+                                 "args": {"name": track_name}}
+                                for track_name, track_ID in self.__track_IDs.items())
+            for span_name, span_category, start_ns, duration_ns, row_ID, span_args in self.__events:
+                trace_event = {"name": span_name, "cat": span_category, "ph": "X", "pid": process_ID, "tid": row_ID,
+                               "ts": (start_ns - self.origin_monotonic_ns) / 1000, "dur": duration_ns / 1000}
+                if len(span_args) > 0:
+                    trace_event["args"] = {key: value if isinstance(value, (int, float, str, bool)) or value == None
+                                           else str(value) for key, value in span_args.items()}
+                trace_events.append(trace_event)
+            return {"traceEvents": trace_events,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"origin_wall_ns": self.origin_wall_ns,
+                                  "origin_monotonic_ns": self.origin_monotonic_ns}}
+
+    def write_chrome_trace(self, file_name=TRACE_FILE):
+        """Write recorded spans to a Chrome trace JSON file (replaced atomically)."""
+        with open(file_name + ".tmp", "w") as trace_file:
+            json.dump(self.get_chrome_trace(), trace_file)
+        os.replace(file_name + ".tmp", file_name)
+
+
+# tracer shared by all modules of the test harness
+tracer = Tracer()
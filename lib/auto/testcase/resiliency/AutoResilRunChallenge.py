@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: concurrent (fan-out) challenges, impairing several targets at once (e.g. all the VMs of a VNF)
+# FanOutChallenge runs one worker thread per target (thread pool):
+#   - workers wait on a barrier, then send their impairment requests together (remaining skew is reported)
+#   - each target has its own instants: impairment request, impaired state observed, restoration request,
+#     restored state observed (time.monotonic_ns() values, same clock as MonotonicTimeline)
+#   - the challenge is fully started when the last target is impaired: "all impaired" instant
+#   - restoration is concurrent too; if a target cannot be impaired, all targets are restored before failing
+# impair and restore functions are plain functions of a target ID, e.g. suspend a VM and wait until it is SUSPENDED.
+
+
+#docstring
+"""This module contains fan-out challenges for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import threading
+import time
+from AutoResilMgTrace import tracer
+
+
+# Constants
+FAN_OUT_MAX_WORKERS =       32      # maximum number of targets impaired (or restored) at the same time
+BARRIER_TIMEOUT =           10.0    # seconds for all workers to be ready; after that, requests are sent anyway
+NANOSECONDS_PER_SECOND =    1000000000
+
+
+######################################################################
+
+class FanOutTarget:
+    """One target of a FanOutChallenge, with its instants (time.monotonic_ns() values, None if not reached)."""
+    def __init__ (self, target_ID):
+
+        self.ID = target_ID
+
+        # attributes getting values during the challenge
+        self.impair_request_ns = None       # instant at which the impairment was requested
+        self.impaired_ns = None             # instant at which the impaired state was observed
+        self.restore_request_ns = None      # instant at which the restoration was requested
+        self.restored_ns = None             # instant at which the restored state was observed (None: nothing to restore)
+        self.impair_error = None            # error raised by the impair function, if any (string)
+        self.restore_error = None           # error raised by the restore function, if any (string)
+
+    def get_time_to_impair_ns(self):
+        """Return nanoseconds between impairment request and impaired state, or None."""
+        if self.impair_request_ns == None or self.impaired_ns == None:
+            return None
+        return self.impaired_ns - self.impair_request_ns
+
+    def get_time_to_restore_ns(self):
+        """Return nanoseconds between restoration request and restored state, or None."""
+        if self.restore_request_ns == None or self.restored_ns == None:
+            return None
+        return self.restored_ns - self.restore_request_ns
+
+
+class FanOutChallenge:
+    """Challenge applied concurrently to several targets (IDs, e.g. OpenStack server IDs).
+    impair_function(target_ID) impairs one target and returns the time.monotonic_ns() instant at which the impaired
+    state was observed (None: impaired when it returns). restore_function(target_ID) restores one target and returns
+    the instant at which the restored state was observed (None: nothing to restore, e.g. already restored by ONAP).
+    Both functions raise an exception if they fail.
+    """
+    def __init__ (self, fan_out_targetIDs, fan_out_impairFunction, fan_out_restoreFunction,
+                  fan_out_maxWorkers=FAN_OUT_MAX_WORKERS):
+
+        self.targets = [FanOutTarget(target_ID) for target_ID in fan_out_targetIDs]
+        self.impair_function = fan_out_impairFunction
+        self.restore_function = fan_out_restoreFunction
+        self.max_workers = fan_out_maxWorkers
+
+    def __run_target(self, target, barrier, phase):
+        """Worker: wait for the other workers, then impair or restore one target and record its instants."""
+        if barrier != None:
+            try:
+                barrier.wait(BARRIER_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass  # a worker was not ready in time: do not delay this request any further
+        # concurrent workers overlap: one trace row per target
+        with tracer.span("target " + phase, span_track="target " + str(target.ID), target_ID=target.ID):
+            request_ns = time.monotonic_ns()
+            try:
+                if phase == "impairment":
+                    target.impair_request_ns = request_ns
+                    observed_ns = self.impair_function(target.ID)
+                    target.impaired_ns = observed_ns if type(observed_ns) == int else time.monotonic_ns()
+                else:
+                    target.restore_request_ns = request_ns
+                    observed_ns = self.restore_function(target.ID)
+                    target.restored_ns = observed_ns if type(observed_ns) == int else None
+            except Exception as e:
+                if phase == "impairment":
+                    target.impair_error = str(type(e)) + " " + str(e)
+                else:
+                    target.restore_error = str(type(e)) + " " + str(e)
+
+    def __run_all(self, phase):
+        """Run the impair or restore function on all targets concurrently; return when all are done."""
+        import concurrent.futures  # only needed when a fan-out challenge runs: not imported with this module
+        if len(self.targets) == 0:
+            return
+        nb_workers = min(len(self.targets), self.max_workers)
+        # with fewer workers than targets, some requests wait for a free worker anyway: no barrier
+        barrier = threading.Barrier(nb_workers) if nb_workers == len(self.targets) else None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=nb_workers) as executor:
+            futures = [executor.submit(self.__run_target, target, barrier, phase) for target in self.targets]
+            concurrent.futures.wait(futures)
+
+    def impair(self):
+        """Impair all targets concurrently; return the "all impaired" instant (None if there is no target).
+        If a target could not be impaired, restore all targets, then raise RuntimeError (about the impairment,
+        even if the restoration failed too: restoration errors are printed out)."""
+        self.__run_all("impairment")
+        failed_targets = [target for target in self.targets if target.impaired_ns == None]
+        if len(failed_targets) > 0:
+            impairment_error = RuntimeError("impairment failed for " + str(len(failed_targets)) + " target(s): " +
+                                            "; ".join(str(target.ID) + ": " + str(target.impair_error)
+                                                      for target in failed_targets))
+            try:
+                self.restore()
+            except Exception as e:
+                print(type(e), e)
+            raise impairment_error
+        return self.get_all_impaired_ns()
+
+    def restore(self):
+        """Restore all targets concurrently; return the instant at which the last one was restored
+        (None if there was nothing to restore). Raise RuntimeError if a target could not be restored."""
+        self.__run_all("restoration")
+        failed_targets = [target for target in self.targets if target.restore_error != None]
+        if len(failed_targets) > 0:
+            raise RuntimeError("restoration failed for " + str(len(failed_targets)) + " target(s): " +
+                               "; ".join(str(target.ID) + ": " + target.restore_error for target in failed_targets))
+        return self.get_all_restored_ns()
+
+    def get_all_impaired_ns(self):
+        """Return the instant at which all targets were impaired (last impaired_ns), or None if one is not."""
+        if len(self.targets) == 0 or any(target.impaired_ns == None for target in self.targets):
+            return None
+        return max(target.impaired_ns for target in self.targets)
+
+    def get_all_restored_ns(self):
+        """Return the instant at which the last restored target was restored, or None if none was."""
+        restored_ns_list = [target.restored_ns for target in self.targets if target.restored_ns != None]
+        if len(restored_ns_list) == 0:
+            return None
+        return max(restored_ns_list)
+
+    def get_request_skew_ns(self):
+        """Return nanoseconds between the first and the last impairment requests, or None."""
+        request_ns_list = [target.impair_request_ns for target in self.targets if target.impair_request_ns != None]
+        if len(request_ns_list) == 0:
+            return None
+        return max(request_ns_list) - min(request_ns_list)
+
+    def printout_all(self):
+        """Print out impairment and restoration results, one line per target."""
+        for target in self.targets:
+            time_to_impair_ns = target.get_time_to_impair_ns()
+            if time_to_impair_ns != None:
+                impairment = 'impaired after ' + str(time_to_impair_ns / NANOSECONDS_PER_SECOND) + ' s'
+            else:
+                impairment = 'NOT impaired (' + str(target.impair_error) + ')'
+            time_to_restore_ns = target.get_time_to_restore_ns()
+            restoration = ''
+            if time_to_restore_ns != None:
+                restoration = ', restored after ' + str(time_to_restore_ns / NANOSECONDS_PER_SECOND) + ' s'
+            elif target.restore_error != None:
+                restoration = ', NOT restored (' + target.restore_error + ')'
+            print('  target ', target.ID, ': ', impairment, restoration, sep='')
+        if self.get_request_skew_ns() != None:
+            print('  impairment request skew: ', self.get_request_skew_ns() / NANOSECONDS_PER_SECOND, ' s', sep='')
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+
+# ===============LICENSE_START=======================================================
+# Apache-2.0
+# ===================================================================================
+# Copyright (C) 2018 Wipro. All rights reserved.
+# ===================================================================================
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+
+
+# OPNFV Auto project
+# https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+
+# Use case 02: Resilience Improvements
+# Use Case description: https://wiki.opnfv.org/display/AUTO/Auto+Use+Cases
+# Test case design: https://wiki.opnfv.org/display/AUTO/Use+case+2+%28Resilience+Improvements+through+ONAP%29+analysis
+
+# This module: detection of restoration of resources (VMs, VNFs, ...) after a challenge
+# RestorationPoller checks many resources concurrently (asyncio), each with its own check function:
+#   - polling interval starts small and grows exponentially up to a maximum (fast detection of quick
+#     recoveries, low API load for slow ones); API latency is not counted as waiting time
+#   - each resource has a timeout: a resource not restored in time is reported as failed to recover
+#   - detection instants are time.monotonic_ns() values (same clock as MonotonicTimeline); the instant of a
+#     successful check is the middle of its API call, with the previous (unsuccessful) check as a lower bound
+# NotificationDetector listens to instance state-change events (OpenStack Nova notifications on a message queue)
+# instead of polling: detection instant is the event time, not the next poll. Only action end events (e.g.
+# instance.resume.end) more recent than the challenge start (given by the caller) count, confirmed by the check
+# function if there is one; instances are checked once when detection starts (they may already be restored).
+# If no event arrives for a while
+# (notifications disabled, queue unreachable), it falls back to polling with a RestorationPoller.
+# Event sources: LocalEventQueue (in-process, for tests and simulations), KombuEventSource (RabbitMQ, needs kombu).
+# wait_for_state waits (synchronously, with a deadline) until a resource reaches a state, e.g. until a VM is
+# actually SUSPENDED after a challenge started: challenge codes use it instead of fixed sleeps.
+
+
+#docstring
+"""This module contains restoration detection for OPNFV Auto Test Data for Use Case 2: Resilience Improvements Through ONAP.
+Auto project: https://wiki.opnfv.org/pages/viewpage.action?pageId=12389095
+"""
+
+
+######################################################################
+# import statements
+import asyncio
+import json
+import queue
+import time
+from datetime import datetime, timezone
+from AutoResilMgTrace import tracer
+
+
+# Constants
+POLL_INITIAL_INTERVAL =     0.1     # seconds between the first checks
+POLL_MAX_INTERVAL =         2.0     # maximum seconds between checks
+POLL_BACKOFF_FACTOR =       1.5     # interval is multiplied by this factor after each unsuccessful check
+POLL_TIMEOUT =              600.0   # seconds after which a resource is reported as not restored
+NANOSECONDS_PER_SECOND =    1000000000
+EVENT_FALLBACK_SECONDS =    30.0    # without any event for that long, fall back to polling
+EVENT_WAIT_SECONDS =        0.5     # maximum time blocked waiting for one event
+STATE_WAIT_TIMEOUT =        120.0   # seconds to reach a state (e.g. SUSPENDED after a suspend request)
+STATE_FAILURE_STATES =      ("ERROR",)
+NOVA_NOTIFICATION_TOPIC =   "versioned_notifications.info"
+NOVA_EXCHANGE =             "nova"
+
+
+######################################################################
+
+class RestorationTarget:
+    """Resource to watch for restoration. check_function returns True when the resource is restored;
+    it is a plain function (run in a worker thread, e.g. an OpenStack SDK call) or a coroutine function.
+    Exceptions raised by check_function count as "not restored" (API may be unavailable during the challenge).
+    """
+    def __init__ (self, target_name, target_checkFunction,
+                  target_initialInterval=POLL_INITIAL_INTERVAL,
+                  target_maxInterval=POLL_MAX_INTERVAL,
+                  target_backoffFactor=POLL_BACKOFF_FACTOR,
+                  target_timeout=POLL_TIMEOUT):
+
+        self.name = target_name
+        self.check_function = target_checkFunction
+        self.initial_interval = target_initialInterval
+        self.max_interval = target_maxInterval
+        self.backoff_factor = target_backoffFactor
+        self.timeout = target_timeout
+
+        # attributes getting values during polling
+        self.restored = False
+        self.start_ns = None                # monotonic instant at which polling started
+        self.detection_ns = None            # monotonic instant at which restoration was observed
+        self.last_not_restored_ns = None    # monotonic instant of the last unsuccessful check (lower bound)
+        self.nb_checks = 0
+        self.last_error = None              # last exception raised by check_function, if any
+
+    def get_detection_uncertainty_ns(self):
+        """Return the width of the interval in which restoration happened (nanoseconds), or None."""
+        if self.detection_ns == None or self.last_not_restored_ns == None:
+            return None
+        return self.detection_ns - self.last_not_restored_ns
+
+    async def check(self):
+        """Run check_function once; return (restored, monotonic instant of the observation)."""
+        request_ns = time.monotonic_ns()
+        try:
+            if asyncio.iscoroutinefunction(self.check_function):
+                restored = await self.check_function()
+            else:
+                # blocking check: in the default thread pool (asyncio.to_thread needs Python 3.9)
+                restored = await asyncio.get_running_loop().run_in_executor(None, self.check_function)
+        except Exception as e:
+            self.last_error = e
+            restored = False
+        response_ns = time.monotonic_ns()
+        self.nb_checks += 1
+        # concurrent checks overlap: one trace row per target
+        tracer.add_span("detection check", request_ns, response_ns, span_track=self.name,
+                        check=self.nb_checks, restored=bool(restored))
+        # state was read by the API somewhere between request and response: take the middle
+        return bool(restored), (request_ns + response_ns) // 2
+
+    async def poll(self):
+        """Check the resource until it is restored or until timeout; return True if restored."""
+        if self.start_ns == None:
+            self.start_ns = time.monotonic_ns()
+        deadline_ns = time.monotonic_ns() + int(self.timeout * NANOSECONDS_PER_SECOND)
+        interval = self.initial_interval
+        while True:
+            check_start_ns = time.monotonic_ns()
+            restored, observation_ns = await self.check()
+            if restored:
+                self.restored = True
+                self.detection_ns = observation_ns
+                return True
+            self.last_not_restored_ns = observation_ns
+
+            now_ns = time.monotonic_ns()
+            if now_ns >= deadline_ns:
+                return False
+            # interval is counted from the start of the check, so API latency does not delay the next one
+            sleep_ns = check_start_ns + int(interval * NANOSECONDS_PER_SECOND) - now_ns
+            sleep_ns = min(sleep_ns, deadline_ns - now_ns)
+            if sleep_ns > 0:
+                await asyncio.sleep(sleep_ns / NANOSECONDS_PER_SECOND)
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+
+def wait_for_state(state_function, target_states, timeout=STATE_WAIT_TIMEOUT, failure_states=STATE_FAILURE_STATES,
+                   initial_interval=POLL_INITIAL_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                   backoff_factor=POLL_BACKOFF_FACTOR):
+    """Call state_function (returns the current state of a resource, e.g. a server status) until it returns one of
+    target_states (case-insensitive), with the same adaptive interval as RestorationTarget.
+    Return (state, time.monotonic_ns() of the observation: middle of the successful call).
+    Raise RuntimeError if a failure state is reached first, TimeoutError if no target state after timeout seconds.
+    Exceptions raised by state_function count as "unknown state" (API may be unavailable during a challenge)."""
+    target_states = {state.lower() for state in target_states}
+    failure_states = {state.lower() for state in failure_states} - target_states
+    deadline_ns = time.monotonic_ns() + int(timeout * NANOSECONDS_PER_SECOND)
+    interval = initial_interval
+    state = None
+    last_error = None
+    while True:
+        request_ns = time.monotonic_ns()
+        try:
+            state = state_function()
+        except Exception as e:
+            state = None
+            last_error = e
+        response_ns = time.monotonic_ns()
+        tracer.add_span("state check", request_ns, response_ns, state=state)
+        if state != None and str(state).lower() in target_states:
+            return state, (request_ns + response_ns) // 2
+        if state != None and str(state).lower() in failure_states:
+            raise RuntimeError("state " + str(state) + " reached instead of " + "/".join(sorted(target_states)))
+
+        if response_ns >= deadline_ns:
+            raise TimeoutError("no state " + "/".join(sorted(target_states)) + " after " + str(timeout) +
+                               " s (last state: " + str(state) + ", last error: " + repr(last_error) + ")")
+        sleep_ns = min(request_ns + int(interval * NANOSECONDS_PER_SECOND), deadline_ns) - time.monotonic_ns()
+        if sleep_ns > 0:
+            time.sleep(sleep_ns / NANOSECONDS_PER_SECOND)
+        interval = min(interval * backoff_factor, max_interval)
+
+
+def printout_targets(targets):
+    """Print out restoration results of a list of RestorationTarget instances, one line per target."""
+    for target in targets:
+        if target.restored:
+            print('  ', target.name, ': restored after ',
+                  (target.detection_ns - target.start_ns) / NANOSECONDS_PER_SECOND, ' s (',
+                  target.nb_checks, ' checks, +/- ',
+                  (target.get_detection_uncertainty_ns() or 0) / NANOSECONDS_PER_SECOND / 2, ' s)', sep='')
+        else:
+            print('  ', target.name, ': NOT restored after ', target.timeout, ' s (',
+                  target.nb_checks, ' checks, last error: ', target.last_error, ')', sep='')
+
+
+
+class RestorationPoller:
+    """Restoration detection engine for Auto project: polls many RestorationTarget instances concurrently."""
+    def __init__ (self):
+        self.targets = []
+
+    def add_target(self, target_name, target_checkFunction, **target_options):
+        """Create a RestorationTarget (options: see RestorationTarget constructor) and add it; return it."""
+        target = RestorationTarget(target_name, target_checkFunction,
+                                   **{"target_" + name: value for name, value in target_options.items()})
+        self.targets.append(target)
+        return target
+
+    async def run_async(self):
+        """Poll all targets concurrently; return True if all of them were restored."""
+        results = await asyncio.gather(*[target.poll() for target in self.targets])
+        return all(results)
+
+    def run(self):
+        """Poll all targets concurrently (from synchronous code); return True if all of them were restored."""
+        return asyncio.run(self.run_async())
+
+    def get_failed_targets(self):
+        """Return the targets which were not restored before their timeout."""
+        return [target for target in self.targets if not target.restored]
+
+    def get_last_detection_ns(self):
+        """Return the monotonic instant at which the last target was restored (None if one was not restored)."""
+        if len(self.targets) == 0 or len(self.get_failed_targets()) > 0:
+            return None
+        return max(target.detection_ns for target in self.targets)
+
+    def printout_report(self):
+        """Print out restoration results, one line per target."""
+        printout_targets(self.targets)
+
+######################################################################
+
+def parse_instance_event(message):
+    """Extract (instance ID, state, wall-clock timestamp or None, event type or None) from a Nova notification,
+    or return None.
+    Accepts versioned notifications (payload is a nova_object) and legacy ones (payload is a dictionary),
+    as dictionaries or JSON strings, possibly wrapped in an oslo.messaging envelope."""
+    if isinstance(message, (str, bytes)):
+        message = json.loads(message)
+    if "oslo.message" in message:
+        message = json.loads(message["oslo.message"])
+    payload = message.get("payload", {})
+    if "nova_object.data" in payload:
+        payload = payload["nova_object.data"]
+    instance_ID = payload.get("uuid", payload.get("instance_id"))
+    state = payload.get("state")
+    if instance_ID == None or state == None:
+        return None
+
+    timestamp = None
+    if "timestamp" in message:
+        try:
+            timestamp = datetime.fromisoformat(str(message["timestamp"]).replace(" ", "T"))
+        except ValueError:
+            pass  # unknown format: use reception time
+    return instance_ID, state, timestamp, message.get("event_type")
+
+
+class LocalEventQueue:
+    """In-process event source (stand-in for a message queue): events are published by other threads."""
+    def __init__ (self):
+        self.__queue = queue.Queue()
+
+    def publish(self, message):
+        """Publish one notification (dictionary or JSON string)."""
+        self.__queue.put(message)
+
+    def get(self, timeout):
+        """Return next notification, or None if there is none within timeout (seconds)."""
+        try:
+            return self.__queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class KombuEventSource:
+    """Event source reading Nova notifications from a message queue (e.g. RabbitMQ), with kombu.
+    kombu is only needed (imported) when this class is used."""
+    def __init__ (self, source_URL, source_exchange=NOVA_EXCHANGE, source_topic=NOVA_NOTIFICATION_TOPIC):
+        import kombu
+
+        self.__messages = []
+        self.__connection = kombu.Connection(source_URL)
+        exchange = kombu.Exchange(source_exchange, type="topic", durable=False)
+        # exclusive auto-deleted queue: this runner gets its own copy of notifications, and leaves no queue behind
+        notification_queue = kombu.Queue(exchange=exchange, routing_key=source_topic, exclusive=True, auto_delete=True)
+        self.__consumer = self.__connection.Consumer(notification_queue, callbacks=[self.__on_message], accept=["json"])
+        self.__consumer.consume()
+
+    def __on_message(self, body, message):
+        self.__messages.append(body)
+        message.ack()
+
+    def get(self, timeout):
+        """Return next notification, or None if there is none within timeout (seconds)."""
+        if len(self.__messages) == 0:
+            try:
+                self.__connection.drain_events(timeout=timeout)
+            except TimeoutError:
+                return None
+            except OSError:
+                return None  # connection problem: same as no event, polling will take over
+        if len(self.__messages) == 0:
+            return None
+        return self.__messages.pop(0)
+
+    def close(self):
+        self.__consumer.cancel()
+        self.__connection.release()
+
+
+def wall_to_monotonic_ns(timestamp):
+    """Convert a wall-clock datetime (naive means UTC, as in Nova notifications) to a time.monotonic_ns() value."""
+    if timestamp.tzinfo == None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    age_ns = time.time_ns() - int(timestamp.timestamp() * NANOSECONDS_PER_SECOND)
+    return time.monotonic_ns() - age_ns
+
+
+class NotificationDetector:
+    """Event-driven restoration detection engine for Auto project: watches instances (by ID) until an event reports
+    them in a restored state. Instances still not restored when events stop arriving (EVENT_FALLBACK_SECONDS)
+    are polled with their check function, if they have one.
+    """
+    def __init__ (self, detector_eventSource,
+                  detector_fallbackSeconds=EVENT_FALLBACK_SECONDS,
+                  detector_timeout=POLL_TIMEOUT):
+
+        self.event_source = detector_eventSource
+        self.fallback_seconds = detector_fallbackSeconds
+        self.timeout = detector_timeout
+        self.targets = {}  # instance ID -> [RestorationTarget, set of restored states]
+        self.fallback_used = False
+        self.nb_events = 0
+
+    def watch(self, instance_ID, restored_states=("active",), check_function=None):
+        """Watch an instance; restored states are compared without case. Return its RestorationTarget."""
+        target = RestorationTarget(instance_ID, check_function, target_timeout=self.timeout)
+        self.targets[instance_ID] = [target, {state.lower() for state in restored_states}]
+        return target
+
+    def __get_pending_targets(self):
+        return [target for target, _ in self.targets.values() if not target.restored]
+
+    def run(self, events_since_ns=None):
+        """Wait for restoration of all watched instances; return True if all of them were restored.
+        events_since_ns: monotonic instant from which events count (e.g. challenge start: an instance may be restored
+        before the detector runs); older events are stale. Default: now. Events already queued are handled first,
+        then instances still pending are checked once (if they have a check function): an instance restored
+        without any event yet is detected at once."""
+        start_ns = time.monotonic_ns()
+        deadline_ns = start_ns + int(self.timeout * NANOSECONDS_PER_SECOND)
+        if events_since_ns == None:
+            events_since_ns = start_ns
+        for target, _ in self.targets.values():
+            target.start_ns = start_ns
+
+        message = self.event_source.get(0)
+        while message != None:
+            self.nb_events += 1
+            self.__handle_event(message, time.monotonic_ns(), events_since_ns)
+            message = self.event_source.get(0)
+        for target in self.__get_pending_targets():
+            if target.check_function != None:
+                target.nb_checks += 1
+                restored, observation_ns = self.__check(target)
+                if restored:
+                    target.restored = True
+                    target.detection_ns = observation_ns
+                else:
+                    target.last_not_restored_ns = observation_ns
+        last_event_ns = time.monotonic_ns()
+
+        while len(self.__get_pending_targets()) > 0:
+            now_ns = time.monotonic_ns()
+            if now_ns >= deadline_ns:
+                return False
+            if now_ns - last_event_ns >= self.fallback_seconds * NANOSECONDS_PER_SECOND:
+                return self.__run_fallback(deadline_ns)
+
+            message = self.event_source.get(min(EVENT_WAIT_SECONDS, (deadline_ns - now_ns) / NANOSECONDS_PER_SECOND))
+            reception_ns = time.monotonic_ns()
+            tracer.add_span("detection event wait", now_ns, reception_ns, received=message != None)
+            if message == None:
+                continue
+            last_event_ns = reception_ns
+            self.nb_events += 1
+            self.__handle_event(message, reception_ns, events_since_ns)
+        return True
+
+    def __handle_event(self, message, reception_ns, events_since_ns):
+        """Update the watched instance an event is about, if any."""
+        try:
+            event = parse_instance_event(message)
+        except (ValueError, TypeError, AttributeError):
+            return  # not a notification we understand
+        if event == None or event[0] not in self.targets:
+            return
+
+        # only the end of an action gives a settled state: e.g. instance.suspend.start still reports "active"
+        instance_ID, state, timestamp, event_type = event
+        if event_type == None or not str(event_type).endswith(".end"):
+            return
+        event_ns = reception_ns
+        if timestamp != None:
+            event_ns = min(reception_ns, wall_to_monotonic_ns(timestamp))
+            if event_ns < events_since_ns:
+                return  # stale event (e.g. queued before the challenge)
+        target, restored_states = self.targets[instance_ID]
+        target.nb_checks += 1
+        if state.lower() in restored_states:
+            if not target.restored and self.__check(target)[0]:
+                target.restored = True
+                target.detection_ns = event_ns
+        else:
+            target.last_not_restored_ns = event_ns
+
+    def __check(self, target):
+        """Check a target with its check function, if any (e.g. to confirm the state reported by an event: events
+        can be reordered or duplicated); return (restored, monotonic instant of the observation)."""
+        if target.check_function == None:
+            return True, time.monotonic_ns()
+        request_ns = time.monotonic_ns()
+        try:
+            if asyncio.iscoroutinefunction(target.check_function):
+                restored = asyncio.run(target.check_function())
+            else:
+                restored = target.check_function()
+        except Exception as e:
+            target.last_error = e
+            restored = False
+        response_ns = time.monotonic_ns()
+        tracer.add_span("detection check", request_ns, response_ns, span_track=target.name,
+                        check=target.nb_checks, restored=bool(restored))
+        return bool(restored), (request_ns + response_ns) // 2
+
+    def __run_fallback(self, deadline_ns):
+        """Poll pending instances which have a check function, until the detector deadline."""
+        self.fallback_used = True
+        poller = RestorationPoller()
+        remaining_seconds = max(0.0, (deadline_ns - time.monotonic_ns()) / NANOSECONDS_PER_SECOND)
+        for target in self.__get_pending_targets():
+            if target.check_function != None:
+                target.timeout = remaining_seconds
+                poller.targets.append(target)
+        if len(poller.targets) > 0:
+            poller.run()
+        return len(self.__get_pending_targets()) == 0
+
+    def get_failed_targets(self):
+        """Return the targets which were not restored."""
+        return self.__get_pending_targets()
+
+    def get_last_detection_ns(self):
+        """Return the monotonic instant at which the last instance was restored (None if one was not restored)."""
+        if len(self.targets) == 0 or len(self.__get_pending_targets()) > 0:
+            return None
+        return max(target.detection_ns for target, _ in self.targets.values())
+
+    def printout_report(self):
+        """Print out restoration results, one line per instance."""
+        print('  events received:', self.nb_events, ' fallback to polling:', self.fallback_used)
+        printout_targets([target for target, _ in self.targets.values()])
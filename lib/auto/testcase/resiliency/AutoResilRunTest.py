@@ -50,10 +50,281 @@
 ######################################################################
 # import statements
 import AutoResilGlobal
+import csv
+import math
+import sys
+import time
+from datetime import datetime
+from AutoResilMgTestDef import *
+
+
+# Constants
+RECOVERY_TIME_PERCENTILES_METRIC_ID =   3   # metric definitions used to aggregate campaign results
+MTTR_METRIC_ID =                        4
+MTBF_METRIC_ID =                        5
+SCHEDULER_MAX_WORKERS =                 4   # default number of test executions running at the same time
+
 
 def f1():
     return 0
 
 
+######################################################################
+
+class TestCampaign:
+    """Campaign class for Auto project: runs a Test Definition a number of times, with an interval between runs,
+    and aggregates the results (recovery time distribution, MTTR, MTBF) in one summary CSV file.
+    Each run gets unique execution IDs (see allocate_execution_ID), so its own result files are kept.
+    """
+    def __init__ (self, campaign_test_def, campaign_nbRuns,
+                  campaign_intervalSeconds=0.0,
+                  campaign_stopOnFailure=False):
+
+        # Test Definition to run
+        self.test_def = campaign_test_def
+        # number of runs
+        self.nb_runs = campaign_nbRuns
+        # time to wait between the end of a run and the start of the next one (seconds)
+        self.interval_seconds = campaign_intervalSeconds
+        # if True, stop the campaign at the first failed run
+        self.stop_on_failure = campaign_stopOnFailure
+
+        # attributes getting values during execution
+        self.start_time = None
+        self.finish_time = None
+        self.test_executions = []   # successful runs: TestExecution instances
+        self.failed_runs = []       # failed runs: run numbers (1 to nb_runs)
+
+        self.percentiles_metric_def = get_indexed_item_from_file(RECOVERY_TIME_PERCENTILES_METRIC_ID, FILE_METRIC_DEFINITIONS)
+        self.MTTR_metric_def = get_indexed_item_from_file(MTTR_METRIC_ID, FILE_METRIC_DEFINITIONS)
+        self.MTBF_metric_def = get_indexed_item_from_file(MTBF_METRIC_ID, FILE_METRIC_DEFINITIONS)
+        self.recovery_time_histogram = self.percentiles_metric_def.create_aggregate()
+        self.failure_statistics = self.MTTR_metric_def.create_aggregate()
+
+    def run(self, *test_code_args, **test_code_kwargs):
+        """Run the campaign; optional parameters are passed to each run of the test code."""
+        self.start_time = datetime.now()
+        for run_number in range(1, self.nb_runs + 1):
+            if run_number > 1 and self.interval_seconds > 0:
+                time.sleep(self.interval_seconds)
+            print("Campaign for Test Definition #", self.test_def.ID, ": run ", run_number, "/", self.nb_runs, sep='')
+            test_exec = self.run_once(*test_code_args, **test_code_kwargs)
+            if not self.record_run(run_number, test_exec) and self.stop_on_failure:
+                break
+        self.finish()
+
+    def finish(self):
+        """Memorize campaign finish time, and complete aggregates which depend on the whole campaign."""
+        self.finish_time = datetime.now()
+
+        # widen MTBF observation span to the whole campaign (failure-free time before first and after last failure)
+        self.MTBF_metric_def.update_observation(self.failure_statistics, self.start_time, self.finish_time)
+
+    def run_once(self, *test_code_args, **test_code_kwargs):
+        """Run the test definition once; return its TestExecution, or None if the run failed."""
+        try:
+            return self.test_def.run_test_code(*test_code_args, **test_code_kwargs)
+        except SystemExit:
+            # run_test_code stops the program on errors; in a campaign, count it as a failed run and go on
+            return None
+
+    def record_run(self, run_number, test_exec):
+        """Add the result of one run: to the aggregates if successful, to failed runs if it failed (test_exec None)
+        or if restoration was not detected in time. Return True if successful."""
+        if test_exec == None or test_exec.restored == False:
+            self.failed_runs.append(run_number)
+            return False
+        self.add_test_execution(test_exec)
+        return True
+
+    def add_test_execution(self, test_exec):
+        """Add the results of one successful run to the campaign aggregates."""
+        self.test_executions.append(test_exec)
+        self.percentiles_metric_def.update(self.recovery_time_histogram, test_exec.recovery_time_ns / NANOSECONDS_PER_SECOND)
+        self.MTTR_metric_def.update(self.failure_statistics,
+                                    test_exec.challenge_start_time, test_exec.restoration_detection_time)
+
+    def get_statistics(self):
+        """Return a dictionary of recovery time statistics (seconds) over successful runs."""
+        recovery_times = [test_exec.recovery_time_ns / NANOSECONDS_PER_SECOND for test_exec in self.test_executions]
+        statistics = {"runs": self.nb_runs,
+                      "successful runs": len(self.test_executions),
+                      "failed runs": len(self.failed_runs)}
+        if len(recovery_times) > 0:
+            mean = sum(recovery_times) / len(recovery_times)
+            statistics["recovery time min (s)"] = min(recovery_times)
+            statistics["recovery time max (s)"] = max(recovery_times)
+            statistics["recovery time mean (s)"] = mean
+            statistics["recovery time stdev (s)"] = math.sqrt(sum((value - mean)**2 for value in recovery_times) /
+                                                               len(recovery_times))
+            for percentile, value in self.percentiles_metric_def.compute(self.recovery_time_histogram).value.items():
+                statistics["recovery time p" + str(percentile) + " (s)"] = value
+            statistics["MTTR (s)"] = self.MTTR_metric_def.compute(self.failure_statistics).value
+            statistics["MTBF (s)"] = self.MTBF_metric_def.compute(self.failure_statistics).value
+        return statistics
+
+    def get_CSV_file_name(self):
+        """Output CSV file name: campaignTestDef + definition ID + start time + .csv"""
+        return "campaignTestDef" + "{0:0=3d}".format(self.test_def.ID) + "-" + self.start_time.strftime("%Y-%m-%d-%H-%M-%S") + ".csv"
+
+    def write_to_csv(self):
+        """Dump campaign summary (statistics, then one row per run) in a CSV file; return file name."""
+
+        dump_list = []
+
+        dump_list.append(["test definition ID",self.test_def.ID])
+        dump_list.append(["test definition name",self.test_def.name])
+        dump_list.append(["interval between runs (s)",self.interval_seconds])
+        dump_list.append(["campaign start time",self.start_time.strftime(CSV_TIME_FORMAT)])
+        if self.finish_time != None:
+            dump_list.append(["campaign finish time",self.finish_time.strftime(CSV_TIME_FORMAT)])
+
+        for name, value in self.get_statistics().items():
+            dump_list.append([name, value])
+
+        if len(self.failed_runs) > 0:
+            dump_list.append(["failed runs (numbers)"] + self.failed_runs)
+
+        dump_list.append(["Executions:"])
+        dump_list.append(["test execution ID", "challenge execution ID", "test start time", "recovery time (ns)"])
+        for test_exec in self.test_executions:
+            dump_list.append([test_exec.ID, test_exec.challenge_exec_ID,
+                              test_exec.start_time.strftime(CSV_TIME_FORMAT), test_exec.recovery_time_ns])
+
+        try:
+            file_name = self.get_CSV_file_name()
+            with open(file_name, "w", newline="") as file:
+                csv_file_writer = csv.writer(file)
+                csv_file_writer.writerows(dump_list)
+            return file_name
+        except Exception as e:
+            print(type(e), e)
+            sys.exit()
+
+
+def run_campaign(test_def_ID, nb_runs, interval_seconds=0.0, stop_on_failure=False, *test_code_args, **test_code_kwargs):
+    """Run a campaign for a Test Definition ID (from AutoResilGlobal.test_definition_list), write its summary;
+    return the TestCampaign instance."""
+    test_def = get_indexed_item_from_list(test_def_ID, AutoResilGlobal.test_definition_list)
+    if test_def == None:
+        print("Test Definition ID",test_def_ID,"does not exist")
+        sys.exit()  # stop entire program, because test definition MUST be correct
+    campaign = TestCampaign(test_def, nb_runs, interval_seconds, stop_on_failure)
+    campaign.run(*test_code_args, **test_code_kwargs)
+    campaign.write_to_csv()
+    return campaign
+
+
+
+
+
+
+######################################################################
+
+def get_test_def_resource_keys(test_def):
+    """Return the set of resources a Test Definition execution uses exclusively, as (kind, ID) tuples:
+    its challenge definition, the impacted cloud and physical resources of that challenge, the VNFs depending on them,
+    and the tested VNFs.
+    Two executions sharing any key must not run at the same time."""
+    resource_keys = {("challenge", test_def.challenge_def_ID)}
+    challenge_def = get_indexed_item_from_list(test_def.challenge_def_ID, AutoResilGlobal.challenge_definition_list)
+    if challenge_def != None:
+        if challenge_def.impacted_cloud_resource_ID_list != None:
+            resource_keys.update(("cloud", ID) for ID in challenge_def.impacted_cloud_resource_ID_list)
+        if challenge_def.impacted_phys_resource_ID_list != None:
+            resource_keys.update(("physical", ID) for ID in challenge_def.impacted_phys_resource_ID_list)
+        # VNFs running on impacted resources are disturbed too, even if not tested
+        resource_keys.update(("VNF", ID) for ID in challenge_def.get_impacted_VNF_IDs())
+    if test_def.VNF_ID_list != None:
+        resource_keys.update(("VNF", ID) for ID in test_def.VNF_ID_list)
+    return resource_keys
+
+
+class TestScheduler:
+    """Scheduler class for Auto project: runs many Test Definitions concurrently, in a pool of worker threads.
+    Each Test Definition is run as a campaign (1 or more runs). A run starts only when none of the resources
+    it uses (see get_test_def_resource_keys) is used by a run in progress, so conflicting challenges
+    (same VM, same server, same VNF) are serialized, and independent ones overlap.
+    Runs of a campaign are dispatched one after the other (no interval between runs).
+    """
+    def __init__ (self, scheduler_maxWorkers=SCHEDULER_MAX_WORKERS):
+
+        self.max_workers = scheduler_maxWorkers
+        self.campaigns = []         # TestCampaign instances, in order of addition
+        self.run_callbacks = []     # functions called after each run: f(campaign, run_number, test_exec or None)
+
+    def add_test_def(self, test_def_ID, nb_runs=1, stop_on_failure=False):
+        """Add a Test Definition (by ID) to run nb_runs times; return its TestCampaign instance."""
+        test_def = get_indexed_item_from_list(test_def_ID, AutoResilGlobal.test_definition_list)
+        if test_def == None:
+            print("Test Definition ID",test_def_ID,"does not exist")
+            sys.exit()  # stop entire program, because test definition MUST be correct
+        campaign = TestCampaign(test_def, nb_runs, 0.0, stop_on_failure)
+        self.campaigns.append(campaign)
+        return campaign
+
+    def run(self, *test_code_args, **test_code_kwargs):
+        """Run all added campaigns; optional parameters are passed to each run of the test codes.
+        Return the list of TestCampaign instances."""
+
+        # pending runs: [campaign, resource keys, next run number], dispatched in order of addition when possible
+        pending = [[campaign, get_test_def_resource_keys(campaign.test_def), 1]
+                   for campaign in self.campaigns if campaign.nb_runs > 0]
+        busy_keys = set()
+        running = {}  # future -> (pending entry, run number)
+        running_campaigns = set()
+
+        import concurrent.futures  # only needed when running in parallel: not imported with this module
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(pending) > 0 or len(running) > 0:
+
+                # start every pending campaign whose resources are all free, as long as workers are available
+                for entry in pending:
+                    if len(running) >= self.max_workers:
+                        break
+                    campaign, resource_keys, run_number = entry
+                    if campaign in running_campaigns:
+                        continue  # runs of one campaign are sequential
+                    if not busy_keys.isdisjoint(resource_keys):
+                        continue
+                    if campaign.start_time == None:
+                        campaign.start_time = datetime.now()
+                    busy_keys.update(resource_keys)
+                    future = executor.submit(campaign.run_once, *test_code_args, **test_code_kwargs)
+                    running[future] = (entry, run_number)
+                    running_campaigns.add(campaign)
+                    entry[2] += 1
+
+                # wait for at least one run to finish, release its resources, collect its results
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    entry, run_number = running.pop(future)
+                    campaign, resource_keys = entry[0], entry[1]
+                    busy_keys.difference_update(resource_keys)
+                    running_campaigns.discard(campaign)
+                    test_exec = future.result()
+                    successful = campaign.record_run(run_number, test_exec)
+                    for callback in self.run_callbacks:
+                        callback(campaign, run_number, test_exec)
+
+                    if entry[2] > campaign.nb_runs or (not successful and campaign.stop_on_failure):
+                        pending.remove(entry)
+                        campaign.finish()
+
+        return self.campaigns
+
+    def write_to_csv(self):
+        """Dump one summary CSV file per campaign; return the list of file names."""
+        return [campaign.write_to_csv() for campaign in self.campaigns if campaign.start_time != None]
 
 
+def run_test_defs_in_parallel(test_def_ID_list, nb_runs=1, max_workers=SCHEDULER_MAX_WORKERS,
+                              *test_code_args, **test_code_kwargs):
+    """Run a list of Test Definition IDs concurrently (each nb_runs times), avoiding resource conflicts,
+    and write campaign summaries; return the TestScheduler instance."""
+    scheduler = TestScheduler(max_workers)
+    for test_def_ID in test_def_ID_list:
+        scheduler.add_test_def(test_def_ID, nb_runs)
+    scheduler.run(*test_code_args, **test_code_kwargs)
+    scheduler.write_to_csv()
+    return scheduler